@@ -2,9 +2,46 @@
 files to create tables from and their metadata is given as a YAML configuration
 file.
 
+Public classes other than those in :mod:`.domain` are imported when first
+accessed so command line actions only import the libraries they use.
+
 """
+from typing import Dict, List, Any
+import importlib
+from . import domain as _domain
 from .domain import *
-from .table import *
-from .desc import *
-from .app import *
-from .cli import *
+
+_LAZY_ATTRIBUTES: Dict[str, str] = {
+    'Table': 'table',
+    'TableFactory': 'table',
+    'DataFrameDescriber': 'desc',
+    'DataDescriber': 'desc',
+    'RenderableDataFrameDescriber': 'desc',
+    'Renderable': 'render',
+    'RenderableFactory': 'render',
+    'Application': 'app',
+    'ApplicationFactory': 'cli',
+    'main': 'cli'}
+"""Public names to the modules that define them, which are imported on first
+access.
+
+"""
+
+__all__: List[str] = sorted(set(map(lambda t: t[0], filter(
+    lambda t: getattr(t[1], '__module__', None) == _domain.__name__,
+    vars(_domain).items()))) | _LAZY_ATTRIBUTES.keys())
+"""The classes defined in :mod:`.domain` and the lazily imported names."""
+
+
+def __getattr__(name: str) -> Any:
+    mod_name: str = _LAZY_ATTRIBUTES.get(name)
+    if mod_name is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    mod = importlib.import_module(f'.{mod_name}', __name__)
+    val: Any = getattr(mod, name)
+    globals()[name] = val
+    return val
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals().keys()) | set(__all__))
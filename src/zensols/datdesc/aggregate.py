@@ -0,0 +1,230 @@
+"""Grouped aggregation of CSV files read in chunks.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import Dict, Tuple, Set, Sequence, Any, Union, ClassVar
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .domain import LatexTableError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Aggregation(object):
+    """Groups and aggregates the rows of a CSV file while reading it in chunks
+    so only the statistics of each group are kept in memory rather than the
+    entire file.  The statistics of each chunk are merged with those of the
+    previous chunks (means and variances are merged with Chan et al.'s
+    parallel algorithm), which gives the same result as
+    :meth:`pandas.core.groupby.DataFrameGroupBy.agg` on the entire file.
+
+    This is configured in the ``aggregate`` entry of a table definition (see
+    :obj:`.Table.aggregate`).  For example::
+
+        aggregate:
+          by: [model]
+          columns:
+            F1: [f1, mean]
+            F1sd: [f1, std]
+            N: [f1, count]
+
+    """
+    _FUNCTIONS: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        'count': ('count',),
+        'size': ('size',),
+        'sum': ('sum',),
+        'min': ('min',),
+        'max': ('max',),
+        'mean': ('count', 'mean'),
+        'var': ('count', 'mean', 'm2'),
+        'std': ('count', 'mean', 'm2')}
+    """The supported aggregation functions and the statistics kept for each."""
+
+    by: Sequence[str] = field()
+    """The names of the columns to group by."""
+
+    columns: Dict[str, Sequence[str]] = field()
+    """The output column names with the input column and aggregation function
+    (``count``, ``size``, ``sum``, ``min``, ``max``, ``mean``, ``var`` or
+    ``std``) as a two element list.  Variance and standard deviation use one
+    delta degree of freedom like :mod:`pandas`.
+
+    """
+    chunk_size: int = field(default=100_000)
+    """The number of rows read from the CSV file at a time."""
+
+    def __post_init__(self):
+        if isinstance(self.by, str):
+            self.by = [self.by]
+        self.by = list(self.by)
+        name: str
+        spec: Sequence[str]
+        for name, spec in self.columns.items():
+            if not isinstance(spec, (tuple, list)) or len(spec) != 2:
+                raise LatexTableError(
+                    f"Aggregate column '{name}' needs [column, function]")
+            if spec[1] not in self._FUNCTIONS:
+                raise LatexTableError(
+                    f"Unknown aggregate function '{spec[1]}', expecting " +
+                    f"one of: {', '.join(sorted(self._FUNCTIONS))}")
+
+    def _get_stats(self) -> Dict[str, Set[str]]:
+        """Return the statistics kept for each input column."""
+        stats: Dict[str, Set[str]] = {}
+        col: str
+        fn: str
+        for col, fn in self.columns.values():
+            stats.setdefault(col, set()).update(self._FUNCTIONS[fn])
+        return stats
+
+    def _reduce(self, df: pd.DataFrame, stats: Dict[str, Set[str]]) -> \
+            pd.DataFrame:
+        """Return the statistics of the groups of a chunk of the file."""
+        gb = df.groupby(self.by, sort=False)
+        reduced: Dict[Tuple[str, str], pd.Series] = {}
+        size: pd.Series = None
+        col: str
+        needs: Set[str]
+        for col, needs in stats.items():
+            g = gb[col]
+            if 'count' in needs:
+                reduced[(col, 'count')] = g.count()
+            if 'size' in needs:
+                if size is None:
+                    size = gb.size()
+                reduced[(col, 'size')] = size
+            if 'sum' in needs:
+                reduced[(col, 'sum')] = g.sum()
+            if 'min' in needs:
+                reduced[(col, 'min')] = g.min()
+            if 'max' in needs:
+                reduced[(col, 'max')] = g.max()
+            if 'mean' in needs:
+                reduced[(col, 'mean')] = g.mean()
+            if 'm2' in needs:
+                reduced[(col, 'm2')] = g.var(ddof=0) * reduced[(col, 'count')]
+        return pd.DataFrame(reduced)
+
+    def _merge_extreme(self, sa: pd.Series, sb: pd.Series, stat: str) -> \
+            pd.Series:
+        """Merge the minimum or maximum of the groups of two chunks.  Values
+        are only compared when both chunks have the group so columns of any
+        comparable type (i.e. strings) merge with the missing groups of either
+        chunk.
+
+        """
+        both: np.ndarray = (sa.notna() & sb.notna()).to_numpy()
+        take_b: np.ndarray = (sa.isna() & sb.notna()).to_numpy(copy=True)
+        if both.any():
+            a: np.ndarray = sa.to_numpy()[both]
+            b: np.ndarray = sb.to_numpy()[both]
+            take_b[both] = ((b < a) if stat == 'min' else (b > a)).astype(bool)
+        merged: pd.Series = sa.astype(object).where(~take_b, sb.astype(object))
+        return merged.infer_objects()
+
+    def _merge(self, a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+        """Merge the statistics of the groups of two chunks."""
+        a, b = a.align(b, join='outer')
+        merged: Dict[Tuple[str, str], pd.Series] = {}
+        col: str
+        stat: str
+        for col, stat in a.columns:
+            sa: pd.Series = a[(col, stat)]
+            sb: pd.Series = b[(col, stat)]
+            if stat in {'count', 'size', 'sum'}:
+                merged[(col, stat)] = sa.fillna(0) + sb.fillna(0)
+            elif stat in {'min', 'max'}:
+                merged[(col, stat)] = self._merge_extreme(sa, sb, stat)
+            elif stat == 'mean':
+                na: pd.Series = a[(col, 'count')].fillna(0)
+                nb: pd.Series = b[(col, 'count')].fillna(0)
+                n: pd.Series = na + nb
+                ma: pd.Series = sa.fillna(0)
+                delta: pd.Series = sb.fillna(0) - ma
+                merged[(col, 'mean')] = (ma + delta * nb / n).where(n > 0)
+                if (col, 'm2') in a.columns:
+                    merged[(col, 'm2')] = \
+                        a[(col, 'm2')].fillna(0) + \
+                        b[(col, 'm2')].fillna(0) + \
+                        (delta ** 2 * na * nb / n).where(n > 0, 0)
+        return pd.DataFrame(merged, columns=a.columns)
+
+    def _combine_dtypes(self, a: np.dtype, b: np.dtype) -> np.dtype:
+        """Return the data type that holds the statistics of two chunks."""
+        if isinstance(a, np.dtype) and isinstance(b, np.dtype):
+            return np.result_type(a, b)
+        return a if a == b else np.dtype(object)
+
+    def _finalize(self, stats: pd.DataFrame,
+                  dtypes: Dict[Tuple[str, str], np.dtype]) -> pd.DataFrame:
+        """Compute the aggregations from the statistics of all groups."""
+        out: Dict[str, pd.Series] = {}
+        name: str
+        col: str
+        fn: str
+        for name, (col, fn) in self.columns.items():
+            vals: pd.Series
+            if fn in {'count', 'size'}:
+                vals = stats[(col, fn)].astype(np.int64)
+            elif fn in {'sum', 'min', 'max', 'mean'}:
+                vals = stats[(col, fn)]
+                dtype: np.dtype = dtypes[(col, fn)]
+                if dtype.kind in 'iub' and vals.notna().all():
+                    vals = vals.astype(dtype)
+            else:
+                n: pd.Series = stats[(col, 'count')]
+                vals = (stats[(col, 'm2')] / (n - 1)).where(n > 1)
+                if fn == 'std':
+                    vals = np.sqrt(vals)
+            out[name] = vals
+        return pd.DataFrame(out, index=stats.index).sort_index().reset_index()
+
+    def read_csv(self, path: Union[str, Path],
+                 read_params: Dict[str, Any] = None) -> pd.DataFrame:
+        """Read a CSV file in chunks and aggregate its rows.
+
+        :param path: the path to the CSV file
+
+        :param read_params: the keyword arguments given to
+                            :func:`pandas.read_csv`
+
+        :return: a dataframe with the group by columns followed by the
+                 aggregated columns
+
+        """
+        params: Dict[str, Any] = dict({} if read_params is None
+                                      else read_params)
+        stats: Dict[str, Set[str]] = self._get_stats()
+        if 'usecols' not in params:
+            cols: Set[str] = set(self.by) | set(stats.keys())
+            params['usecols'] = lambda c: c in cols
+        params['chunksize'] = self.chunk_size
+        reduced: pd.DataFrame = None
+        dtypes: Dict[Tuple[str, str], np.dtype] = {}
+        chunks: int = 0
+        chunk: pd.DataFrame
+        with pd.read_csv(path, **params) as reader:
+            for chunk in reader:
+                red: pd.DataFrame = self._reduce(chunk, stats)
+                key: Tuple[str, str]
+                dtype: np.dtype
+                for key, dtype in red.dtypes.items():
+                    if key in dtypes:
+                        dtype = self._combine_dtypes(dtypes[key], dtype)
+                    dtypes[key] = dtype
+                if reduced is None:
+                    reduced = red
+                else:
+                    reduced = self._merge(reduced, red)
+                chunks += 1
+        if reduced is None:
+            raise LatexTableError(f'No data to aggregate in {path}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'aggregated {chunks} chunks of {path} into ' +
+                         f'{len(reduced)} groups')
+        return self._finalize(reduced, dtypes)
@@ -5,16 +5,21 @@ only files that match *-table.yml are considered.
 
 """
 __author__ = 'Paul Landes'
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable
 from dataclasses import dataclass, field
 from collections.abc import Callable
+import sys
 import logging
 from itertools import chain
 from pathlib import Path
-from zensols.config import ConfigFactory
+from zensols.util import stdout
+from zensols.config import Configurable, ConfigFactory
 from zensols.cli import ApplicationError
-from .render import Renderable, RenderableFactory
-from . import OutputFormat, Table, DataFrameDescriber, DataDescriber
+from .render import Renderable, RenderableFactory, MakeDependency
+from .output import OutputWriter
+from . import OutputFormat
+if TYPE_CHECKING:
+    from . import Table, DataFrameDescriber
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +35,18 @@ class Application(object):
     renderable_factory: RenderableFactory = field()
     """Creates instances of :class:`.Renderable` from file paths."""
 
-    def _get_example(self) -> DataFrameDescriber:
+    def __post_init__(self):
+        # the --config file, which is added to make dependency files, is only
+        # set by the command line
+        config: Configurable = self.config_factory.config
+        self._config_path: Path = None
+        if config.has_option('config_path', 'config_cli'):
+            self._config_path = config.get_option_object(
+                'config_path', 'config_cli')
+
+    def _get_example(self) -> 'DataFrameDescriber':
         import pandas as pd
+        from .desc import DataFrameDescriber
         return DataFrameDescriber(
             name='roster',
             desc='Example dataframe using mock roster data.',
@@ -51,6 +66,22 @@ class Application(object):
         types: set[str] = set(map(lambda rt: rt.__name__, rend_type))
         return is_in
 
+    def _clear_output(self) -> OutputWriter:
+        output: OutputWriter = OutputWriter.default_instance()
+        output.clear()
+        return output
+
+    def _write_dependencies(self, renderable: Renderable,
+                            targets: tuple[Path, ...], dep_path: Path):
+        deps: Iterable[Path] = renderable.get_dependencies()
+        if self._config_path is not None:
+            deps = chain(deps, (self._config_path,))
+        MakeDependency(targets, tuple(deps)).save(dep_path)
+
+    def _report_output(self, output: OutputWriter):
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(str(output))
+
     def _get_renderables(self, input_path: Path, output_path: Path,
                          rend_type: type[Renderable] | set = None) -> \
             tuple[Renderable]:
@@ -95,35 +126,75 @@ class Application(object):
         return rend_out_path
 
     def generate_tables(self, input_path: Path, output_path: Path,
-                        output_format: OutputFormat = OutputFormat.table):
+                        output_format: OutputFormat = OutputFormat.table,
+                        incremental: bool = False, workers: int = 1,
+                        profile: bool = False, depends: bool = False):
         """Create LaTeX tables.
 
         :param input_path: YAML definitions or JSON serialized file
 
         :param output_path: output file or directory
 
+        :param incremental: only render tables whose inputs changed since the
+                            last run and rewrite files only when changed
+
+        :param workers: the number of processes used to format tables and save
+                        data describers
+
+        :param profile: print the tables and formatting stages that took the
+                        most time to standard error
+
+        :param depends: write a GNU make dependency file (``.d``) of the files
+                        read to render each output
+
         """
         from .latex import RenderableLatexTable
         from .hyperparam import RenderableHyperparamSet
         from .desc import RenderableDataFrameDescriber
+        from .profiler import TableProfiler
+        prof: TableProfiler = TableProfiler.default_instance()
+        if profile:
+            if workers > 1:
+                logger.warning('profiling formats tables in one process')
+                workers = 1
+            prof.enabled = True
         rts: type[Renderable] = {
             RenderableLatexTable,
             RenderableHyperparamSet,
             RenderableDataFrameDescriber}
         is_hyper: Callable = self._is_one_of(RenderableHyperparamSet)
+        is_table: Callable = self._is_one_of(RenderableLatexTable)
+        is_describer: Callable = self._is_one_of(RenderableDataFrameDescriber)
+        output: OutputWriter = self._clear_output()
         renderable: Renderable
         for renderable in self._get_renderables(input_path, output_path, rts):
             rend_out_path: Path = self._map_table_out_path(
                 input_path, output_path, renderable)
+            targets: tuple[Path, ...]
             if is_hyper(renderable):
                 hyper_renderable = self.renderable_factory('hyperparam')
                 hyper_renderable.path = renderable.path
-                hyper_renderable.render(rend_out_path, output_format)
+                targets = hyper_renderable.render(
+                    rend_out_path, output_format)
             else:
-                renderable.render(rend_out_path)
+                if is_table(renderable):
+                    renderable.incremental = incremental
+                    renderable.workers = workers
+                elif is_describer(renderable):
+                    renderable.workers = workers
+                targets = renderable.render(rend_out_path)
+            if depends and not stdout.is_stdout(rend_out_path):
+                self._write_dependencies(
+                    renderable, targets, rend_out_path.with_suffix('.d'))
+        self._report_output(output)
+        if profile:
+            prof.write(writer=sys.stderr)
+            prof.clear()
+            prof.enabled = False
 
     def generate_figures(self, input_path: Path, output_path: Path,
-                         output_image_format: str = None):
+                         output_image_format: str = None,
+                         depends: bool = False):
         """Generate figures.
 
         :param input_path: YAML definitions or JSON serialized file
@@ -132,11 +203,21 @@ class Application(object):
 
         :param output_image_format: the output format (defaults to ``svg``)
 
+        :param depends: write a GNU make dependency file (``.d``) of the files
+                        read to render each output
+
         """
         from .figure import RenderableFigure as RType
+        output: OutputWriter = self._clear_output()
         renderable: RType
         for renderable in self._get_renderables(input_path, output_path, RType):
-            renderable.render(output_path, image_format=output_image_format)
+            targets: tuple[Path, ...] = renderable.render(
+                output_path, image_format=output_image_format)
+            if depends:
+                dep_path: Path = output_path / f'{renderable.path.stem}.d' \
+                    if output_path.is_dir() else output_path.with_suffix('.d')
+                self._write_dependencies(renderable, targets, dep_path)
+        self._report_output(output)
 
     def list_figures(self, input_path: Path):
         """List figures.
@@ -155,6 +236,32 @@ class Application(object):
             for fig in renderable.get_figures():
                 print(fig.name)
 
+    def validate(self, input_path: Path):
+        """Check table and figure definitions without reading data or
+        rendering.
+
+        :param input_path: YAML definitions file or directory
+
+        """
+        from .latex import RenderableLatexTable
+        from .figure import RenderableFigure
+        from .validate import DefinitionValidator, ValidationIssue
+        validator: DefinitionValidator = self.config_factory(
+            'datdesc_definition_validator')
+        is_table: Callable = self._is_one_of(RenderableLatexTable)
+        issues: list[ValidationIssue] = []
+        renderable: Renderable
+        for renderable in self._get_renderables(
+                input_path, None, {RenderableLatexTable, RenderableFigure}):
+            issues.extend(validator.validate(
+                renderable.path, is_table(renderable)))
+        issue: ValidationIssue
+        for issue in issues:
+            print(issue)
+        if len(issues) > 0:
+            raise ApplicationError(
+                f'Found {len(issues)} problem(s) in definitions')
+
     def write_excel(self, input_path: Path, output_file: Path = None,
                     output_latex_format: bool = False):
         """Create an Excel file from table data.
@@ -167,6 +274,7 @@ class Application(object):
         :param output_latex_format: whether to output with LaTeX commands
 
         """
+        from .desc import DataDescriber
         if input_path.is_file() and \
            self.serial_file_regex.match(input_path.name):
             with open(input_path) as f:
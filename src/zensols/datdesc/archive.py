@@ -0,0 +1,453 @@
+"""A columnar binary archive format for :class:`.DataDescriber` instances.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import (
+    Tuple, Dict, List, Any, Iterable, Iterator, Sequence, Mapping, ClassVar,
+    Optional, Union
+)
+from dataclasses import dataclass, field
+import logging
+import json
+import struct
+import zipfile
+from zipfile import ZipFile, ZipInfo
+from io import BytesIO
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from . import DataDescriptionError
+from .desc import DataFrameDescriber, DataDescriber
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DescriberArchive(Sequence[DataFrameDescriber]):
+    """A zip file of :class:`.DataFrameDescriber` instances that are read when
+    first accessed.  The archive has a ``manifest.json`` entry with the name,
+    description and metadata of each describer, and a NumPy ``.npy`` array
+    entry for each column and index level of the describers' dataframes.
+
+    Numeric, boolean and date columns are written as their NumPy arrays.
+    Columns of only strings are written as their UTF-8 bytes, and all others
+    as the UTF-8 bytes of the JSON encoded value of each cell, so no entry is
+    pickled.  The bytes of these columns are written with an array of the
+    offset of each cell, so their size is that of the text rather than the
+    number of rows times the longest cell.  Columns with pandas extension
+    dtypes (i.e. ``Int64`` or time zone aware dates) are converted back to
+    their dtype when read.  Entries are not compressed, which allows numeric
+    columns to be memory mapped from the archive file rather than read (see
+    :obj:`mmap`).
+
+    Instances are sequences of describers in the order they were written, and
+    :obj:`describers_by_name` is a mapping that reads only the describers it
+    is given.
+
+    """
+    MANIFEST_NAME: ClassVar[str] = 'manifest.json'
+    """The name of the archive's describer metadata entry."""
+
+    VERSION: ClassVar[int] = 2
+    """The version of the archive format."""
+
+    _ARRAY_KINDS: ClassVar[str] = 'biufcmM'
+    """The NumPy dtype kinds written as (and mapped from) their arrays."""
+
+    _MMAP_KINDS: ClassVar[str] = 'biufc'
+    """The NumPy dtype kinds that are memory mapped."""
+
+    _DATE_TIME: ClassVar[Tuple[int, ...]] = (1980, 1, 1, 0, 0, 0)
+    """The time stamp of each entry, which is constant so archives of the same
+    data have the same content.
+
+    """
+    _LOCAL_HEADER: ClassVar[struct.Struct] = struct.Struct('<4s22xHH')
+    """The signature, file name length and extra field length of a zip local
+    file header.
+
+    """
+    path: Path = field()
+    """The archive file."""
+
+    mmap: bool = field(default=True)
+    """Whether to memory map numeric columns rather than read them.  Pages are
+    mapped copy-on-write, so the columns can be modified without changing the
+    archive.
+
+    """
+
+    def __post_init__(self):
+        with ZipFile(self.path) as zf:
+            self._manifest: Dict[str, Any] = json.loads(
+                zf.read(self.MANIFEST_NAME))
+        version: int = self._manifest.get('version')
+        if version != self.VERSION:
+            raise DataDescriptionError(
+                f"Unsupported archive version {version} in '{self.path}'")
+        self._describers: List[Optional[DataFrameDescriber]] = \
+            [None] * len(self._manifest['describers'])
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """The names of the describers in the archive."""
+        return tuple(map(lambda d: d['name'], self._manifest['describers']))
+
+    @property
+    def describers_by_name(self) -> Mapping[str, DataFrameDescriber]:
+        """The describers keyed by name, which are read on access."""
+        return _ArchiveDescribersByName(self)
+
+    def create_data_describer(self) -> DataDescriber:
+        """Return a data describer with this archive as its (lazily read)
+        describers.
+
+        """
+        return DataDescriber(
+            describers=self,
+            name=self._manifest['name'],
+            mangle_sheet_name=self._manifest['mangle_sheet_name'])
+
+    @staticmethod
+    def _to_json(obj: Any) -> Any:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if obj is pd.NA or obj is pd.NaT:
+            return None
+        return str(obj)
+
+    @classmethod
+    def _dumps(cls, obj: Any) -> str:
+        return json.dumps(obj, default=cls._to_json)
+
+    @staticmethod
+    def _pack(texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the UTF-8 bytes of ``texts`` and the offsets of each in the
+        bytes, which has one more element than ``texts``.
+
+        """
+        encoded: List[bytes] = list(map(
+            lambda s: s.encode('utf-8', 'surrogatepass'), texts))
+        offsets: np.ndarray = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64,
+                              count=len(encoded)), out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+    @staticmethod
+    def _unpack(data: np.ndarray, offsets: np.ndarray) -> List[str]:
+        """Return the text of each cell packed by :meth:`_pack`."""
+        buf: bytes = data.tobytes()
+        bounds: List[int] = offsets.tolist()
+        return list(map(
+            lambda i: buf[bounds[i]:bounds[i + 1]].decode(
+                'utf-8', 'surrogatepass'),
+            range(len(bounds) - 1)))
+
+    @classmethod
+    def _encode(cls, col: pd.Series) -> \
+            Tuple[str, np.ndarray, Optional[np.ndarray]]:
+        """Return the encoding name, array and (for text encodings) offsets of
+        a column's values.
+
+        """
+        dtype: Any = col.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in cls._ARRAY_KINDS:
+            return 'array', col.to_numpy(), None
+        encoding: str = 'json'
+        texts: Iterable[str]
+        if pd.api.types.infer_dtype(col, skipna=False) == 'string' and \
+           not col.isna().any():
+            encoding, texts = 'str', col
+        else:
+            texts = map(cls._dumps, col)
+        return (encoding, *cls._pack(texts))
+
+    @staticmethod
+    def _restore_dtype(entry: Dict[str, Any],
+                       vals: Union[pd.Series, pd.Index]) -> \
+            Union[pd.Series, pd.Index]:
+        """Convert values not written as their NumPy array to the column's
+        (extension) dtype.
+
+        """
+        if entry['encoding'] != 'array' and entry['dtype'] != 'object':
+            vals = vals.astype(entry['dtype'])
+        return vals
+
+    @classmethod
+    def _decode(cls, encoding: str, arr: np.ndarray,
+                offsets: Optional[np.ndarray]) -> np.ndarray:
+        """Return the column values of an array encoded by :meth:`_encode`."""
+        if encoding == 'array':
+            return arr
+        texts: List[str] = cls._unpack(arr, offsets)
+        vals = np.empty(len(texts), dtype=object)
+        if encoding == 'str':
+            vals[:] = texts
+        elif encoding == 'json':
+            # assign by element so list values are not made another dimension
+            vals[:] = list(map(json.loads, texts))
+        else:
+            raise DataDescriptionError(f'Unknown column encoding: {encoding}')
+        return vals
+
+    @classmethod
+    def _write_array(cls, zf: ZipFile, name: str, arr: np.ndarray):
+        bio = BytesIO()
+        np.lib.format.write_array(bio, arr, allow_pickle=False)
+        info = ZipInfo(name, date_time=cls._DATE_TIME)
+        info.compress_type = zipfile.ZIP_STORED
+        zf.writestr(info, bio.getvalue())
+
+    @classmethod
+    def _write_columns(cls, zf: ZipFile, prefix: str,
+                       cols: Iterable[Tuple[Any, pd.Series]]) -> \
+            List[Dict[str, Any]]:
+        """Write the arrays of each column and return their manifest entries.
+
+        """
+        entries: List[Dict[str, Any]] = []
+        cix: int
+        name: Any
+        col: pd.Series
+        for cix, (name, col) in enumerate(cols):
+            entry: str = f'{prefix}/{cix}.npy'
+            offsets_entry: Optional[str] = None
+            encoding: str
+            arr: np.ndarray
+            offsets: Optional[np.ndarray]
+            encoding, arr, offsets = cls._encode(col)
+            cls._write_array(zf, entry, arr)
+            if offsets is not None:
+                offsets_entry = f'{prefix}/{cix}.offsets.npy'
+                cls._write_array(zf, offsets_entry, offsets)
+            entries.append({
+                'name': name,
+                'entry': entry,
+                'offsets': offsets_entry,
+                'encoding': encoding,
+                'dtype': str(col.dtype)})
+        return entries
+
+    @classmethod
+    def _write_describer(cls, zf: ZipFile, dix: int,
+                         dfd: DataFrameDescriber) -> Dict[str, Any]:
+        df: pd.DataFrame = dfd.df
+        meta: pd.DataFrame = dfd.meta
+        index: pd.Index = df.index
+        index_range: Optional[Tuple[int, int, int]] = None
+        index_cols: List[Tuple[Any, pd.Series]] = []
+        if isinstance(index, pd.RangeIndex):
+            # only the bounds of the default index are needed
+            index_range = (index.start, index.stop, index.step)
+        elif isinstance(index, pd.MultiIndex):
+            index_cols.extend(map(
+                lambda i: (index.names[i],
+                           index.get_level_values(i).to_series()),
+                range(index.nlevels)))
+        else:
+            index_cols.append((index.name, index.to_series()))
+        index_meta: Optional[List[Tuple[Any, str]]] = None
+        if dfd.index_meta is not None:
+            index_meta = list(dfd.index_meta.items())
+        return {
+            'name': dfd.name,
+            'desc': dfd.desc,
+            'head': dfd.head,
+            'meta_path': dfd.meta_path,
+            'meta': {
+                'index': meta.index.to_list(),
+                'index_name': meta.index.name,
+                'columns': meta.columns.to_list(),
+                'data': meta.values.tolist()},
+            'table_kwargs': dfd.table_kwargs,
+            'index_meta': index_meta,
+            'mangle_file_names': dfd.mangle_file_names,
+            'rows': len(df),
+            'columns': cls._write_columns(
+                zf, f'{dix}/column', df.items()),
+            'index_range': index_range,
+            'index_name': index.name,
+            'index': cls._write_columns(zf, f'{dix}/index', index_cols)}
+
+    @classmethod
+    def write(cls, dd: DataDescriber, output: Union[Path, Any]):
+        """Write a data describer as an archive.
+
+        :param dd: the data describer to write
+
+        :param output: the archive file or binary file like object
+
+        """
+        with ZipFile(output, 'w') as zf:
+            manifest: Dict[str, Any] = {
+                'version': cls.VERSION,
+                'name': dd.name,
+                'mangle_sheet_name': dd.mangle_sheet_name,
+                'describers': list(map(
+                    lambda t: cls._write_describer(zf, *t),
+                    enumerate(dd.describers)))}
+            info = ZipInfo(cls.MANIFEST_NAME, date_time=cls._DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, json.dumps(
+                manifest, indent=2, default=cls._to_json))
+
+    def _map_array(self, info: ZipInfo) -> Optional[np.ndarray]:
+        """Memory map an uncompressed array entry, or return ``None`` if it
+        can not be mapped.
+
+        """
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(info.header_offset)
+            sig: bytes
+            name_len: int
+            extra_len: int
+            sig, name_len, extra_len = self._LOCAL_HEADER.unpack(
+                f.read(self._LOCAL_HEADER.size))
+            if sig != b'PK\x03\x04':
+                raise DataDescriptionError(
+                    f"Bad zip entry '{info.filename}' in '{self.path}'")
+            f.seek(name_len + extra_len, 1)
+            version: Tuple[int, int] = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                header = np.lib.format.read_array_header_2_0(f)
+            else:
+                return None
+            shape: Tuple[int, ...]
+            fortran: bool
+            dtype: np.dtype
+            shape, fortran, dtype = header
+            if dtype.kind not in self._MMAP_KINDS or 0 in shape:
+                return None
+            return np.memmap(
+                self.path, dtype=dtype, mode='c', offset=f.tell(),
+                shape=shape, order='F' if fortran else 'C')
+
+    def _read_entry(self, zf: ZipFile, name: str, mmap: bool) -> np.ndarray:
+        info: ZipInfo = zf.getinfo(name)
+        arr: Optional[np.ndarray] = None
+        if mmap:
+            arr = self._map_array(info)
+        if arr is None:
+            with zf.open(info) as f:
+                arr = np.lib.format.read_array(
+                    BytesIO(f.read()), allow_pickle=False)
+        return arr
+
+    def _read_array(self, zf: ZipFile, entry: Dict[str, Any]) -> np.ndarray:
+        encoding: str = entry['encoding']
+        arr: np.ndarray = self._read_entry(
+            zf, entry['entry'], self.mmap and encoding == 'array')
+        offsets: Optional[np.ndarray] = None
+        if entry['offsets'] is not None:
+            offsets = self._read_entry(zf, entry['offsets'], False)
+        return self._decode(encoding, arr, offsets)
+
+    def _read_index(self, zf: ZipFile, data: Dict[str, Any]) -> pd.Index:
+        index_range: Optional[List[int]] = data.pop('index_range')
+        index_name: Any = data.pop('index_name')
+        entries: List[Dict[str, Any]] = data.pop('index')
+        if index_range is not None:
+            return pd.RangeIndex(*index_range, name=index_name)
+        levels: List[np.ndarray] = list(map(
+            lambda e: self._read_array(zf, e), entries))
+        indexes: List[pd.Index] = list(map(
+            lambda e, lv: self._restore_dtype(e, pd.Index(lv)),
+            entries, levels))
+        if len(indexes) == 1:
+            return indexes[0].rename(index_name)
+        return pd.MultiIndex.from_arrays(
+            indexes, names=list(map(lambda e: e['name'], entries)))
+
+    def _read_describer(self, dix: int) -> DataFrameDescriber:
+        data: Dict[str, Any] = dict(self._manifest['describers'][dix])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"reading describer '{data['name']}' " +
+                         f'from {self.path}')
+        entries: List[Dict[str, Any]] = data.pop('columns')
+        with ZipFile(self.path) as zf:
+            index: pd.Index = self._read_index(zf, data)
+            cols: List[np.ndarray] = list(map(
+                lambda e: self._read_array(zf, e), entries))
+        # columns are keyed by position since names need not be unique; a dict
+        # of columns is not consolidated, so mapped arrays are not copied
+        df = pd.DataFrame(dict(enumerate(cols)), index=index, copy=False)
+        df.columns = list(map(lambda e: e['name'], entries))
+        cix: int
+        entry: Dict[str, Any]
+        for cix, entry in enumerate(entries):
+            col: pd.Series = df.iloc[:, cix]
+            restored: pd.Series = self._restore_dtype(entry, col)
+            if restored is not col:
+                df.isetitem(cix, restored)
+        if len(df) != data.pop('rows'):
+            raise DataDescriptionError(
+                f"Bad row count for '{data['name']}' in '{self.path}'")
+        mdat: Dict[str, Any] = data.pop('meta')
+        meta = pd.DataFrame(
+            data=mdat['data'],
+            index=pd.Index(mdat['index'], name=mdat['index_name']),
+            columns=mdat['columns'])
+        index_meta: Optional[List[Tuple[Any, str]]] = data.pop('index_meta')
+        if index_meta is not None:
+            # pairs keep keys that are not strings
+            index_meta = dict(map(tuple, index_meta))
+        meta_path: Optional[str] = data.pop('meta_path')
+        return DataFrameDescriber(
+            df=df,
+            meta=meta,
+            index_meta=index_meta,
+            meta_path=None if meta_path is None else Path(meta_path),
+            **data)
+
+    def __getitem__(self, index: Union[int, slice]) -> \
+            Union[DataFrameDescriber, Tuple[DataFrameDescriber, ...]]:
+        if isinstance(index, slice):
+            return tuple(map(self.__getitem__,
+                             range(*index.indices(len(self)))))
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError(f'Describer index out of range: {index}')
+        dfd: Optional[DataFrameDescriber] = self._describers[index]
+        if dfd is None:
+            dfd = self._read_describer(index)
+            self._describers[index] = dfd
+        return dfd
+
+    def __len__(self) -> int:
+        return len(self._describers)
+
+    def __iter__(self) -> Iterator[DataFrameDescriber]:
+        return map(self.__getitem__, range(len(self)))
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+
+class _ArchiveDescribersByName(Mapping[str, DataFrameDescriber]):
+    """A mapping of names to the describers of an archive that reads only the
+    describers that are accessed.
+
+    """
+    def __init__(self, archive: DescriberArchive):
+        self._archive = archive
+        self._ixs: Dict[str, int] = dict(map(
+            lambda t: (t[1], t[0]), enumerate(archive.names)))
+
+    def __getitem__(self, name: str) -> DataFrameDescriber:
+        return self._archive[self._ixs[name]]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ixs
+
+    def __len__(self) -> int:
+        return len(self._ixs)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ixs)
@@ -0,0 +1,76 @@
+"""A process wide cache of compiled Python code used to evaluate table and
+figure code snippets.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import Callable, ClassVar
+from dataclasses import dataclass, field
+import logging
+from functools import lru_cache
+from types import CodeType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CodeCache(object):
+    """A least recently used cache of code compiled with :func:`compile` keyed
+    by the source text.  Code snippets, such as :obj:`.Table.code_pre`, are
+    evaluated by :func:`exec` for each table, so compiling the code once saves
+    parsing the same source over and over.
+
+    """
+    _DEFAULT_INSTANCE: ClassVar[CodeCache] = None
+    """The singleton instance when not created from a configuration factory."""
+
+    maxsize: int = field(default=1024)
+    """The maximum number of compiled code objects to keep."""
+
+    def __post_init__(self):
+        self._compile: Callable = lru_cache(maxsize=self.maxsize)(
+            self._compile_source)
+
+    @classmethod
+    def default_instance(cls: CodeCache) -> CodeCache:
+        """Get the singleton instance."""
+        if cls._DEFAULT_INSTANCE is None:
+            cls._DEFAULT_INSTANCE = cls()
+        return cls._DEFAULT_INSTANCE
+
+    @staticmethod
+    def _compile_source(source: str, filename: str) -> CodeType:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'compiling {filename}: {len(source)} characters')
+        return compile(source, filename, 'exec')
+
+    def compile(self, source: str, filename: str = '<string>') -> CodeType:
+        """Return the compiled code of ``source``, which is compiled only if
+        not already in the cache.
+
+        :param source: the Python source code to compile
+
+        :param filename: the file name used in tracebacks
+
+        :return: the code given to :func:`exec`
+
+        """
+        return self._compile(source, filename)
+
+    @property
+    def hits(self) -> int:
+        """The number of times code was found in the cache."""
+        return self._compile.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        """The number of times code was compiled."""
+        return self._compile.cache_info().misses
+
+    def clear(self):
+        """Clear the cache and reset the hit and miss counters."""
+        self._compile.cache_clear()
+
+    def __str__(self) -> str:
+        return (f'hits: {self.hits}, misses: {self.misses}, ' +
+                f'size: {self._compile.cache_info().currsize}')
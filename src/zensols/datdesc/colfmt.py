@@ -0,0 +1,460 @@
+"""Vectorized formatting of dataframe columns.  The methods in this module
+format an entire column at a time and give the same output as their per cell
+counterparts in :class:`.Table`.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import (
+    Tuple, Set, Dict, Any, Optional, ClassVar, Iterable, Callable, Sequence
+)
+from dataclasses import dataclass, field
+import re
+import string
+import itertools as it
+import numpy as np
+import pandas as pd
+from .domain import LatexTableError
+
+_round: Callable = round
+
+
+class ColumnFormatter(object):
+    """Formats numeric columns using :mod:`numpy` for masking and arithmetic,
+    and the C implementation of :func:`format` mapped over the values of the
+    column.  Each method returns a new :class:`pandas.Series` or ``None`` when
+    the column can not be formatted identically to the per cell formatting
+    (i.e. mixed string and numeric values), in which case the caller should
+    fall back to formatting each cell.
+
+    Null values are passed through as they are unless the per cell formatting
+    counterpart formats them as well.
+
+    """
+    _NUMERIC_KINDS: ClassVar[Set[str]] = frozenset(
+        'integer floating mixed-integer-float'.split())
+    """The :func:`pandas.api.types.infer_dtype` kinds that are formatted."""
+
+    _MAX_EXACT_INT: ClassVar[int] = 2 ** 53
+    """The largest integer exactly represented as a float."""
+
+    _FORMAT_SPEC_REGEX: ClassVar[re.Pattern] = re.compile(r'^\.\d+[fe]$')
+    """The f-string format specifications formatted as a single value."""
+
+    @classmethod
+    def _numeric(cls: type, col: pd.Series, allow_nan: bool = False) -> \
+            Optional[Tuple[np.ndarray, np.ndarray, str]]:
+        """Return the values of a column as floats.
+
+        :param col: the column to convert
+
+        :param allow_nan: whether to include float ``NaN`` values with the
+                          returned values, otherwise they are masked out
+
+        :return: a tuple of the (non-masked) float values, the mask of values
+                 to format and the :func:`~pandas.api.types.infer_dtype` kind,
+                 or ``None`` if the column can not be converted
+
+        """
+        kind: str = pd.api.types.infer_dtype(col, skipna=True)
+        if kind not in cls._NUMERIC_KINDS:
+            return None
+        mask: np.ndarray = col.notna().to_numpy()
+        if allow_nan:
+            nulls: np.ndarray = col.to_numpy()[~mask]
+            if not all(map(lambda v: isinstance(v, float), nulls)):
+                return None
+            mask = np.ones(len(col), dtype=bool)
+        vals: np.ndarray = col.to_numpy()[mask].astype(float)
+        if kind != 'floating':
+            fin: np.ndarray = vals[np.isfinite(vals)]
+            if len(fin) > 0 and np.abs(fin).max() >= cls._MAX_EXACT_INT:
+                return None
+        return vals, mask, kind
+
+    @staticmethod
+    def _format(vals: Iterable[Any], spec: str) -> np.ndarray:
+        """Format each value with format specification ``spec``."""
+        return np.array(list(map(format, vals, it.repeat(spec))), dtype=object)
+
+    @staticmethod
+    def _merge(col: pd.Series, mask: np.ndarray, vals: np.ndarray) -> \
+            pd.Series:
+        """Create a new column with ``vals`` at the ``mask`` positions of
+        ``col``.
+
+        """
+        arr: np.ndarray = col.to_numpy(dtype=object, copy=True)
+        arr[mask] = vals
+        return pd.Series(arr, index=col.index, name=col.name)
+
+    @staticmethod
+    def _is_precision(rnd: Any) -> bool:
+        """Whether ``rnd`` is usable as the number of decimal places."""
+        return isinstance(rnd, int) and not isinstance(rnd, bool) and rnd >= 0
+
+    @classmethod
+    def _parse_format(cls: type, fmt: str) -> Optional[Tuple[str, str, str]]:
+        """Parse an f-string with a single field ``v``.
+
+        :return: the text before the field, the format specification and the
+                 text after the field or ``None`` if ``fmt`` has any other
+                 fields
+
+        """
+        parts: Tuple[str, ...] = None
+        suffix: str = ''
+        try:
+            for lit, name, spec, conv in string.Formatter().parse(fmt):
+                if parts is not None:
+                    if name is not None:
+                        return None
+                    suffix += lit
+                elif name is None:
+                    return None
+                elif name != 'v' or conv is not None or \
+                        cls._FORMAT_SPEC_REGEX.match(spec) is None:
+                    return None
+                else:
+                    parts = (lit, spec)
+        except ValueError:
+            return None
+        return None if parts is None else (*parts, suffix)
+
+    @classmethod
+    def round(cls: type, col: pd.Series, rnd: int,
+              cutoff: Optional[float] = None) -> Optional[pd.Series]:
+        """Round a column to ``rnd`` decimal places.
+
+        :param col: the column to format
+
+        :param rnd: the number of decimal places
+
+        :param cutoff: if provided, round values greater than this number as
+                       integers
+
+        """
+        if not cls._is_precision(rnd):
+            return None
+        num: Tuple[np.ndarray, np.ndarray, str] = cls._numeric(col)
+        if num is None:
+            return None
+        vals, mask, _ = num
+        strs: np.ndarray = cls._format(vals.tolist(), f'.{rnd}f')
+        if cutoff is not None:
+            ints: np.ndarray = vals > cutoff
+            if ints.any():
+                ivals: np.ndarray = vals[ints]
+                if not np.isfinite(ivals).all():
+                    return None
+                strs[ints] = cls._format(map(int, np.rint(ivals)), '')
+        return cls._merge(col, mask, strs)
+
+    @classmethod
+    def percent(cls: type, col: pd.Series, rnd: Any) -> Optional[pd.Series]:
+        """Multiply a column by 100 and format it as a percent.
+
+        :param col: the column to format
+
+        :param rnd: the number of decimal places, or an f-string format with
+                    the value given as variable ``v``
+
+        """
+        fmt: Tuple[str, str, str]
+        if isinstance(rnd, str):
+            fmt = cls._parse_format(rnd)
+            if fmt is None:
+                return None
+        elif cls._is_precision(rnd):
+            fmt = ('', f'.{rnd}f', '\\%')
+        else:
+            return None
+        num: Tuple[np.ndarray, np.ndarray, str] = cls._numeric(col)
+        if num is None:
+            return None
+        vals, mask, _ = num
+        prefix, spec, suffix = fmt
+        strs: np.ndarray = cls._format((vals * 100).tolist(), spec)
+        if len(prefix) > 0:
+            strs = prefix + strs
+        if len(suffix) > 0:
+            strs = strs + suffix
+        return cls._merge(col, mask, strs)
+
+    @classmethod
+    def thousand(cls: type, col: pd.Series, apply_k: bool = True,
+                 add_comma: bool = True, round: int = None,
+                 max_k: int = 1_000) -> Optional[pd.Series]:
+        """Format a column as strings with comma separating thousands.  See
+        :meth:`.Table.format_thousand` for parameter documentation.
+
+        """
+        if round is not None and not cls._is_precision(round):
+            return None
+        num: Tuple[np.ndarray, np.ndarray, str] = cls._numeric(
+            col, allow_nan=True)
+        if num is None:
+            return None
+        vals, mask, kind = num
+        if kind == 'mixed-integer-float':
+            return None
+        is_int: bool = kind == 'integer'
+        nans: np.ndarray = np.isnan(vals)
+        if round is not None and not is_int:
+            vals = np.array(list(map(_round, vals.tolist(), it.repeat(round))))
+            is_int = round == 0
+            if is_int and np.isinf(vals).any():
+                return None
+        ints: np.ndarray = ~nans if is_int else np.zeros(len(vals), dtype=bool)
+        add_k: np.ndarray = np.zeros(len(vals), dtype=bool)
+        if apply_k:
+            add_k = vals > max_k
+            kvals: np.ndarray = vals[add_k] / 1000
+            if not np.isfinite(kvals).all():
+                return None
+            vals[add_k] = np.rint(kvals)
+            ints = ints | add_k
+        if np.abs(vals[ints]).max(initial=0) >= 2 ** 63:
+            return None
+        spec: str = ',' if add_comma else ''
+        strs: np.ndarray = np.empty(len(vals), dtype=object)
+        strs[~ints] = cls._format(vals[~ints].tolist(), spec)
+        strs[ints] = cls._format(vals[ints].astype(np.int64).tolist(), spec)
+        if add_k.any():
+            strs[add_k] = strs[add_k] + 'K'
+        return cls._merge(col, mask, strs)
+
+    @classmethod
+    def latex_scientific(cls: type, col: pd.Series, sig_digits: int = 1) -> \
+            Optional[pd.Series]:
+        """Format a column in LaTeX math mode scientific notation.  See
+        :meth:`.LatexTable.format_scientific`.
+
+        :param col: the column to format
+
+        :param sig_digits: the number of digits after the decimal point
+
+        """
+        if not cls._is_precision(sig_digits):
+            return None
+        num: Tuple[np.ndarray, np.ndarray, str] = cls._numeric(
+            col, allow_nan=True)
+        if num is None:
+            return None
+        vals, mask, _ = num
+        strs: np.ndarray = np.array(
+            list(map(format, vals.tolist(), it.repeat(f'.{sig_digits}e'))),
+            dtype=str)
+        parts: np.ndarray = np.char.partition(strs, 'e')
+        has_exp: np.ndarray = parts[:, 1] == 'e'
+        if has_exp.any():
+            base: np.ndarray = parts[has_exp, 0]
+            base = np.where(np.char.endswith(base, '.0'),
+                            np.char.rpartition(base, '.')[:, 0], base)
+            # same as int(exponent) by removing the sign and leading zeros
+            exp: np.ndarray = parts[has_exp, 2]
+            digits: np.ndarray = np.char.lstrip(np.char.lstrip(exp, '+-'), '0')
+            digits = np.where(digits == '', '0', digits)
+            exp = np.where(np.char.startswith(exp, '-'),
+                           np.char.add('-', digits), digits)
+            base = np.char.add(np.char.add(base, ' \\times 10^{'), exp)
+            strs = strs.astype(object)
+            strs[has_exp] = np.char.add(base, '}')
+        strs = np.char.add(np.char.add('$', strs.astype(str)), '$')
+        return cls._merge(col, mask, strs)
+
+
+class ColumnTransformer(object):
+    """Transforms the values of a column by calling a function once for each
+    unique value rather than for each cell.  The results are kept in a lookup
+    table, which is indexed by the codes of :func:`pandas.factorize` to create
+    the new column.  Columns with values :func:`pandas.factorize` might treat
+    as equal (i.e. ``1`` and ``1.0``) are transformed per cell.
+
+    """
+    _UNIQUE_KINDS: ClassVar[Set[str]] = frozenset(
+        'string integer floating boolean'.split())
+    """The :func:`pandas.api.types.infer_dtype` kinds transformed by unique
+    value.
+
+    """
+    _LATEX_SPECIAL_REGEX: ClassVar[re.Pattern] = re.compile(r'(?<!\\)([&_#$%])')
+    """Matches LaTeX special characters that are not already escaped."""
+
+    @classmethod
+    def map_values(cls: type, col: pd.Series, fn: Callable) -> pd.Series:
+        """Create a new column by applying ``fn`` to each value of ``col``,
+        which gives the same values as :meth:`pandas.Series.apply`.
+
+        :param col: the column to transform
+
+        :param fn: the function called with a value of the column
+
+        """
+        if len(col) == 0 or pd.api.types.infer_dtype(col, skipna=True) \
+           not in cls._UNIQUE_KINDS:
+            return col.apply(fn)
+        codes: np.ndarray
+        uniques: Any
+        codes, uniques = pd.factorize(col)
+        uniques = np.asarray(uniques).astype(object)
+        lookup: np.ndarray = np.empty(len(uniques), dtype=object)
+        lookup[:] = list(map(fn, uniques))
+        # nulls (i.e. None and NaN) are coded as -1 and transformed per cell
+        nulls: np.ndarray = codes < 0
+        vals: np.ndarray
+        if nulls.any():
+            vals = np.empty(len(codes), dtype=object)
+            vals[~nulls] = lookup[codes[~nulls]]
+            vals[nulls] = list(map(fn, col.to_numpy(dtype=object)[nulls]))
+        else:
+            vals = lookup[codes]
+        return pd.Series(vals, index=col.index, name=col.name).infer_objects()
+
+    @classmethod
+    def replace(cls: type, col: pd.Series, repl: Dict[Any, Any]) -> pd.Series:
+        """Replace the values of a column found as keys in ``repl`` with the
+        respective ``repl`` value.
+
+        """
+        return cls.map_values(col, lambda v: repl.get(v, v))
+
+    @classmethod
+    def capitalize(cls: type, col: pd.Series, capwords: bool) -> pd.Series:
+        """Capitalize the first word, or each word if ``capwords`` is
+        ``True``, of each value in a column of strings.
+
+        """
+        fn: Callable = string.capwords if capwords else str.capitalize
+        return cls.map_values(col, fn)
+
+    @classmethod
+    def escape_percent(cls: type, col: pd.Series) -> pd.Series:
+        """Escape the percent signs in a column of strings for LaTeX."""
+        return cls.map_values(col, lambda s: s.replace('%', '\\%'))
+
+    @classmethod
+    def escape_latex(cls: type, col: pd.Series) -> pd.Series:
+        """Escape LaTeX special characters ``&``, ``_``, ``#``, ``$`` and ``%``
+        not already escaped in the string values of a column.  Other values
+        are left as is.
+
+        """
+        regex: re.Pattern = cls._LATEX_SPECIAL_REGEX
+
+        def escape(v: Any) -> Any:
+            if isinstance(v, str):
+                v = regex.sub(r'\\\1', v)
+            return v
+
+        return cls.map_values(col, escape)
+
+
+@dataclass
+class CellEmphasis(object):
+    """Emphasizes the cells with the highest (or lowest) values of columns, or
+    of the columns of each row, by boolean masks computed over the whole
+    column or frame.  Ties are broken by the first occurrence.
+
+    """
+    _STYLES: ClassVar[Dict[str, str]] = {
+        'bold': '\\textbf{{',
+        'italic': '\\textit{{',
+        'color': '\\textcolor{{{color}}}{{'}
+    """The LaTeX command opening the emphasized value of each style."""
+
+    _MODES: ClassVar[Set[str]] = frozenset('max min'.split())
+    """The emphasized values of the ranked cells."""
+
+    _AXES: ClassVar[Set[str]] = frozenset('column row'.split())
+    """Whether cells are ranked by column or across the columns of each row."""
+
+    columns: Sequence[str] = field()
+    """The names of the columns to rank."""
+
+    mode: str = field(default='max')
+    """Whether to emphasize the greatest (``max``) or least (``min``) values."""
+
+    k: int = field(default=1)
+    """The number of cells to emphasize in each column or row."""
+
+    axis: str = field(default='column')
+    """Whether to rank cells in each ``column`` or across the :obj:`columns`
+    of each ``row``.
+
+    """
+    style: str = field(default='bold')
+    """The emphasis, which is one of ``bold``, ``italic`` or ``color``."""
+
+    color: str = field(default='red')
+    """The color of the ``color`` :obj:`style`, which needs the ``xcolor``
+    LaTeX package.
+
+    """
+    def __post_init__(self):
+        for name, val, vals in (('mode', self.mode, self._MODES),
+                                ('axis', self.axis, self._AXES),
+                                ('style', self.style, self._STYLES.keys())):
+            if val not in vals:
+                raise LatexTableError(
+                    f"Unknown emphasis {name}: '{val}', expecting one of: " +
+                    ', '.join(sorted(vals)))
+        if not isinstance(self.k, int) or self.k < 1:
+            raise LatexTableError(f'Emphasis k must be positive: {self.k}')
+
+    @property
+    def prefix(self) -> str:
+        """The LaTeX command opening the emphasized value."""
+        return self._STYLES[self.style].format(color=self.color)
+
+    def create_mask(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Return the cells to emphasize.
+
+        :param df: the data with the values to rank
+
+        :return: the column names with the row positions to emphasize as
+                 boolean masks
+
+        """
+        ascending: bool = self.mode == 'min'
+        ranks: pd.DataFrame
+        if self.axis == 'column':
+            ranks = pd.DataFrame({c: df[c].rank(
+                method='first', ascending=ascending) for c in self.columns})
+        else:
+            vals: pd.DataFrame = df[list(self.columns)].apply(
+                pd.to_numeric, errors='coerce')
+            ranks = vals.rank(axis=1, method='first', ascending=ascending)
+        mask: np.ndarray = (ranks <= self.k).to_numpy()
+        return dict(zip(ranks.columns, mask.T))
+
+    @staticmethod
+    def apply(df: pd.DataFrame, masks: Dict[int, np.ndarray],
+              prefix: str = '\\textbf{', suffix: str = '}') -> pd.DataFrame:
+        """Emphasize cells by surrounding their string value.  The columns of
+        the emphasized cells are cast and copied so other dataframes that
+        share the column data are unchanged.
+
+        :param df: the dataframe to modify in place
+
+        :param masks: the column positions with the row positions to emphasize
+                      as boolean masks
+
+        :param prefix: the text added before the cell values, which defaults
+                       to bold
+
+        :param suffix: the text added after the cell values
+
+        :return: ``df``
+
+        """
+        col: int
+        mask: np.ndarray
+        for col, mask in masks.items():
+            if not mask.any():
+                continue
+            vals: np.ndarray = df.iloc[:, col].to_numpy(dtype=object, copy=True)
+            vals[mask] = prefix + vals[mask].astype(str).astype(object) + \
+                suffix
+            df.isetitem(col, vals)
+        return df
@@ -0,0 +1,199 @@
+"""A process wide cache of dataframes read from CSV files.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import (
+    Dict, Tuple, Any, Union, Optional, ClassVar, Hashable, FrozenSet
+)
+from dataclasses import dataclass, field
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ColumnSelector(object):
+    """A ``usecols`` :func:`pandas.read_csv` parameter that selects columns by
+    name.  Unlike a list of names, columns not found in the CSV file are
+    ignored rather than raising an error.  Instances with the same columns are
+    equal so they can be used as cache keys.
+
+    """
+    columns: FrozenSet[str] = field()
+    """The names of the columns to read."""
+
+    def __call__(self, name: str) -> bool:
+        return name in self.columns
+
+
+@dataclass
+class DataFrameCache(object):
+    """A least recently used cache of dataframes read with
+    :func:`pandas.read_csv`, which is used by all :class:`.Table` instances so
+    a CSV file used by several tables is parsed once.  Entries are keyed by the
+    resolved path, the file's modification time and size, and the
+    ``read_csv`` keyword arguments so changed files are read again.
+
+    Each call to :meth:`read_csv` returns a copy of the cached dataframe so
+    tables that modify their dataframe in place leave the cached dataframe
+    unchanged.  When pandas Copy-on-Write is on (see :obj:`copy_on_write`),
+    the copy is shallow so the tables share the cached data, which is only
+    copied when modified.  Otherwise, dataframes can not be safely shared and
+    each is a deep copy.
+
+    """
+    _DEFAULT_INSTANCE: ClassVar[DataFrameCache] = None
+    """The singleton instance when not created from a configuration factory."""
+
+    max_bytes: int = field(default=512 * 1024 ** 2)
+    """The maximum memory, in bytes, of the cached dataframes.  Dataframes
+    larger than this are not cached.
+
+    """
+    copy_on_write: bool = field(default=False)
+    """Whether to turn on the process wide pandas Copy-on-Write mode so cached
+    dataframes are shared rather than copied.
+
+    """
+    def __post_init__(self):
+        if self.copy_on_write:
+            pd.set_option('mode.copy_on_write', True)
+        self._entries: OrderedDict[Tuple, Tuple[pd.DataFrame, int]] = \
+            OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @classmethod
+    def default_instance(cls: DataFrameCache) -> DataFrameCache:
+        """Get the singleton instance."""
+        if cls._DEFAULT_INSTANCE is None:
+            cls._DEFAULT_INSTANCE = cls()
+        return cls._DEFAULT_INSTANCE
+
+    @classmethod
+    def set_default_instance(cls: DataFrameCache, inst: DataFrameCache):
+        """Set the singleton instance used by all tables, such as one created
+        from the application configuration.
+
+        """
+        cls._DEFAULT_INSTANCE = inst
+
+    @classmethod
+    def _freeze(cls: type, obj: Any) -> Hashable:
+        """Return a hashable version of ``obj`` used as a key."""
+        if isinstance(obj, Dict):
+            return tuple(sorted(
+                map(lambda kv: (kv[0], cls._freeze(kv[1])), obj.items()),
+                key=lambda kv: str(kv[0])))
+        if isinstance(obj, (list, tuple)):
+            return tuple(map(cls._freeze, obj))
+        if isinstance(obj, (set, frozenset)):
+            return frozenset(map(cls._freeze, obj))
+        hash(obj)
+        return obj
+
+    def _get_key(self, path: Path, read_params: Dict[str, Any]) -> \
+            Optional[Tuple]:
+        """Return the cache key, or ``None`` if the data can not be cached."""
+        try:
+            params: Hashable = self._freeze(read_params)
+            stat: os.stat_result = path.stat()
+        except (TypeError, OSError):
+            return None
+        return (str(path.resolve()), stat.st_mtime_ns, stat.st_size, params)
+
+    def _get_projection(self, path: Path, read_params: Dict[str, Any]) -> \
+            Optional[pd.DataFrame]:
+        """Return the columns selected by a :class:`.ColumnSelector` from an
+        already cached dataframe of all columns.
+
+        """
+        usecols: Any = read_params.get('usecols')
+        if isinstance(usecols, ColumnSelector):
+            params: Dict[str, Any] = dict(read_params)
+            del params['usecols']
+            entry: Tuple[pd.DataFrame, int] = self._entries.get(
+                self._get_key(Path(path), params))
+            if entry is not None:
+                df: pd.DataFrame = entry[0]
+                return df[list(filter(usecols, df.columns))]
+        return None
+
+    @staticmethod
+    def _copy(df: pd.DataFrame) -> pd.DataFrame:
+        """Return a copy of a cached dataframe that can be modified without
+        changing the cached dataframe.
+
+        """
+        if int(pd.__version__.split('.')[0]) >= 3 or \
+           pd.get_option('mode.copy_on_write') is True:
+            return df.copy(deep=False)
+        return df.copy()
+
+    @property
+    def size(self) -> int:
+        """The memory, in bytes, of the cached dataframes."""
+        return sum(map(lambda e: e[1], self._entries.values()))
+
+    def read_csv(self, path: Union[str, Path],
+                 read_params: Dict[str, Any] = None) -> pd.DataFrame:
+        """Read a CSV file or get it from the cache.
+
+        :param path: the path to the CSV file
+
+        :param read_params: the keyword arguments given to
+                            :func:`pandas.read_csv`
+
+        :return: a copy of the (possibly cached) dataframe
+
+        """
+        read_params = {} if read_params is None else read_params
+        key: Tuple = None
+        if isinstance(path, (str, Path)) and Path(path).is_file():
+            key = self._get_key(Path(path), read_params)
+        if key is None:
+            return pd.read_csv(path, **read_params)
+        with self._lock:
+            entry: Tuple[pd.DataFrame, int] = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[0])
+            df: pd.DataFrame = self._get_projection(path, read_params)
+            if df is not None:
+                self.hits += 1
+                return df
+            self.misses += 1
+        df: pd.DataFrame = pd.read_csv(path, **read_params)
+        nbytes: int = int(df.memory_usage(deep=True).sum())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'read {path}: {df.shape}, {nbytes} bytes')
+        if nbytes <= self.max_bytes:
+            with self._lock:
+                self._entries[key] = (df, nbytes)
+                total: int = self.size
+                while total > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    total -= evicted
+        return self._copy(df)
+
+    def clear(self):
+        """Clear the cache and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        return (f'hits: {self.hits}, misses: {self.misses}, ' +
+                f'entries: {len(self)}, bytes: {self.size}')
@@ -7,16 +7,18 @@ from typing import (
     Tuple, Any, Dict, List, Set, Sequence, Mapping,
     ClassVar, Optional, Iterable, Union, Type
 )
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 import logging
 import sys
 from frozendict import frozendict
 import itertools as it
 import textwrap as tw
 import parse
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 from io import StringIO, TextIOBase, TextIOWrapper
 import json
 from pathlib import Path
+from datetime import datetime, date
 import pandas as pd
 import openpyxl as ox
 from openpyxl.workbook import Workbook
@@ -24,6 +26,7 @@ from tabulate import tabulate
 from zensols.config import Dictable
 from zensols.persist import PersistableContainer, persisted, FileTextUtil
 from .render import Renderable
+from .output import OutputWriter
 from . import DataDescriptionError, Table, TableFactory
 
 logger = logging.getLogger(__name__)
@@ -37,6 +40,16 @@ class DataFrameDescriber(PersistableContainer, Dictable):
     """
     _PERSITABLE_PROPERTIES: ClassVar[Set[str]] = {'_meta_val'}
     _TABLE_FORMAT: ClassVar[str] = '{name}Tab'
+    _JSON_FRAMES: ClassVar[Tuple[str, ...]] = ('df', 'meta')
+    _TABLE_DESCRIBER_PARAMS: ClassVar[Tuple[str, ...]] = \
+        ('head', 'path', 'caption', 'column_renames')
+    _TABLE_DEFINITIONS: ClassVar[Dict[str, Dict[str, Any]]] = {}
+    """Serialized prototype tables keyed by :obj:`table_kwargs`."""
+
+    _TABLE_DEFINITIONS_FACTORY: ClassVar[TableFactory] = None
+    """The factory that created the :obj:`_TABLE_DEFINITIONS` tables."""
+    _JSON_SPLIT_KEYS: ClassVar[Set[str]] = \
+        frozenset('columns index data'.split())
 
     name: str = field()
     """The description of the data this describer holds."""
@@ -318,9 +331,8 @@ class DataFrameDescriber(PersistableContainer, Dictable):
     def save_csv(self, output_dir: Path = Path('.')) -> Path:
         """Save as a CSV file using :obj:`csv_path`."""
         out_file: Path = output_dir / self.csv_path
-        self.df.to_csv(out_file)
-        if logger.isEnabledFor(logging.INFO):
-            logger.info(f'wrote: {out_file}')
+        with OutputWriter.default_instance().path(out_file) as temp:
+            self.df.to_csv(temp)
         return out_file
 
     def save_excel(self, output_path: Path = Path('.'),
@@ -360,13 +372,7 @@ class DataFrameDescriber(PersistableContainer, Dictable):
 
         """
         fac: TableFactory = TableFactory.default_instance()
-        params: Dict[str, Any] = dict(
-            head=self.head,
-            path=self.csv_path,
-            caption=self.desc,
-            column_renames=dict(filter(
-                lambda x: x[1] is not None,
-                self.column_descriptions.items())))
+        params: Dict[str, Any] = self._get_table_params()
         params.update(self.table_kwargs)
         params.update(kwargs)
         table: Table = fac.create(**params)
@@ -375,6 +381,66 @@ class DataFrameDescriber(PersistableContainer, Dictable):
         table.dataframe = self.df
         return table
 
+    def _get_table_params(self) -> Dict[str, Any]:
+        return dict(
+            head=self.head,
+            path=self.csv_path,
+            caption=self.desc,
+            column_renames=dict(filter(
+                lambda x: x[1] is not None,
+                self.column_descriptions.items())))
+
+    def create_table_definition(self, path: Path) -> Dict[str, Any]:
+        """Create the serialized table definition written by
+        :meth:`.TableFactory.to_file` for the table created by
+        :meth:`create_table`.  Rather than creating a table for each
+        describer, a prototype table is created and serialized once for each
+        distinct :obj:`table_kwargs`, and its caption, head, path and column
+        names are replaced with those of this instance.
+
+        :param path: the :obj:`.Table.path` of the table
+
+        :return: the table definition keyed by the table name
+
+        """
+        cls: Type = self.__class__
+        fac: TableFactory = TableFactory.default_instance()
+        if cls._TABLE_DEFINITIONS_FACTORY is not fac:
+            cls._TABLE_DEFINITIONS.clear()
+            cls._TABLE_DEFINITIONS_FACTORY = fac
+        key: str = json.dumps(self.table_kwargs, sort_keys=True, default=repr)
+        proto: Dict[str, Any] = cls._TABLE_DEFINITIONS.get(key)
+        if proto is None:
+            # placeholders keep the position of the parameters in the output
+            tab: Table = fac.create(**(dict(
+                head='head',
+                path=Path('path'),
+                caption='caption',
+                column_renames={'column': 'column'}) | self.table_kwargs))
+            # serializing formats the data for the (excluded) columns
+            tab.dataframe = self.df
+            proto = tab.asflatdict(format='serial')
+            del proto['name']
+            cls._TABLE_DEFINITIONS[key] = proto
+        params: Dict[str, Any] = self._get_table_params()
+        params['path'] = str(path)
+        tab_def: Dict[str, Any] = {}
+        k: str
+        v: Any
+        for k, v in proto.items():
+            # the path is always replaced, but keyword arguments have
+            # precedence for the other parameters
+            if k == 'path' or (k in cls._TABLE_DESCRIBER_PARAMS and
+                               k not in self.table_kwargs):
+                v = params[k]
+                # defaults are not serialized
+                if v is None or (isinstance(v, dict) and len(v) == 0):
+                    continue
+            tab_def[k] = v
+        name: str = self._TABLE_FORMAT.format(
+            name=self.get_table_name('camel'))
+        return {name: tab_def}
+
     @classmethod
     def from_table(cls: Type, table: Table) -> DataFrameDescriber:
         """Create a frame descriptor from a :class:`.Table`."""
@@ -485,13 +551,44 @@ class DataFrameDescriber(PersistableContainer, Dictable):
         dct['meta'] = json.loads(self.meta.to_json())
         return dct
 
+    def _write_json(self, writer: TextIOBase):
+        """Write this instance as JSON with the dataframes in the ``split``
+        orientation, which are written directly to ``writer``.
+
+        """
+        writer.write('{')
+        fld: Any
+        for fld in fields(self):
+            if fld.name not in self._JSON_FRAMES:
+                writer.write(json.dumps(fld.name) + ': ')
+                writer.write(json.dumps(getattr(self, fld.name), default=str))
+                writer.write(', ')
+        name: str
+        for i, name in enumerate(self._JSON_FRAMES):
+            if i > 0:
+                writer.write(', ')
+            writer.write(json.dumps(name) + ': ')
+            getattr(self, name).to_json(writer, orient='split')
+        writer.write('}')
+
+    @classmethod
+    def _frame_from_json(cls: Type, data: Dict[str, Any]) -> pd.DataFrame:
+        if data.keys() == cls._JSON_SPLIT_KEYS and \
+           isinstance(data['columns'], list):
+            return pd.DataFrame(
+                data=data['data'],
+                index=data['index'],
+                columns=data['columns'])
+        # the column oriented form written by previous versions
+        return pd.read_json(StringIO(json.dumps(data)))
+
     @classmethod
     def _from_json(cls: Type, data: Dict[str, Any]):
         df: Dict[str, Any] = data.pop('df')
         meta: Dict[str, Any] = data.pop('meta')
         return DataFrameDescriber(
-            df=pd.read_json(StringIO(json.dumps(df))),
-            meta=pd.read_json(StringIO(json.dumps(meta))),
+            df=cls._frame_from_json(df),
+            meta=cls._frame_from_json(meta),
             **data)
 
     def __str__(self) -> str:
@@ -510,6 +607,24 @@ class DataFrameDescriber(PersistableContainer, Dictable):
 DataFrameDescriber.meta = DataFrameDescriber._meta
 
 
+def _save_describer(desc: DataFrameDescriber, csv_dir: Path, yaml_dir: Path) \
+        -> Tuple[Path, Path, List[Path], List[Path]]:
+    """Save the CSV and YAML files of a describer in a worker process.
+
+    :return: the CSV and YAML files, and the files written and skipped
+             (unchanged) by the worker's :class:`.OutputWriter`
+
+    """
+    output: OutputWriter = OutputWriter.default_instance()
+    n_written: int = len(output.written)
+    n_skipped: int = len(output.skipped)
+    csv_file: Path = DataDescriber._save_describer_csv(output, desc, csv_dir)
+    yaml_file: Path = DataDescriber._save_describer_yaml(
+        TableFactory.default_instance(), output, desc, csv_dir, yaml_dir)
+    return (csv_file, yaml_file, output.written[n_written:],
+            output.skipped[n_skipped:])
+
+
 @dataclass(repr=False)
 class DataDescriber(PersistableContainer, Dictable):
     """Container class for :class:`.DataFrameDescriber` instances.  It also
@@ -523,9 +638,31 @@ class DataDescriber(PersistableContainer, Dictable):
     SHEET_NAME_MAXLEN: ClassVar[int] = 31
     """Maximum allowed characters in an Excel spreadsheet's name."""
 
-    describers: Tuple[DataFrameDescriber, ...] = field()
-    """The contained dataframe and metadata."""
+    SHEET_MAX_ROWS: ClassVar[int] = 1_048_576
+    """Maximum allowed rows, including the header, in an Excel spreadsheet."""
+
+    EXCEL_CONSTANT_MEMORY_ROWS: ClassVar[int] = 100_000
+    """The number of rows of a describer's dataframe over which
+    :meth:`save_excel` streams rows to the Excel file by default.
 
+    """
+    EXCEL_CHUNK_ROWS: ClassVar[int] = 10_000
+    """The number of rows converted and written at a time when streaming to an
+    Excel file.
+
+    """
+    EXCEL_WIDTH_SAMPLE_ROWS: ClassVar[int] = 1_000
+    """The number of rows sampled to estimate column widths when streaming to
+    an Excel file.
+
+    """
+
+    describers: Sequence[DataFrameDescriber] = field()
+    """The contained dataframe and metadata.  This is a
+    :class:`~.archive.DescriberArchive` for instances created with
+    :meth:`from_archive`, which reads each describer when first accessed.
+
+    """
     name: str = field(default='default')
     """The name of the dataset."""
 
@@ -538,6 +675,10 @@ class DataDescriber(PersistableContainer, Dictable):
     @persisted('_describers_by_name', transient=True)
     def describers_by_name(self) -> Dict[str, DataFrameDescriber]:
         """Data frame describers keyed by the describer name."""
+        from .archive import DescriberArchive
+        if isinstance(self.describers, DescriberArchive):
+            # only read the describers that are accessed
+            return self.describers.describers_by_name
         return frozendict(dict(map(lambda t: (t.name, t), self.describers)))
 
     def derive(self, **kwargs) -> DataDescriber:
@@ -590,58 +731,155 @@ class DataDescriber(PersistableContainer, Dictable):
         return summary
 
     @staticmethod
-    def _get_col_widths(df: pd.DataFrame, min_col: int = 100):
-        # we concatenate this to the max of the lengths of column name and
-        # its values for each column, left to right
-        return [max([min(min_col, len(str(s))) for s in df[col].values] +
-                    [len(col)]) for col in df.columns]
+    def _get_col_widths(df: pd.DataFrame, min_col: int = 100,
+                        sample_size: int = None) -> List[int]:
+        """Return the width of each column, left to right, as the max of the
+        lengths of the column name and its values (truncated to ``min_col``).
 
-    def save_excel(self, output_file: Path) -> Path:
+        :param sample_size: if given, estimate the widths from about this many
+                            evenly spaced rows
+
+        """
+        if sample_size is not None and len(df) > sample_size:
+            df = df.iloc[::len(df) // sample_size]
+        widths: List[int] = []
+        col: str
+        for col in df.columns:
+            lens: pd.Series = df[col].astype(str).str.len()
+            width: int = 0 if len(lens) == 0 else \
+                int(lens.clip(upper=min_col).max())
+            widths.append(max(width, len(str(col))))
+        return widths
+
+    def save_excel(self, output_file: Path,
+                   constant_memory: bool = None) -> Path:
         """Save all provided dataframe describers to an Excel file.
 
         :param output_file: the Excel file to write; ``.xlsx`` will be postpend
                             if no extension exists
 
+        :param constant_memory: whether to stream rows to the file with
+                                XlsxWriter's ``constant_memory`` mode so the
+                                workbook is not kept in memory; if ``None``,
+                                stream when a dataframe has more than
+                                :obj:`EXCEL_CONSTANT_MEMORY_ROWS` rows
+
         """
-        from xlsxwriter.worksheet import Worksheet
         if output_file.is_dir():
             output_file = output_file / self.name
         if len(output_file.suffix) == 0:
             output_file = output_file.parent / f'{output_file.name}.xlsx'
+        if constant_memory is None:
+            constant_memory = any(map(
+                lambda d: len(d.df) > self.EXCEL_CONSTANT_MEMORY_ROWS,
+                self.describers))
+        temp: Path
+        with OutputWriter.default_instance().path(output_file) as temp:
+            if constant_memory:
+                self._write_excel_stream(temp)
+            else:
+                self._write_excel(temp)
+        return output_file
+
+    @staticmethod
+    def _get_created() -> datetime:
+        # use the date (like the LaTeX .sty header) rather than the time so a
+        # file with unchanged data is not rewritten on the same day
+        return datetime.combine(date.today(), datetime.min.time())
+
+    def _get_sheet_name(self, desc: DataFrameDescriber) -> str:
+        sheet_name: str = desc.name
+        if self.mangle_sheet_name:
+            sheet_name = FileTextUtil.normalize_text(sheet_name)
+        if len(sheet_name) > self.SHEET_NAME_MAXLEN:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    'truncating sheet name to Excel limit of ' +
+                    f'{self.SHEET_NAME_MAXLEN}: {sheet_name}')
+            sheet_name = tw.shorten(
+                text=sheet_name,
+                width=self.SHEET_NAME_MAXLEN,
+                placeholder='...')
+        return sheet_name
+
+    def _write_excel_header(self, worksheet: Any, desc: DataFrameDescriber,
+                            widths: List[int]):
+        """Set comments of header cells to descriptions and the column widths.
+
+        """
+        cdesc: Dict[str, str] = desc.column_descriptions
+        col: str
+        for cix, col in enumerate(desc.df.columns):
+            comment: str = cdesc.get(col)
+            if comment is None:
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(f"missing comment in '{col}' " +
+                                   f"column in '{desc.name}'")
+                continue
+            worksheet.write_comment(0, cix, comment)
+        # simulate column auto-fit
+        for i, width in enumerate(widths):
+            worksheet.set_column(i, i, width)
+
+    def _write_excel(self, output_file: Path):
+        from xlsxwriter.worksheet import Worksheet
         # create a Pandas Excel writer using XlsxWriter as the engine.
         with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+            writer.book.set_properties({'created': self._get_created()})
             for desc in self.describers:
-                sheet_name: str = desc.name
-                if self.mangle_sheet_name:
-                    sheet_name = FileTextUtil.normalize_text(sheet_name)
+                sheet_name: str = self._get_sheet_name(desc)
                 # convert the dataframe to an XlsxWriter Excel object.
-                if len(sheet_name) > self.SHEET_NAME_MAXLEN:
-                    if logger.isEnabledFor(logging.WARNING):
-                        logger.warning(
-                            'truncating sheet name to Excel limit of ' +
-                            f'{self.SHEET_NAME_MAXLEN}: {sheet_name}')
-                    sheet_name = tw.shorten(
-                        text=sheet_name,
-                        width=self.SHEET_NAME_MAXLEN,
-                        placeholder='...')
                 desc.df.to_excel(writer, sheet_name=sheet_name, index=False)
-                # set comments of header cells to descriptions
                 worksheet: Worksheet = writer.sheets[sheet_name]
-                cdesc: Dict[str, str] = desc.column_descriptions
-                col: str
-                for cix, col in enumerate(desc.df.columns):
-                    comment: str = cdesc.get(col)
-                    if comment is None:
-                        if logger.isEnabledFor(logging.WARNING):
-                            logger.warning(f"missing comment in '{col}' " +
-                                           f"column in '{desc.name}'")
-                        continue
-                    worksheet.write_comment(0, cix, comment)
-                # simulate column auto-fit
-                for i, width in enumerate(self._get_col_widths(desc.df)):
-                    worksheet.set_column(i, i, width)
-        logger.info(f'wrote {output_file}')
-        return output_file
+                self._write_excel_header(
+                    worksheet, desc, self._get_col_widths(desc.df))
+
+    def _write_excel_stream(self, output_file: Path):
+        """Like :meth:`_write_excel` but write the rows of each sheet in order
+        with XlsxWriter's ``constant_memory`` mode, which flushes each row to
+        disk once the next is written.  Column widths are estimated from a
+        sample of rows.
+
+        """
+        import xlsxwriter
+        from xlsxwriter.worksheet import Worksheet
+        desc: DataFrameDescriber
+        for desc in self.describers:
+            # rows past the limit are not written by XlsxWriter
+            if len(desc.df) + 1 > self.SHEET_MAX_ROWS:
+                raise DataDescriptionError(
+                    f"Describer '{desc.name}' has {len(desc.df)} rows, " +
+                    'which exceeds the Excel limit of ' +
+                    f'{self.SHEET_MAX_ROWS} rows including the header')
+        with xlsxwriter.Workbook(output_file, {
+                'constant_memory': True,
+                'default_date_format': 'yyyy-mm-dd hh:mm:ss'}) as book:
+            book.set_properties({'created': self._get_created()})
+            # the same header style as pandas
+            header_format = book.add_format({
+                'bold': True, 'border': 1, 'align': 'center',
+                'valign': 'top'})
+            for desc in self.describers:
+                df: pd.DataFrame = desc.df
+                worksheet: Worksheet = book.add_worksheet(
+                    self._get_sheet_name(desc))
+                worksheet.write_row(0, 0, tuple(map(str, df.columns)),
+                                    header_format)
+                # comments can only be added to rows not yet flushed
+                self._write_excel_header(
+                    worksheet, desc, self._get_col_widths(
+                        df, sample_size=self.EXCEL_WIDTH_SAMPLE_ROWS))
+                row: int = 1
+                start: int
+                for start in range(0, len(df), self.EXCEL_CHUNK_ROWS):
+                    chunk: pd.DataFrame = \
+                        df.iloc[start:start + self.EXCEL_CHUNK_ROWS]
+                    # missing values are left as empty cells
+                    chunk = chunk.astype(object).where(chunk.notna(), None)
+                    vals: Tuple[Any, ...]
+                    for vals in chunk.itertuples(index=False, name=None):
+                        worksheet.write_row(row, 0, vals)
+                        row += 1
 
     def save_csv(self, csv_dir: Path) -> List[Path]:
         """Save all provided dataframe describers to an CSV files.
@@ -649,17 +887,21 @@ class DataDescriber(PersistableContainer, Dictable):
         :param csv_dir: the directory of where to save the data
 
         """
-        paths: List[Path] = []
-        desc: DataFrameDescriber
-        for desc in self.describers:
-            out_file: Path = csv_dir / desc.csv_path
-            out_file.parent.mkdir(parents=True, exist_ok=True)
-            desc.df.to_csv(out_file, index=False)
-            logger.info(f'saved csv file to: {out_file}')
-            paths.append(out_file)
+        output: OutputWriter = OutputWriter.default_instance()
+        paths: List[Path] = list(map(
+            lambda d: self._save_describer_csv(output, d, csv_dir),
+            self.describers))
         logger.info(f'saved csv files to directory: {csv_dir}')
         return paths
 
+    @staticmethod
+    def _save_describer_csv(output: OutputWriter, desc: DataFrameDescriber,
+                            csv_dir: Path) -> Path:
+        out_file: Path = csv_dir / desc.csv_path
+        with output.path(out_file) as temp:
+            desc.df.to_csv(temp, index=False)
+        return out_file
+
     def save_yaml(self, csv_dir: Path, yaml_dir: Path) -> List[Path]:
         """Save all provided dataframe describers YAML files used by the
         ``datdesc`` command.
@@ -670,19 +912,23 @@ class DataDescriber(PersistableContainer, Dictable):
 
         """
         fac: TableFactory = TableFactory.default_instance()
-        paths: List[Path] = []
-        desc: DataFrameDescriber
-        for desc in self.describers:
-            csv_file: Path = csv_dir / desc.csv_path
-            name: str = desc.get_table_name('file')
-            out_file: Path = yaml_dir / f'{name}-table.yml'
-            tab: Table = desc.create_table()
-            tab.path = csv_file
-            out_file.parent.mkdir(parents=True, exist_ok=True)
-            fac.to_file(tab, out_file)
-            logger.info(f'saved yml file to: {out_file}')
-            paths.append(out_file)
-        return paths
+        output: OutputWriter = OutputWriter.default_instance()
+        return list(map(
+            lambda d: self._save_describer_yaml(
+                fac, output, d, csv_dir, yaml_dir),
+            self.describers))
+
+    @staticmethod
+    def _save_describer_yaml(fac: TableFactory, output: OutputWriter,
+                             desc: DataFrameDescriber, csv_dir: Path,
+                             yaml_dir: Path) -> Path:
+        csv_file: Path = csv_dir / desc.csv_path
+        name: str = desc.get_table_name('file')
+        out_file: Path = yaml_dir / f'{name}-table.yml'
+        with output.path(out_file) as temp:
+            fac.definitions_to_file(
+                desc.create_table_definition(csv_file), temp)
+        return out_file
 
     def save_json(self, output_path: Path = Path('.')) -> Path:
         """Serialize the this instance as a JSON file.  Most or all of the state
@@ -690,12 +936,70 @@ class DataDescriber(PersistableContainer, Dictable):
 
         """
         out_file: Path = output_path / f'{self.name}-table.json'
-        with open(out_file, 'w') as f:
+        with OutputWriter.default_instance().open(out_file) as f:
             self.to_json(writer=f)
-        logger.info(f'saved json file to: {out_file}')
+        return out_file
+
+    def save_archive(self, output_path: Path = Path('.')) -> Path:
+        """Save this instance as a columnar binary archive, which is restored
+        with :meth:`from_archive`.
+
+        :param output_path: the directory of where to save the archive
+
+        :see: :class:`.DescriberArchive`
+
+        """
+        from .archive import DescriberArchive
+        out_file: Path = output_path / f'{self.name}-table.zip'
+        temp: Path
+        with OutputWriter.default_instance().path(out_file) as temp:
+            DescriberArchive.write(self, temp)
+        return out_file
+
+    def _save_parallel(self, csv_dir: Path, yaml_dir: Path,
+                       excel_path: Optional[Path], workers: int) -> List[Path]:
+        """Save the CSV and YAML files of the describers in ``workers``
+        processes while the Excel file is written in a thread of this process.
+
+        :return: the paths in the same order as a serial :meth:`save`
+
+        """
+        output: OutputWriter = OutputWriter.default_instance()
+        workers = min(workers, len(self.describers))
+        chunksize: int = max(1, len(self.describers) // (workers * 4))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f'saving {len(self.describers)} describers ' +
+                        f'with {workers} workers')
+        res: List[Tuple[Path, Path, List[Path], List[Path]]]
+        excel_file: Optional[Path] = None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # submit all describers, which starts the worker processes, before
+            # starting the Excel writer thread
+            results: Iterable = pool.map(
+                _save_describer, self.describers, it.repeat(csv_dir),
+                it.repeat(yaml_dir), chunksize=chunksize)
+            with ThreadPoolExecutor(max_workers=1) as excel_pool:
+                excel_future: Optional[Future] = None
+                if excel_path is not None:
+                    excel_future = excel_pool.submit(
+                        self.save_excel, excel_path)
+                res = list(results)
+                if excel_future is not None:
+                    excel_file = excel_future.result()
+        # add the files written by the workers to this process' writer
+        for _, _, written, skipped in res:
+            output.written.extend(written)
+            output.skipped.extend(skipped)
+        logger.info(f'saved csv files to directory: {csv_dir}')
+        paths: List[Path] = list(map(lambda r: r[0], res))
+        paths.extend(map(lambda r: r[1], res))
+        if excel_file is not None:
+            paths.append(excel_file)
+        return paths
 
     def save(self, csv_dir: Path = None, yaml_dir: Path = None,
-             excel_path: Union[bool, Path] = None) -> List[Path]:
+             excel_path: Union[bool, Path] = None,
+             workers: int = 1) -> List[Path]:
         """Save both the CSV and YAML configuration file.
 
         :param csv_dir: the directory of where to save the data
@@ -706,6 +1010,10 @@ class DataDescriber(PersistableContainer, Dictable):
                            ``False``, otherwise create in a new ``results``
                            directory with :obj:`name`
 
+        :param workers: the number of processes used to save the CSV and YAML
+                        files of the describers while the Excel file is
+                        written, or 1 to save each file in this process
+
         :see: :meth:`save_csv`
 
         :see: :meth:`save_yaml`
@@ -713,12 +1021,14 @@ class DataDescriber(PersistableContainer, Dictable):
         """
         csv_dir = self.DEFAULT_CSV_DIR if csv_dir is None else csv_dir
         yaml_dir = self.DEFAULT_YAML_DIR if yaml_dir is None else yaml_dir
-        paths: List[Path] = self.save_csv(csv_dir)
-        paths = paths + self.save_yaml(csv_dir, yaml_dir)
         if excel_path is False:
             excel_path = None
         elif excel_path is True:
             excel_path = self.DEFAULT_EXCEL_DIR / self.name
+        if workers > 1 and len(self.describers) > 1:
+            return self._save_parallel(csv_dir, yaml_dir, excel_path, workers)
+        paths: List[Path] = self.save_csv(csv_dir)
+        paths = paths + self.save_yaml(csv_dir, yaml_dir)
         if excel_path is not None:
             paths.append(self.save_excel(excel_path))
         return paths
@@ -763,6 +1073,19 @@ class DataDescriber(PersistableContainer, Dictable):
         with open(path) as f:
             return cls.from_json(f)
 
+    @classmethod
+    def from_archive(cls: Type, path: Path, mmap: bool = True) -> \
+            DataDescriber:
+        """Like :meth:`from_json_file` but an archive written with
+        :meth:`save_archive`.  Describers are read when they are first
+        accessed by name or iteration.
+
+        :param mmap: whether to memory map numeric columns from the archive
+
+        """
+        from .archive import DescriberArchive
+        return DescriberArchive(path, mmap=mmap).create_data_describer()
+
     @classmethod
     def from_excel(cls: Type, path: Union[str, Path], *,
                    dataset_name_fmt: str = '{path.stem}',
@@ -791,6 +1114,9 @@ class DataDescriber(PersistableContainer, Dictable):
             * If you set pandas `index_col=...`, put row descriptions as cell
                comments on the cells of that index column for each data row.
 
+        The workbook is parsed once, and the header row and index column of
+        each sheet are scanned once for comments.
+
         Note: :mod:`openpyxl` supports the legacy Excel "notes" comment objects,
         but not newer threaded comments. Use Notes if you want this to work.
 
@@ -800,18 +1126,10 @@ class DataDescriber(PersistableContainer, Dictable):
                            If omitted, inferred from pandas ``header`` (default
                            0 => row 1)
 
-        :param data_start_row: start row of header; if omitted inferred from
-                               pandas If omitted, inferred from pandas
-                               ``header`` (default 0 => row 1)
+        :param data_start_row: 0-based row of the first data row; if omitted
+                               the row after ``header_row``
 
         """
-        def clean_comment_text(text: Optional[str]) -> Optional[str]:
-            if not text:
-                return None
-            # openpyxl returns raw note text; normalize a bit
-            t = text.replace("\r\n", "\n").strip()
-            return t if t else None
-
         path = Path(path)
         rex: Dict[str, Any] = dict(read_excel_kwargs or {})
 
@@ -828,85 +1146,41 @@ class DataDescriber(PersistableContainer, Dictable):
                     ('Multi-row header (header=[...]) not supported; ' +
                      'set header_row'))
         if data_start_row is None:
-            data_start_row = header_row
+            data_start_row = header_row + 1
 
         data_start_row += 1
         header_row += 1
 
-        # Load workbook once to access comments
+        # parse the workbook once for both the comments and the data
         wb: Workbook = ox.load_workbook(path, data_only=True, read_only=False)
-        sheet_names: set[str] = set(wb.sheetnames)
+        sheet_names: List[str] = wb.sheetnames
         if include_sheets is not None:
             allow = set(include_sheets)
-            sheet_names = sheet_names & allow
+            sheet_names = list(filter(lambda n: n in allow, sheet_names))
         if exclude_sheets is not None:
             deny = set(exclude_sheets)
-            sheet_names = sheet_names - deny
+            sheet_names = list(filter(lambda n: n not in deny, sheet_names))
+        # pandas reads all sheets from the parsed workbook
+        dfs: Dict[str, pd.DataFrame] = {}
+        if len(sheet_names) > 0:
+            dfs = pd.read_excel(wb, sheet_name=sheet_names, engine='openpyxl',
+                                **rex)
+        index_col = rex.get('index_col', None)
+        # only support a single index column (int or str); if none, skip
+        # index_meta.
+        if isinstance(index_col, (list, tuple)):
+            index_col = None
 
         describers: list[DataFrameDescriber] = []
         sh_name: str
         for sh_name in sheet_names:
-            ws = wb[sh_name]
-            # read sheet via pandas
-            df = pd.read_excel(path, sheet_name=sh_name, **rex)
-            # build header-value -> excel column index map by scanning the
-            # header row (this handles index_col removing a column from df,
-            # since mapping is by name)
-            header_map: Dict[Any, int] = {}
-            for col_idx in range(1, ws.max_column + 1):
-                cell = ws.cell(row=header_row, column=col_idx)
-                if cell.value is not None:
-                    header_map[cell.value] = col_idx
-            # column descriptions from header-cell comments
-            meta_items: list[tuple[str, str]] = []
-            for col_name in df.columns:
-                # Try exact match first
-                excel_col_idx = header_map.get(col_name)
-                # If pandas made the column name a string but Excel had a
-                # non-string (or vice versa), do a tolerant match.
-                if excel_col_idx is None:
-                    for k, v in header_map.items():
-                        if str(k) == str(col_name):
-                            excel_col_idx = v
-                            break
-                if excel_col_idx is not None:
-                    c = ws.cell(row=header_row, column=excel_col_idx).comment
-                    desc = clean_comment_text(c.text if c is not None else None)
-                    if desc:
-                        meta_items.append((str(col_name), desc))
+            df: pd.DataFrame = dfs[sh_name]
+            meta_items: List[Tuple[str, str]]
+            index_meta: Optional[Dict[Any, str]]
+            meta_items, index_meta = cls._read_sheet_comments(
+                wb[sh_name], df, header_row, data_start_row, index_col)
             meta: Optional[Union[pd.DataFrame, Sequence[tuple[str, str]]]] = \
                 tuple(meta_items) if meta_items else None
-            # row descriptions from comments in the index column (if any)
-            index_meta: Optional[Dict[Any, str]] = None
-            index_col = rex.get('index_col', None)
-            # only support a single index column (int or str); if none, skip
-            # index_meta.
-            index_excel_col_idx: Optional[int] = None
-            if index_col is not None and \
-               not isinstance(index_col, (list, tuple)):
-                if isinstance(index_col, int):
-                    # pandas index_col is 0-based within the parsed table; for
-                    # typical sheets, Excel columns are 1-based, so +1.
-                    index_excel_col_idx = index_col + 1
-                else:
-                    # index_col is a column label; resolve in header map
-                    index_excel_col_idx = header_map.get(index_col)
-                    if index_excel_col_idx is None:
-                        for k, v in header_map.items():
-                            if str(k) == str(index_col):
-                                index_excel_col_idx = v
-                                break
-            if index_excel_col_idx is not None:
-                index_meta = {}
-                # map each dataframe row i -> excel row number
-                for i, idx_val in enumerate(df.index):
-                    excel_row = data_start_row + i
-                    c = ws.cell(row=excel_row, column=index_excel_col_idx).comment
-                    desc = clean_comment_text(c.text if c is not None else None)
-                    if desc:
-                        index_meta[idx_val] = desc
-                if not index_meta:
-                    index_meta = None
             describers.append(
                 DataFrameDescriber(
                     name=sh_name,
@@ -921,20 +1195,122 @@ class DataDescriber(PersistableContainer, Dictable):
             name=dataset_name_fmt.format(path=path),
             mangle_sheet_name=mangle_sheet_name)
 
+    @staticmethod
+    def _read_sheet_comments(ws: Any, df: pd.DataFrame, header_row: int,
+                             data_start_row: int, index_col: Any) -> \
+            Tuple[List[Tuple[str, str]], Optional[Dict[Any, str]]]:
+        """Return the column descriptions from the comments of the header cells
+        and the row descriptions from the comments of the index column cells of
+        a worksheet.  Each of the header row and index column is visited once.
+
+        :param ws: the :mod:`openpyxl` worksheet
+
+        :param df: the dataframe read from ``ws``
+
+        :param header_row: the 1-based row of the column names
+
+        :param data_start_row: the 1-based row of the first data row
+
+        :param index_col: the pandas ``index_col`` or ``None``
+
+        :return: the column name and description tuples, and the row
+                 descriptions keyed by index value or ``None`` if there are
+                 none
+
+        """
+        def clean_comment_text(comment: Any) -> Optional[str]:
+            text: Optional[str] = None if comment is None else comment.text
+            if not text:
+                return None
+            # openpyxl returns raw note text; normalize a bit
+            t = text.replace("\r\n", "\n").strip()
+            return t if t else None
+
+        def find_col(name: Any) -> Optional[int]:
+            # if pandas made the column name a string but Excel had a
+            # non-string (or vice versa), do a tolerant match
+            col_idx: Optional[int] = header_map.get(name)
+            if col_idx is None:
+                col_idx = header_str_map.get(str(name))
+            return col_idx
+
+        # header-value -> excel column index map and the header comments in
+        # one scan of the header row (this handles index_col removing a column
+        # from df, since mapping is by name)
+        header_map: Dict[Any, int] = {}
+        header_str_map: Dict[str, int] = {}
+        header_comments: Dict[int, str] = {}
+        if ws.max_row >= header_row:
+            for cell in next(ws.iter_rows(min_row=header_row,
+                                          max_row=header_row)):
+                if cell.value is not None:
+                    header_map[cell.value] = cell.column
+                    header_str_map.setdefault(str(cell.value), cell.column)
+                desc: Optional[str] = clean_comment_text(cell.comment)
+                if desc:
+                    header_comments[cell.column] = desc
+        # column descriptions from header-cell comments
+        meta_items: List[Tuple[str, str]] = []
+        for col_name in df.columns:
+            desc = header_comments.get(find_col(col_name))
+            if desc:
+                meta_items.append((str(col_name), desc))
+        # row descriptions from comments in the index column (if any)
+        index_meta: Optional[Dict[Any, str]] = None
+        index_excel_col_idx: Optional[int] = None
+        if index_col is not None:
+            if isinstance(index_col, int):
+                # pandas index_col is 0-based within the parsed table; for
+                # typical sheets, Excel columns are 1-based, so +1.
+                index_excel_col_idx = index_col + 1
+            else:
+                # index_col is a column label; resolve in header map
+                index_excel_col_idx = find_col(index_col)
+        if index_excel_col_idx is not None and len(df) > 0:
+            index_meta = {}
+            # map each dataframe row i -> excel row number
+            cells = ws.iter_rows(
+                min_row=data_start_row,
+                max_row=data_start_row + len(df) - 1,
+                min_col=index_excel_col_idx,
+                max_col=index_excel_col_idx)
+            for idx_val, (cell,) in zip(df.index, cells):
+                desc = clean_comment_text(cell.comment)
+                if desc:
+                    index_meta[idx_val] = desc
+            if not index_meta:
+                index_meta = None
+        return meta_items, index_meta
+
     def to_json(self, writer: TextIOBase):
         """Serialize the object to JSON that can be re-instantiated using
         :meth:`from_json`.
 
-        :param writer: the data sink
+        Each dataframe is written once, in the ``split`` orientation, directly
+        to ``writer``.
 
-        :param kwargs: the key word arguments to give to :func:`json.dump`
+        :param writer: the data sink
 
         """
-        self.asjson(writer)
+        writer.write('{"describers": [')
+        dfd: DataFrameDescriber
+        for i, dfd in enumerate(self.describers):
+            if i > 0:
+                writer.write(', ')
+            dfd._write_json(writer)
+        writer.write(']')
+        fld: Any
+        for fld in fields(self):
+            if fld.name != 'describers':
+                writer.write(f', {json.dumps(fld.name)}: ')
+                writer.write(json.dumps(getattr(self, fld.name), default=str))
+        writer.write('}')
 
     @classmethod
     def from_json(cls: Type, reader: TextIOWrapper) -> DataDescriber:
-        """Unserialize a JSON stream into a data descriptor.
+        """Unserialize a JSON stream into a data descriptor.  Dataframes are
+        read from the ``split`` orientation written by :meth:`to_json`, or the
+        column orientation of files written by previous versions.
 
         :param reader: the file / data stream
 
@@ -991,12 +1367,20 @@ class DataDescriber(PersistableContainer, Dictable):
 
 @dataclass
 class RenderableDataFrameDescriber(Renderable):
-    """Reads instances serialized with :meth:`.DataDescriber.to_json` and writes
-    the CVS, YAML and Excel files.
+    """Reads instances serialized with :meth:`.DataDescriber.to_json` or
+    :meth:`.DataDescriber.save_archive` and writes the CVS, YAML and Excel
+    files.
+
+    """
+    workers: int = field(default=1)
+    """The number of processes used to save the describers (see
+    :meth:`.DataDescriber.save`).
 
     """
     def get_data_describer(self) -> DataDescriber:
         """Return the data describer serialized in :obj:`path`."""
+        if self.path.suffix == '.zip':
+            return DataDescriber.from_archive(self.path)
         with open(self.path) as f:
             return DataDescriber.from_json(f)
 
@@ -1008,5 +1392,6 @@ class RenderableDataFrameDescriber(Renderable):
         paths: List[Path] = dd.save(
             csv_dir=output / DataDescriber.DEFAULT_CSV_DIR,
             yaml_dir=output / DataDescriber.DEFAULT_YAML_DIR,
-            excel_path=output / DataDescriber.DEFAULT_EXCEL_DIR / dd.name)
+            excel_path=output / DataDescriber.DEFAULT_EXCEL_DIR / dd.name,
+            workers=self.workers)
         return tuple(paths)
@@ -4,30 +4,34 @@
 from __future__ import annotations
 __author__ = 'Paul Landes'
 from typing import (
+    TYPE_CHECKING,
     Tuple, List, Dict, Set, Iterable, Any, Optional, Union,
     Type, Callable, ClassVar
 )
 from dataclasses import dataclass, field
+from itertools import chain
 from abc import ABCMeta, abstractmethod
 import logging
 from pathlib import Path
-from io import StringIO
 import re
-import yaml
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.pyplot import Axes
-from matplotlib.figure import Figure as MatplotFigure
 from zensols.util import Failure
 from zensols.config import Settings
 from zensols.persist import (
     persisted, PersistedWork, FileTextUtil, Deallocatable
 )
 from zensols.config import (
-    Serializer, Dictable, ConfigFactory, ImportConfigFactory, ImportIniConfig
+    Serializer, Dictable, Configurable, ConfigFactory, ImportConfigFactory
 )
 from . import FigureError, Renderable
+from .codecache import CodeCache
+from .output import OutputWriter
+from .snapshot import ConfigSnapshot
+from .yamlio import YamlCache
+if TYPE_CHECKING:
+    from matplotlib.pyplot import Axes
+    from matplotlib.figure import Figure as MatplotFigure
 
 logger = logging.getLogger(__name__)
 
@@ -125,6 +129,13 @@ class Figure(Deallocatable, Dictable):
     """
     _DICTABLE_ATTRIBUTES: ClassVar[Set[str]] = {'path'}
 
+    _UNDATED_METADATA: ClassVar[Dict[str, Dict[str, Any]]] = {
+        'svg': {'Date': None},
+        'pdf': {'CreationDate': None}}
+    """Image metadata by format that leaves out the time the image was saved so
+    an unchanged figure gives the same file.
+
+    """
     name: str = field(default='Untitled')
     """Used for file naming and the title."""
 
@@ -221,6 +232,7 @@ class Figure(Deallocatable, Dictable):
         params.update(self.subplot_params)
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug(f'creating subplots: {params}')
+        import matplotlib.pyplot as plt
         fig, axs = plt.subplots(**params)
         fig.tight_layout(pad=self.padding)
         if self.title_font_size > 0:
@@ -281,10 +293,12 @@ class Figure(Deallocatable, Dictable):
     def _get_image_metadata(self) -> Dict[str, Any]:
         """Factory method to add metadata to the file.  By default,
         :obj:`metadata` is added and ``Title`` with the contents of
-        :obj:`name`.
+        :obj:`name`.  The save time is left out for formats that would
+        otherwise add it (see :obj:`_UNDATED_METADATA`).
 
         """
         metadata: Dict[str, str] = {'Title': self.name}
+        metadata.update(self._UNDATED_METADATA.get(self.image_format, {}))
         metadata.update(self.metadata)
         return metadata
 
@@ -306,11 +320,12 @@ class Figure(Deallocatable, Dictable):
             axes: Union[Axes, np.ndarray] = self._get_axes()
             fig: MatplotFigure = self._get_figure()
             locals()['fig'] = fig  # suppress warnings
+            cache: CodeCache = CodeCache.default_instance()
             plot: Plot
             for plot in self.plots:
                 ax: Axes = axes
                 if plot.code_pre_render is not None:
-                    exec(plot.code_pre_render)
+                    exec(cache.compile(plot.code_pre_render))
                 if isinstance(ax, np.ndarray):
                     if len(ax.shape) == 1:
                         ix = plot.row if plot.row != 0 else plot.column
@@ -320,7 +335,7 @@ class Figure(Deallocatable, Dictable):
                 assert ax is not None
                 plot.render(ax)
                 if plot.code_post_render is not None:
-                    exec(plot.code_post_render)
+                    exec(cache.compile(plot.code_post_render))
             self._rendered = True
 
     def save(self) -> Path:
@@ -331,20 +346,23 @@ class Figure(Deallocatable, Dictable):
         :return: the value of :obj:`path`
 
         """
+        import matplotlib.pyplot as plt
         path: Path = self.path
         self._render()
-        path.parent.mkdir(parents=True, exist_ok=True)
-        self._get_figure().savefig(
-            fname=path,
-            format=self.image_format,
-            bbox_inches='tight',
-            metadata=self._get_image_metadata())
-        if logger.isEnabledFor(logging.INFO):
-            logger.info(f'wrote: {path}')
+        writer: OutputWriter = OutputWriter.default_instance()
+        # salt SVG element IDs with the name rather than randomly
+        with writer.path(path) as temp, \
+             plt.rc_context({'svg.hashsalt': self.name}):
+            self._get_figure().savefig(
+                fname=temp,
+                format=self.image_format,
+                bbox_inches='tight',
+                metadata=self._get_image_metadata())
         return path
 
     def show(self):
         """Render and display the plot."""
+        import matplotlib.pyplot as plt
         plt.show()
 
     def _reset(self):
@@ -438,7 +456,8 @@ class FigureFactory(Dictable):
     def default_instance(cls: FigureFactory) -> FigureFactory:
         """Get the singleton instance."""
         if cls._DEFAULT_INSTANCE is None:
-            config = ImportIniConfig(StringIO(_FIGURE_FACTORY_CONFIG))
+            config: Configurable = ConfigSnapshot.default_instance().\
+                create_config('figure-factory', _FIGURE_FACTORY_CONFIG)
             fac = ImportConfigFactory(config)
             try:
                 cls._DEFAULT_INSTANCE = fac('datdesc_figure_factory')
@@ -496,11 +515,11 @@ class FigureFactory(Dictable):
             raise_fn(f"No '{self._TYPE_NAME}' given <{pdef}>")
         if code_pre is not None:
             plot = Settings(**pdef)
-            exec(code_pre)
+            exec(CodeCache.default_instance().compile(code_pre))
             pdef = plot.asdict()
         plot = self.create(figure_type, **pdef)
         if code_post is not None:
-            exec(code_post)
+            exec(CodeCache.default_instance().compile(code_post))
         return plot
 
     def _unserialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -517,15 +536,35 @@ class FigureFactory(Dictable):
         ser: Serializer = self._get_serializer()
         trav(data)
 
+    def get_dependencies(self, figure_path: Path) -> Iterable[Path]:
+        """Return the CSV files referenced by ``dataframe:`` entries in a
+        figure definitions file without reading them.
+
+        :param figure_path: the file containing the figure configurations
+
+        """
+        def trav(node) -> Iterable[Path]:
+            if isinstance(node, Dict):
+                for v in node.values():
+                    yield from trav(v)
+            elif isinstance(node, (list, tuple, set)):
+                for v in node:
+                    yield from trav(v)
+            elif isinstance(node, str):
+                m: re.Match = _FigureSerializer.DATAFRAME_REGEXP.match(node)
+                if m is not None:
+                    yield Path(m.group(2))
+
+        defs: Dict[str, Any] = YamlCache.default_instance().load(figure_path)
+        return trav(defs)
+
     def from_file(self, figure_path: Path) -> Iterable[Figure]:
         """Like :meth:`from_dict` but read from a YAML file.
 
         :param figure_path: the file containing the figure configurations
 
         """
-        with open(figure_path) as f:
-            content = f.read()
-            defs: Dict[str, Any] = yaml.load(content, yaml.FullLoader)
+        defs: Dict[str, Any] = YamlCache.default_instance().load(figure_path)
         self._unserialize(defs)
         return self._from_dict(defs, str(figure_path))
 
@@ -588,6 +627,9 @@ class RenderableFigure(Renderable):
     def get_artifacts(self) -> Iterable[Any]:
         return self.get_figures()
 
+    def get_dependencies(self) -> Iterable[Path]:
+        return chain((self.path,), self.factory.get_dependencies(self.path))
+
     def render(self, output: Path, image_format: str = None) -> \
             tuple[Path, ...]:
         output_files: list[Path] = []
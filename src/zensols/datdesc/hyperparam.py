@@ -38,7 +38,6 @@ from itertools import chain
 from pathlib import Path
 from io import TextIOBase
 from frozendict import frozendict
-import yaml
 import pandas as pd
 from zensols.util import APIError, stdout
 from zensols.config import Dictable, Configurable
@@ -47,6 +46,8 @@ from . import (
     Renderable, OutputFormat,
     DataDescriptionError, DataFrameDescriber, DataDescriber,
 )
+from .output import OutputWriter
+from .yamlio import YamlCache
 
 logger = logging.getLogger(__name__)
 
@@ -625,15 +626,15 @@ class HyperparamSetLoader(object):
 
     def _from_stream(self, stream: TextIOBase,
                      name: str = None) -> HyperparamSet:
-        return self._from_dict(yaml.load(stream, yaml.FullLoader), name=name)
+        return self._from_dict(YamlCache.parse(stream), name=name)
 
     def _from_path(self, path: Path) -> HyperparamSet:
         name: str = path.stem
         m: re.Match = self._FILE_NAME_REGEX.match(name)
         if m is not None:
             name = m.group(1)
-        with open(path) as f:
-            return self._from_stream(f, name=name)
+        return self._from_dict(YamlCache.default_instance().load(path),
+                               name=name)
 
     def _get_updates(self) -> Iterable[Dict[str, Any]]:
         param_update: Dict[str, Any]
@@ -714,7 +715,12 @@ class RenderableHyperparamSet(Renderable):
             tuple[Path, ...]:
         loader = HyperparamSetLoader(self.path)
         hset: HyperparamSet = loader.load()
-        with stdout(output, logger=logger) as f:
+        sink: Any
+        if output is None or stdout.is_stdout(Path(output)):
+            sink = stdout(output, logger=logger)
+        else:
+            sink = OutputWriter.default_instance().open(output)
+        with sink as f:
             {OutputFormat.short: lambda: hset.write(
                 writer=f, include_doc=False),
              OutputFormat.verbose: lambda: hset.write(
@@ -1,9 +1,12 @@
 """Contains the manager classes that invoke the tables to generate.
 
 """
+from __future__ import annotations
 __author__ = 'Paul Landes'
-
-from typing import Sequence, Set, List, Tuple, Dict, Iterable, Any
+from typing import (
+    Sequence, Set, List, Tuple, Dict, Iterable, Iterator, Any, ClassVar,
+    Optional, Callable
+)
 from dataclasses import dataclass, field
 import sys
 import logging
@@ -11,15 +14,201 @@ import itertools as it
 from itertools import chain
 from datetime import datetime
 from pathlib import Path
-from io import TextIOBase
+from io import TextIOBase, StringIO
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+import tabulate as tab
 from zensols.util import stdout
 from zensols.config import Writable
 from . import LatexTableError, TableFactory, Renderable, Table
+from .colfmt import ColumnFormatter
+from .manifest import BuildManifest
+from .output import OutputWriter
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class LatexTabular(object):
+    """The lines of a LaTeX ``tabular`` environment created from the columns of
+    a dataframe.  The lines are the same as those given by
+    :func:`tabulate.tabulate` with the ``latex_raw`` format and numbers not
+    parsed (the :class:`.LatexTable` default).  However, each column is
+    formatted at once and each row is created only as it is iterated rather
+    than creating the table as a single string.
+
+    Instances are created with :meth:`create`, which returns ``None`` when
+    :mod:`tabulate` parameters other than the default are used or for data
+    :mod:`tabulate` formats differently (i.e. ANSI escape codes).  It is also
+    ``None`` for cells with new lines, which would otherwise be one line
+    rather than the multiple lines of the :mod:`tabulate` output.
+
+    """
+    _TABULATE_PARAMS: ClassVar[Dict[str, Any]] = {
+        'tablefmt': 'latex_raw',
+        'headers': 'firstrow',
+        'disable_numparse': True}
+    """The :mod:`tabulate` parameters with output reproduced by this class."""
+
+    headers: Tuple[str, ...] = field()
+    """The padded header of each column."""
+
+    columns: Tuple[List[str], ...] = field()
+    """The formatted cell text of each column."""
+
+    widths: Tuple[int, ...] = field()
+    """The width each cell is padded, or 0 if already padded."""
+
+    @staticmethod
+    def _width(s: str, widechars: bool) -> int:
+        """The visible width of string ``s`` as computed by :mod:`tabulate`, or
+        -1 if it has non-printable characters.
+
+        """
+        if s.isascii() and s.isprintable():
+            return len(s)
+        if '\x1b' in s:
+            return -1
+        return tab.wcwidth.wcswidth(s) if widechars else len(s)
+
+    @classmethod
+    def _format_column(cls: type, col: pd.Series) -> Optional[List[str]]:
+        """Format a column as :mod:`tabulate` formats column of text."""
+        vals: List[Any] = col.tolist()
+        if col.dtype == object:
+            kind: str = pd.api.types.infer_dtype(vals, skipna=True)
+            if kind == 'bytes' or (kind.startswith('mixed') and any(
+                    map(lambda v: isinstance(v, bytes), vals))):
+                return None
+        strs: List[str] = list(map(format, vals))
+        nas: np.ndarray = np.flatnonzero(col.isna().to_numpy())
+        i: int
+        for i in nas:
+            if vals[i] is None:
+                strs[i] = ''
+        if not tab.PRESERVE_WHITESPACE:
+            strs = list(map(str.strip, strs))
+        return strs
+
+    @classmethod
+    def create(cls: type, df: pd.DataFrame, headers: Sequence[str],
+               params: Dict[str, Any]) -> Optional[LatexTabular]:
+        """Create the lines of a table.
+
+        :param df: the dataframe with the rows of the table
+
+        :param headers: the header text of each column
+
+        :param params: the :mod:`tabulate` parameters used for the table
+
+        :return: the table lines or ``None`` if :mod:`tabulate` should be used
+
+        """
+        if params != cls._TABULATE_PARAMS or df.shape[1] == 0:
+            return None
+        widechars: bool = tab.wcwidth is not None and tab.WIDE_CHARS_MODE
+        headers = tuple(map(str, headers))
+        cols: List[List[str]] = []
+        widths: List[int] = []
+        padded_headers: List[str] = []
+        header: str
+        for cix, header in enumerate(headers):
+            strs: List[str] = cls._format_column(df.iloc[:, cix])
+            if strs is None:
+                return None
+            # tabulate replaces a row with a separating line when one of the
+            # first two cells is the marker
+            if cix < 2 and tab.SEPARATING_LINE in strs:
+                return None
+            hwidth: int = cls._width(header, widechars)
+            joined: str = ''.join(strs)
+            # keep the line count of the split tabulate output
+            if '\n' in joined or '\n' in header:
+                return None
+            swidths: List[int] = None
+            if joined.isascii() and joined.isprintable():
+                width: int = max(map(len, strs), default=0)
+            else:
+                swidths = list(map(lambda s: cls._width(s, widechars), strs))
+                width: int = max(swidths)
+            if hwidth < 0 or width < 0 or \
+               (swidths is not None and min(swidths) < 0):
+                return None
+            width = max(hwidth + tab.MIN_PADDING, width)
+            if swidths is None:
+                widths.append(width)
+            else:
+                # pad by visible width rather than by the number of characters
+                strs = list(map(lambda s, w: s + (' ' * (width - w)),
+                                strs, swidths))
+                widths.append(0)
+            padded_headers.append(header + (' ' * (width - hwidth)))
+            cols.append(strs)
+        return cls(tuple(padded_headers), tuple(cols), tuple(widths))
+
+    @staticmethod
+    def _format_row(cells: Iterable[str]) -> str:
+        return ' ' + ' & '.join(cells) + ' \\\\'
+
+    def __len__(self) -> int:
+        # begin, header, end and three rule lines in addition to the data rows
+        return len(self.columns[0]) + 6
+
+    def __iter__(self) -> Iterator[str]:
+        n_rows: int = len(self.columns[0])
+        aligns: str = ('l' * len(self.columns)) if n_rows > 0 else ''
+        yield '\\begin{tabular}{' + aligns + '}'
+        yield '\\hline'
+        yield self._format_row(self.headers)
+        yield '\\hline'
+        cells: Tuple[str, ...]
+        for cells in zip(*self.columns):
+            yield self._format_row(map(str.ljust, cells, self.widths))
+        yield '\\hline'
+        yield '\\end{tabular}'
+
+
+@dataclass
+class ChunkedLatexTabular(object):
+    """Like :class:`.LatexTabular` but created from chunks of the rows of a
+    table, which are formatted only as the lines are iterated.  Since the
+    width of each column is not known until all rows are formatted, the cells
+    are not padded to align the columns.
+
+    """
+    rows: int = field()
+    """The number of rows in all chunks."""
+
+    chunks: Iterable[pd.DataFrame] = field()
+    """The formatted chunks of the table's rows."""
+
+    header: Callable[[pd.DataFrame], Sequence[str]] = field()
+    """Creates the header text of each column from a chunk."""
+
+    def __len__(self) -> int:
+        return self.rows + 6
+
+    def __iter__(self) -> Iterator[str]:
+        chunks: Iterator[pd.DataFrame] = iter(self.chunks)
+        first: pd.DataFrame = next(chunks)
+        n_cols: int = first.shape[1]
+        yield '\\begin{tabular}{' + ('l' * n_cols) + '}'
+        yield '\\hline'
+        yield LatexTabular._format_row(map(str, self.header(first)))
+        yield '\\hline'
+        chunk: pd.DataFrame
+        for chunk in it.chain((first,), chunks):
+            cols: List[List[str]] = list(map(
+                lambda i: LatexTabular._format_column(chunk.iloc[:, i]),
+                range(n_cols)))
+            if any(map(lambda c: c is None, cols)):
+                raise LatexTableError('Can not format chunk of table data')
+            yield from map(LatexTabular._format_row, zip(*cols))
+        yield '\\hline'
+        yield '\\end{tabular}'
+
+
 @dataclass
 class LatexTable(Table):
     """This subclass generates LaTeX tables.
@@ -51,20 +240,50 @@ class LatexTable(Table):
             nstr = f'{base} \\times 10^{{{int(exponent)}}}'
         return f'${nstr}$'
 
+    def _format_scientific_column(self, col: pd.Series,
+                                  sig_digits: int) -> pd.Series:
+        formatted: pd.Series = ColumnFormatter.latex_scientific(col, sig_digits)
+        if formatted is None:
+            formatted = super()._format_scientific_column(col, sig_digits)
+        return formatted
+
     def _get_columns(self) -> str:
         cols: str = super()._get_columns()
         if self.booktabs:
             cols = cols.replace('|', ' ')
         return cols
 
+    def _get_table_header(self, df: pd.DataFrame) -> Tuple[str, ...]:
+        """Return the column header text of the table."""
+        return tuple(map(lambda c: f'\\textbf{{{c}}}', df.columns))
+
     def _get_table_rows(self, df: pd.DataFrame) -> Iterable[List[Any]]:
         """Return the rows/columns of the table given to :mod:``tabulate``."""
-        rows: Iterable[List[Any]] = map(lambda x: x[1].tolist(), df.iterrows())
-        cols: Tuple[str, ...] = tuple(map(
-            lambda c: f'\\textbf{{{c}}}', df.columns))
-        rows = it.chain([cols], rows)
+        # iterate by column so rows of unformatted numeric columns are not
+        # upcast to a common dtype
+        rows: Iterable[List[Any]] = map(
+            list, df.itertuples(index=False, name=None))
+        rows = it.chain([self._get_table_header(df)], rows)
         return rows
 
+    def _get_table_lines(self, df: pd.DataFrame) -> Sequence[str]:
+        lines: Sequence[str] = None
+        # subclasses that create their own rows are given to tabulate
+        if type(self)._get_table_rows is LatexTable._get_table_rows:
+            lines = LatexTabular.create(
+                df, self._get_table_header(df), self._get_tabulate_params())
+        if lines is None:
+            lines = super()._get_table_lines(df)
+        return lines
+
+    def _can_write_chunks(self) -> bool:
+        return type(self)._get_table_rows is LatexTable._get_table_rows and \
+            self._get_tabulate_params() == LatexTabular._TABULATE_PARAMS
+
+    def _get_chunk_table_lines(self, chunks: Iterable[pd.DataFrame],
+                               rows: int) -> Sequence[str]:
+        return ChunkedLatexTabular(rows, chunks, self._get_table_header)
+
     def _get_tabulate_params(self) -> Dict[str, Any]:
         params: Dict[str, Any] = {'tablefmt': 'latex_raw'}
         params.update(super()._get_tabulate_params())
@@ -75,14 +294,18 @@ class LatexTable(Table):
         self._write_line(f'\\newcommand{{\\{name}}}{{{value}}}', depth, writer)
 
     def _write_table_content(self, depth: int, writer: TextIOBase,
-                             content: List[str]):
+                             content: Sequence[str]):
         """Write the text of the table's rows and columns."""
         n_hlines: int = 0
         hl_map: Dict[int, str] = {
             0: r'\toprule',
             1: r'\midrule',
             2: r'\bottomrule'}
-        for lix, ln in enumerate(content[self.row_range[0]:self.row_range[1]]):
+        # slice without copying since the content might be created lazily
+        rows: range = range(len(content))[slice(*self.row_range)]
+        lines: Iterable[str] = it.islice(
+            content, rows.start, max(rows.start, rows.stop))
+        for lix, ln in enumerate(lines):
             if lix in self.row_deletes:
                 continue
             if self.booktabs:
@@ -115,9 +338,8 @@ class SlackTable(LatexTable):
     def columns(self) -> str:
         cols: str = self.column_aligns
         if cols is None:
-            df: pd.DataFrame = self.formatted_dataframe
             i: int = self.slack_column
-            cols = ('l' * (df.shape[1] - 1))
+            cols = ('l' * (self._get_column_count() - 1))
             cols = cols[:i] + 'X' + cols[i:]
             cols = '|' + '|'.join(cols) + '|'
         if self.booktabs:
@@ -125,6 +347,21 @@ class SlackTable(LatexTable):
         return cols
 
 
+def _format_table(table: Table, depth: int) -> Tuple[str, Optional[str]]:
+    """Format a table in a worker process.
+
+    :return: the text of the table and ``None``, or the text written before
+             the error and an error message if it could not be formatted
+
+    """
+    sio = StringIO()
+    try:
+        table.write(depth, sio)
+        return (sio.getvalue(), None)
+    except Exception as e:
+        return (sio.getvalue(), f"could not format table '{table.name}': {e}")
+
+
 @dataclass
 class CsvToLatexTable(Writable):
     """Generate a Latex table from a CSV file.
@@ -136,8 +373,20 @@ class CsvToLatexTable(Writable):
     package_name: str = field()
     """The name Latex .sty package."""
 
-    def _write_header(self, depth: int, writer: TextIOBase):
-        date = datetime.now().strftime('%Y/%m/%d')
+    manifest: BuildManifest = field(default=None)
+    """The content hashes of previously rendered tables, which is used to
+    reuse the text of tables that have not changed, or ``None`` to render all
+    tables.
+
+    """
+    workers: int = field(default=1)
+    """The number of processes used to format the tables in parallel, or 1 to
+    format each table in this process.
+
+    """
+    def _write_header(self, depth: int, writer: TextIOBase, date: str = None):
+        if date is None:
+            date = datetime.now().strftime('%Y/%m/%d')
         writer.write("""\\NeedsTeXFormat{LaTeX2e}
 \\ProvidesPackage{%(package_name)s}[%(date)s Tables]
 
@@ -149,19 +398,112 @@ class CsvToLatexTable(Writable):
         if len(uses) > 0:
             writer.write('\n')
 
+    def _write_table(self, table: Table, depth: int, writer: TextIOBase) -> \
+            bool:
+        """Write a table, or an error comment if it could not be formatted.
+
+        :return: whether the table was written without error
+
+        """
+        try:
+            table.write(depth, writer)
+            return True
+        except Exception as e:
+            msg: str = f"could not format table '{table.name}': {e}"
+            self._write_line(f'% erorr: {msg}', depth, writer)
+            logger.error(msg)
+            return False
+
+    def _format_tables(self, tables: Sequence[Table], depth: int) -> \
+            Iterable[Tuple[str, bool]]:
+        """Format tables in the order given, which is done in parallel by
+        :obj:`workers` processes when there is more than one.
+
+        :return: tuples of the text of each table, which ends with an error
+                 comment if it could not be formatted, and whether it was
+                 formatted; the text is the same as that of
+                 :meth:`_write_table` regardless of the number of workers
+
+        """
+        if self.workers > 1 and len(tables) > 1:
+            workers: int = min(self.workers, len(tables))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f'formatting {len(tables)} tables ' +
+                            f'with {workers} workers')
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                text: str
+                msg: str
+                for text, msg in pool.map(
+                        _format_table, tables, it.repeat(depth)):
+                    if msg is not None:
+                        # match the partial output of a serial write
+                        sio = StringIO(text)
+                        sio.seek(0, 2)
+                        self._write_line(f'% erorr: {msg}', depth, sio)
+                        logger.error(msg)
+                        text = sio.getvalue()
+                    yield (text, msg is None)
+        else:
+            table: Table
+            for table in tables:
+                sio = StringIO()
+                success: bool = self._write_table(table, depth, sio)
+                yield (sio.getvalue(), success)
+
+    def _write_incremental(self, depth: int, writer: TextIOBase):
+        """Write the tables reusing the text in :obj:`manifest` of unchanged
+        tables.  The header date is kept when no table changed so the output
+        is identical to the previous rendering.
+
+        """
+        manifest: BuildManifest = self.manifest
+        keys: Tuple[str, ...] = tuple(map(manifest.get_key, self.tables))
+        blocks: List[str] = list(map(
+            lambda t, k: manifest.get(t.name, k), self.tables, keys))
+        renders: Tuple[int, ...] = tuple(filter(
+            lambda i: blocks[i] is None, range(len(blocks))))
+        fails: Set[int] = set()
+        i: int
+        text: str
+        success: bool
+        for i, (text, success) in zip(renders, self._format_tables(
+                tuple(map(lambda i: self.tables[i], renders)), depth)):
+            blocks[i] = text
+            # tables that could not be formatted are rendered every time
+            if not success:
+                fails.add(i)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f'rendered {len(renders)} of {len(blocks)} tables')
+        date: str = manifest.date
+        if len(renders) > 0 or date is None or \
+           tuple(map(lambda t: t.name, self.tables)) != manifest.table_names:
+            date = datetime.now().strftime('%Y/%m/%d')
+        manifest.set_tables(dict(map(
+            lambda i: (self.tables[i].name, (keys[i], blocks[i])),
+            filter(lambda i: i not in fails, range(len(blocks))))))
+        manifest.date = date
+        self._write_header(depth, writer, date)
+        for text in blocks:
+            writer.write(text)
+            writer.write('\n')
+
     def write(self, depth: int = 0, writer: TextIOBase = sys.stdout):
         """Write the Latex table to the writer given in the initializer.
 
         """
+        if self.manifest is not None:
+            self._write_incremental(depth, writer)
+            return
         tlen: int = len(self.tables)
         self._write_header(depth, writer)
+        if self.workers > 1:
+            text: str
+            for text, _ in self._format_tables(self.tables, depth):
+                writer.write(text)
+                writer.write('\n')
+            return
         for i, table in enumerate(self.tables):
-            try:
-                table.write(depth, writer)
-            except Exception as e:
-                msg: str = f"could not format table '{table.name}': {e}"
-                self._write_line(f'% erorr: {msg}', depth, writer)
-                logger.error(msg, e)
+            self._write_table(table, depth, writer)
             if i < tlen:
                 writer.write('\n')
 
@@ -176,6 +518,17 @@ class RenderableLatexTable(Renderable):
     """Reads the table definitions file and writes a Latex ``.sty`` file of the
     generated tables from the CSV data.
 
+    """
+    incremental: bool = field(default=False)
+    """Whether to reuse the text of tables whose definition, CSV file, template
+    and package version are unchanged since the last rendering, which is kept
+    in a manifest file next to the output (see :class:`.BuildManifest`).
+
+    """
+    workers: int = field(default=1)
+    """The number of processes used to format the tables in parallel (see
+    :obj:`.CsvToLatexTable.workers`).
+
     """
     def get_tables(self) -> Iterable[Table]:
         """Return the tables configured in :obj:`path`."""
@@ -184,6 +537,11 @@ class RenderableLatexTable(Renderable):
     def get_artifacts(self):
         return self.get_tables()
 
+    def get_dependencies(self) -> Iterable[Path]:
+        return chain.from_iterable(
+            ((self.path,), filter(lambda p: p is not None,
+                                  map(lambda t: t.path, self.get_tables()))))
+
     def render(self, output: Path) -> Path:
         tables: tuple[Table, ...] = tuple(self.get_tables())
         if len(tables) == 0:
@@ -191,9 +549,38 @@ class RenderableLatexTable(Renderable):
         package_name: str = tables[0].package_name
         if logger.isEnabledFor(logging.INFO):
             logger.info(f'{self.path} -> {output}, pkg={package_name}')
-        with stdout(output, extension='sty', logger=logger) as f:
-            tab = CsvToLatexTable(tables, package_name)
-            tab.write(writer=f)
-        if hasattr(f, 'name'):
-            output = Path(f.name)
+        if self.incremental and output is not None and \
+           not stdout.is_stdout(Path(output)):
+            return (self._render_incremental(output, tables, package_name),)
+        tab = CsvToLatexTable(tables, package_name, workers=self.workers)
+        if output is None or stdout.is_stdout(Path(output)):
+            with stdout(output, extension='sty', logger=logger) as f:
+                tab.write(writer=f)
+            if hasattr(f, 'name'):
+                output = Path(f.name)
+        else:
+            output = self._get_output_path(output)
+            with OutputWriter.default_instance().open(output) as f:
+                tab.write(writer=f)
         return (output,)
+
+    def _get_output_path(self, output: Path) -> Path:
+        output = Path(output)
+        if len(output.suffix) == 0:
+            output = output.parent / f'{output.name}.sty'
+        return output
+
+    def _render_incremental(self, output: Path, tables: Tuple[Table, ...],
+                            package_name: str) -> Path:
+        """Render only changed tables and write ``output`` only if its content
+        changed.
+
+        """
+        output = self._get_output_path(output)
+        manifest = BuildManifest(output.parent / f'.{output.name}.json')
+        tab = CsvToLatexTable(
+            tables, package_name, manifest, self.workers)
+        with OutputWriter.default_instance().open(output) as f:
+            tab.write(writer=f)
+        manifest.save()
+        return output
@@ -0,0 +1,166 @@
+"""A manifest of content hashes used to incrementally render tables.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import Dict, Tuple, Any, Optional, ClassVar
+from dataclasses import dataclass, field, fields
+import logging
+import json
+import hashlib
+from pathlib import Path
+from importlib import metadata
+from . import Table
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BuildManifest(object):
+    """A JSON file of rendered table text keyed by the hashes of the table
+    inputs.  The hash of a table covers its definition, including the resolved
+    template, the content of its CSV file and the version of this package.  A
+    table with an unchanged hash reuses its previously rendered text.
+
+    Files read by table code (i.e. :obj:`.Table.code_pre`), other than the
+    table's CSV file, are not tracked.
+
+    """
+    _PACKAGE: ClassVar[str] = 'zensols.datdesc'
+    """The name of the package used to get the installed version."""
+
+    _FILE_HASHES: ClassVar[Dict[Tuple[str, int, int], str]] = {}
+    """File content hashes keyed by path, modification time and size."""
+
+    path: Path = field()
+    """The manifest JSON file."""
+
+    def __post_init__(self):
+        self.version: str = self._get_version()
+        self._data: Dict[str, Any] = {'version': self.version, 'tables': {}}
+        self._modified: bool = False
+        if self.path.is_file():
+            try:
+                with open(self.path) as f:
+                    data: Dict[str, Any] = json.load(f)
+                if data.get('version') == self.version:
+                    self._data = data
+            except Exception as e:
+                logger.warning(f'could not read manifest {self.path}: {e}')
+
+    @classmethod
+    def _get_version(cls: type) -> str:
+        try:
+            return metadata.version(cls._PACKAGE)
+        except metadata.PackageNotFoundError:
+            return 'unknown'
+
+    @classmethod
+    def _hash_file(cls: type, path: Path) -> Optional[str]:
+        """Return the hash of the contents of ``path``, or ``None`` if it is
+        not a file.
+
+        """
+        path = Path(path)
+        if not path.is_file():
+            return None
+        stat = path.stat()
+        key: Tuple[str, int, int] = \
+            (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+        digest: str = cls._FILE_HASHES.get(key)
+        if digest is None:
+            with open(path, 'rb') as f:
+                digest = hashlib.file_digest(f, 'sha256').hexdigest()
+            cls._FILE_HASHES[key] = digest
+        return digest
+
+    @staticmethod
+    def _to_json(obj: Any) -> Any:
+        if isinstance(obj, (set, frozenset)):
+            return sorted(obj, key=repr)
+        return str(obj)
+
+    @classmethod
+    def _canonical(cls: type, obj: Any) -> Any:
+        """Return ``obj`` with the keys of its dictionaries replaced by their
+        ``repr`` so keys of mixed types can be sorted and keys such as ``1``
+        and ``'1'`` hash differently.
+
+        """
+        if isinstance(obj, dict):
+            return dict(map(lambda t: (repr(t[0]), cls._canonical(t[1])),
+                            obj.items()))
+        if isinstance(obj, (list, tuple)):
+            return list(map(cls._canonical, obj))
+        if isinstance(obj, (set, frozenset)):
+            return sorted(map(cls._canonical, obj), key=repr)
+        return obj
+
+    def get_key(self, table: Table) -> str:
+        """Return the hash of the inputs of ``table``."""
+        defn: Dict[str, Any] = self._canonical(
+            {f.name: getattr(table, f.name) for f in fields(table)})
+        content: str = json.dumps(
+            {'definition': defn,
+             'type': f'{table.__class__.__module__}.' +
+             table.__class__.__qualname__,
+             'csv': None if table.path is None
+             else self._hash_file(table.path),
+             'version': self.version},
+            sort_keys=True, default=self._to_json)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    @property
+    def date(self) -> Optional[str]:
+        """The date written in the rendered file header."""
+        return self._data.get('date')
+
+    @date.setter
+    def date(self, date: str):
+        """The date written in the rendered file header."""
+        if self._data.get('date') != date:
+            self._data['date'] = date
+            self._modified = True
+
+    @property
+    def table_names(self) -> Tuple[str, ...]:
+        """The names of the tables in the manifest in rendered order."""
+        return tuple(self._data['tables'].keys())
+
+    def get(self, name: str, key: str) -> Optional[str]:
+        """Return the rendered text of a table.
+
+        :param name: the name of the table
+
+        :param key: the hash of the table inputs from :meth:`get_key`
+
+        :return: the text or ``None`` if the table has changed
+
+        """
+        entry: Dict[str, str] = self._data['tables'].get(name)
+        if entry is not None and entry['key'] == key:
+            return entry['text']
+
+    def set_tables(self, tables: Dict[str, Tuple[str, str]]):
+        """Set the rendered text of the tables.
+
+        :param tables: table name to ``(key, text)`` tuples in rendered order
+
+        """
+        entries: Dict[str, Dict[str, str]] = {
+            name: {'key': key, 'text': text}
+            for name, (key, text) in tables.items()}
+        if entries != self._data['tables'] or \
+           tuple(entries.keys()) != self.table_names:
+            self._data['tables'] = entries
+            self._modified = True
+
+    def save(self):
+        """Write the manifest file if it changed."""
+        if self._modified:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump(self._data, f, indent=2)
+            self._modified = False
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'wrote manifest: {self.path}')
@@ -0,0 +1,138 @@
+"""Atomic output files that are only replaced when their content changes.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import List, Iterator, IO, ClassVar
+from dataclasses import dataclass, field
+import sys
+import os
+import logging
+import hashlib
+import secrets
+from contextlib import contextmanager
+from io import TextIOBase
+from pathlib import Path
+from zensols.config import Writable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutputWriter(Writable):
+    """Writes output files to a temporary file in the same directory, which
+    atomically replaces the output file only when the content differs.  Files
+    are compared by size first, then by their content hashes.  Leaving an
+    unchanged file in place keeps its modification time so LaTeX and ``make``
+    do not rebuild their dependents.
+
+    The paths of written and skipped (unchanged) files are recorded in
+    :obj:`written` and :obj:`skipped`.
+
+    """
+    _DEFAULT_INSTANCE: ClassVar[OutputWriter] = None
+    """The singleton instance when not created from a configuration factory."""
+
+    compare: bool = field(default=True)
+    """Whether to keep existing files that have the same content.  If
+    ``False``, files are always (atomically) replaced.
+
+    """
+    log_level: int = field(default=logging.INFO)
+    """The level used to log written and unchanged files."""
+
+    def __post_init__(self):
+        self.written: List[Path] = []
+        self.skipped: List[Path] = []
+
+    @classmethod
+    def default_instance(cls: OutputWriter) -> OutputWriter:
+        """Get the singleton instance."""
+        if cls._DEFAULT_INSTANCE is None:
+            cls._DEFAULT_INSTANCE = cls()
+        return cls._DEFAULT_INSTANCE
+
+    @staticmethod
+    def _hash(path: Path) -> str:
+        with open(path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+    def _is_same(self, a: Path, b: Path) -> bool:
+        """Return whether two files have the same content."""
+        if not b.is_file() or a.stat().st_size != b.stat().st_size:
+            return False
+        return self._hash(a) == self._hash(b)
+
+    def _commit(self, temp: Path, path: Path) -> bool:
+        """Replace ``path`` with ``temp`` if their content differs.
+
+        :return: whether ``path`` was replaced
+
+        """
+        if self.compare and self._is_same(temp, path):
+            temp.unlink()
+            self.skipped.append(path)
+            if logger.isEnabledFor(self.log_level):
+                logger.log(self.log_level, f'unchanged: {path}')
+            return False
+        os.replace(temp, path)
+        self.written.append(path)
+        if logger.isEnabledFor(self.log_level):
+            logger.log(self.log_level, f'wrote: {path}')
+        return True
+
+    @contextmanager
+    def path(self, path: Path) -> Iterator[Path]:
+        """Return a context manager that provides a temporary file path for the
+        enclosed code to write.  The temporary file has the same suffix as
+        ``path`` and replaces it when the context exits without error and the
+        content changed.  The temporary file is removed on error.
+
+        :param path: the output file path
+
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.parent / \
+            f'.{path.stem}.{secrets.token_hex(4)}.tmp{path.suffix}'
+        try:
+            yield temp
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+        if temp.is_file():
+            self._commit(temp, path)
+        elif logger.isEnabledFor(logging.WARNING):
+            logger.warning(f'nothing written to: {path}')
+
+    @contextmanager
+    def open(self, path: Path, mode: str = 'w', **kwargs) -> Iterator[IO]:
+        """Like :meth:`path`, but provide an open file handle.
+
+        :param path: the output file path
+
+        :param mode: the mode given to :func:`open`
+
+        :param kwargs: additional keyword arguments given to :func:`open`
+
+        """
+        with self.path(path) as temp:
+            with open(temp, mode, **kwargs) as f:
+                yield f
+
+    def clear(self):
+        """Clear the written and skipped paths."""
+        self.written.clear()
+        self.skipped.clear()
+
+    def __str__(self) -> str:
+        return f'wrote {len(self.written)}, ' + \
+            f'skipped {len(self.skipped)} unchanged file(s)'
+
+    def write(self, depth: int = 0, writer: TextIOBase = sys.stdout):
+        self._write_line(str(self), depth, writer)
+        path: Path
+        for path in self.written:
+            self._write_line(f'wrote: {path}', depth + 1, writer)
+        for path in self.skipped:
+            self._write_line(f'unchanged: {path}', depth + 1, writer)
@@ -1,17 +1,21 @@
 """Common used plots for ML.
 
 """
+from __future__ import annotations
 __author__ = 'Paul Landes'
-
-from typing import Tuple, List, Dict, Sequence, Iterable, Any, Union, Callable
+from typing import (
+    TYPE_CHECKING,
+    Tuple, List, Dict, Sequence, Iterable, Any, Union, Callable
+)
 from dataclasses import dataclass, field
 import logging
 import itertools as it
 import math
-from matplotlib.pyplot import Axes
 import pandas as pd
 from zensols.util import APIError
 from .figure import Plot
+if TYPE_CHECKING:
+    from matplotlib.pyplot import Axes
 
 logger = logging.getLogger(__name__)
 
@@ -29,10 +33,14 @@ class PaletteContainerPlot(Plot):
 
     """
     def __post_init__(self):
-        import seaborn as sns
         super().__post_init__()
-        self._set_defaults(
-            palette=lambda n: sns.color_palette('hls', n_colors=n))
+        self._set_defaults(palette=self._get_default_palette)
+
+    @staticmethod
+    def _get_default_palette(n_colors: int) -> List[Tuple[int, int, int]]:
+        # import on first use so figures can be parsed without seaborn
+        import seaborn as sns
+        return sns.color_palette('hls', n_colors=n_colors)
 
     def _get_palette(self, hue_names: Sequence[str]) -> \
             Dict[str, Tuple[int, int, int]]:
@@ -0,0 +1,178 @@
+"""Wall time and memory instrumentation of the table formatting pipeline.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import TYPE_CHECKING, Tuple, List, Iterator, ClassVar, Any
+from dataclasses import dataclass, field
+import sys
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from io import TextIOBase
+import pandas as pd
+from zensols.config import Writable
+if TYPE_CHECKING:
+    from .desc import DataFrameDescriber
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TableProfiler(Writable):
+    """Records the wall time and memory allocated by each stage of formatting
+    and writing each table.  It is disabled by default, in which case
+    :meth:`measure` does nothing.  The stages are:
+
+      * ``read_csv``: parse the CSV file (only when not already cached)
+      * ``format``: all formatting stages of the table's dataframe, which
+        includes the code, number formatting, emphasis and column stages
+      * ``code_pre``, ``code_post``, ``code_format``: evaluate the table's code
+      * ``number_format``: round, percent and other number formatting
+      * ``emphasis``: bold and capitalize cells
+      * ``columns``: add indexes, replace, remove and rename columns
+      * ``variables``: evaluate and write :obj:`.Table.variables`
+      * ``tabulate``: create the table rows and columns
+      * ``template``: render the Jinja2 template
+      * ``write``: write the rendered table, which includes streamed rows
+
+    Measurements are only recorded in the process that enabled the profiler,
+    so tables formatted by worker processes are not included.
+
+    """
+    _DEFAULT_INSTANCE: ClassVar[TableProfiler] = None
+    """The singleton instance when not created from a configuration factory."""
+
+    _COLUMNS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ('table', 'the name of the table'),
+        ('stage', 'the formatting stage'),
+        ('calls', 'the number of times the stage was measured'),
+        ('seconds', 'the wall time of the stage in seconds'),
+        ('memory', 'the peak memory allocated by the stage in bytes'))
+    """The profile dataframe column names and descriptions."""
+
+    enabled: bool = field(default=False)
+    """Whether to record measurements."""
+
+    memory: bool = field(default=True)
+    """Whether to record allocated memory with :mod:`tracemalloc`, which slows
+    down execution while enabled.
+
+    """
+    def __post_init__(self):
+        self._entries: List[Tuple[str, str, float, int]] = []
+        # start memory and peak memory of enclosing stages
+        self._frames: List[List[int]] = []
+        self._started: bool = False
+
+    @classmethod
+    def default_instance(cls: TableProfiler) -> TableProfiler:
+        """Get the singleton instance."""
+        if cls._DEFAULT_INSTANCE is None:
+            cls._DEFAULT_INSTANCE = cls()
+        return cls._DEFAULT_INSTANCE
+
+    @contextmanager
+    def _measure(self, table: str, stage: str) -> Iterator[None]:
+        track: bool = self.memory
+        if track:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            current, peak = tracemalloc.get_traced_memory()
+            if len(self._frames) > 0:
+                parent: List[int] = self._frames[-1]
+                parent[1] = max(parent[1], peak)
+            self._frames.append([current, 0])
+            tracemalloc.reset_peak()
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds: float = time.perf_counter() - start
+            allocated: int = 0
+            if track:
+                base, prev_peak = self._frames.pop()
+                peak: int = max(prev_peak, tracemalloc.get_traced_memory()[1])
+                allocated = max(0, peak - base)
+                if len(self._frames) > 0:
+                    parent: List[int] = self._frames[-1]
+                    parent[1] = max(parent[1], peak)
+            self._entries.append((table, stage, seconds, allocated))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'{table}: {stage}: {seconds:.4f}s, ' +
+                             f'{allocated / 1024:.1f}KB')
+
+    def measure(self, table: str, stage: str) -> Any:
+        """Return a context manager that measures the code it encloses.
+
+        :param table: the name of the table
+
+        :param stage: the name of the stage
+
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(table, stage)
+
+    def clear(self):
+        """Clear the measurements and stop memory tracking if it was started by
+        this instance.
+
+        """
+        self._entries.clear()
+        self._frames.clear()
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started = False
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        """The measurements summed (time) and maximized (memory) by table and
+        stage, and sorted by descending time.
+
+        """
+        cols: List[str] = [c[0] for c in self._COLUMNS]
+        df = pd.DataFrame(self._entries, columns=['table', 'stage', 'seconds',
+                                                  'memory'])
+        df = df.groupby(['table', 'stage'], sort=False).agg(
+            calls=('seconds', 'size'),
+            seconds=('seconds', 'sum'),
+            memory=('memory', 'max')).reset_index()
+        return df.sort_values('seconds', ascending=False, kind='stable')[cols].\
+            reset_index(drop=True)
+
+    def create_describer(self) -> DataFrameDescriber:
+        """Return the measurements (see :obj:`dataframe`) as a describer."""
+        from .desc import DataFrameDescriber
+        return DataFrameDescriber(
+            name='tableProfile',
+            df=self.dataframe,
+            desc='Wall time and memory of table formatting stages.',
+            meta=self._COLUMNS)
+
+    def _get_hottest(self, by: str, limit: int) -> pd.DataFrame:
+        df: pd.DataFrame = self.dataframe
+        return df.groupby(by, sort=False).agg(
+            seconds=('seconds', 'sum'),
+            memory=('memory', 'max')).\
+            sort_values('seconds', ascending=False).head(limit)
+
+    def write(self, depth: int = 0, writer: TextIOBase = sys.stdout,
+              limit: int = 10):
+        """Write the tables and stages that took the most time.
+
+        :param limit: the number of tables and stages to write
+
+        """
+        if len(self._entries) == 0:
+            self._write_line('no measurements', depth, writer)
+            return
+        by: str
+        for by in ('table', 'stage'):
+            df: pd.DataFrame = self._get_hottest(by, limit)
+            df['memory'] = (df['memory'] / 1024).map(lambda v: f'{v:.1f}KB')
+            df['seconds'] = df['seconds'].map(lambda v: f'{v:.4f}')
+            self._write_line(f'hottest {by}s:', depth, writer)
+            self._write_block(df.to_string(), depth + 1, writer)
@@ -1,7 +1,10 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from dataclasses import dataclass, field
 from pathlib import Path
-from . import TableFactory, Table, DataFrameDescriber, DataDescriber
 from .app import Application
+if TYPE_CHECKING:
+    from . import Table, DataFrameDescriber
 
 
 @dataclass
@@ -11,12 +14,14 @@ class PrototypeApplication(object):
     app: Application = field()
 
     def _create_example(self):
+        from . import TableFactory
         TableFactory.reset_default_instance()
         dfd: DataFrameDescriber = self.app._get_example()
         table: Table = dfd.create_table(type='one_column')
         table.write()
 
     def _create_write_example(self):
+        from . import TableFactory
         TableFactory.reset_default_instance()
         dfd: DataFrameDescriber = self.app._get_example()
         table: Table = dfd.create_table(type='one_column')
@@ -27,12 +32,14 @@ class PrototypeApplication(object):
         #table2 = next(TableFactory.default_instance().from_file(ofile))
 
     def _create_write_yml(self):
+        from . import DataDescriber
         dd = DataDescriber.from_describer(self.app._get_example())
         out = Path('tmp')
         dd.save(out, out, False)
         dd.save_json(out)
 
     def _from_file_example(self):
+        from . import TableFactory
         tab_file = Path('test-resources/config/sections-table.yml')
         ofile = Path('example.yml')
         table = next(TableFactory.default_instance().from_file(tab_file))
@@ -41,6 +48,7 @@ class PrototypeApplication(object):
             print(f.read().strip())
 
     def _create_save_example(self):
+        from . import TableFactory, DataDescriber
         TableFactory.reset_default_instance()
         dfd: DataFrameDescriber = self.app._get_example()
         dd = DataDescriber.from_describer(dfd)
@@ -49,6 +57,7 @@ class PrototypeApplication(object):
         #dd.save()
 
     def _create_write_json_example(self):
+        from . import TableFactory, DataDescriber
         TableFactory.reset_default_instance()
         dfd: DataFrameDescriber = self.app._get_example()
         dd = DataDescriber.from_describer(dfd)
@@ -1,14 +1,17 @@
 """Classes to create first class object and process files.
 
 """
-from typing import Iterable, Any
+from typing import Iterable, Sequence, Any
 from dataclasses import dataclass, field
 from abc import abstractmethod, ABCMeta
+import sys
 import logging
 import re
 from pathlib import Path
-from zensols.config import Dictable, ConfigFactory
+from io import TextIOBase
+from zensols.config import Dictable, Writable, ConfigFactory
 from . import DataDescriptionError
+from .output import OutputWriter
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,13 @@ class Renderable(Dictable, metaclass=ABCMeta):
         """See :meth:`get_artifacts`."""
         return self.get_artifacts()
 
+    def get_dependencies(self) -> Iterable[Path]:
+        """Return the files read to render :obj:`path`, which includes
+        :obj:`path` itself.
+
+        """
+        return iter((self.path,))
+
     @abstractmethod
     def render(self, output: Path) -> Path:
         """Write the rendered output.
@@ -39,6 +49,56 @@ class Renderable(Dictable, metaclass=ABCMeta):
         pass
 
 
+@dataclass
+class MakeDependency(Writable):
+    """A GNU make dependency (``.d``) file with a rule that makes the rendered
+    output files depend on the files read to render them.  Like ``gcc -MP``, an
+    empty rule is added for each dependency so ``make`` does not fail when one
+    is removed.  The file can then be added to a ``Makefile`` with ``-include
+    *.d``.
+
+    """
+    targets: Sequence[Path] = field()
+    """The rendered output files."""
+
+    dependencies: Sequence[Path] = field()
+    """The files read to render :obj:`targets`."""
+
+    @staticmethod
+    def _escape(path: Path) -> str:
+        return re.sub(r'([ #:])', r'\\\1', str(path)).replace('$', '$$')
+
+    def _get_dependencies(self) -> Iterable[str]:
+        targets: set[str] = set(map(self._escape, self.targets))
+        seen: set[str] = set()
+        path: Path
+        for path in self.dependencies:
+            dep: str = self._escape(path)
+            if dep not in seen and dep not in targets:
+                seen.add(dep)
+                yield dep
+
+    def write(self, depth: int = 0, writer: TextIOBase = sys.stdout):
+        deps: tuple[str, ...] = tuple(self._get_dependencies())
+        rule: str = ' '.join(map(self._escape, self.targets)) + ':'
+        self._write_line(' \\\n'.join((rule, *map(
+            lambda d: self._sp(depth + 1) + d, deps))), depth, writer)
+        dep: str
+        for dep in deps:
+            self._write_empty(writer)
+            self._write_line(f'{dep}:', depth, writer)
+
+    def save(self, path: Path) -> Path:
+        """Write the dependency file if its content changed.
+
+        :param path: the ``.d`` file to write
+
+        """
+        with OutputWriter.default_instance().open(path) as f:
+            self.write(writer=f)
+        return path
+
+
 @dataclass
 class RenderableFactory(Dictable):
     """Creates instances of :class:`.Renderable` from file paths.
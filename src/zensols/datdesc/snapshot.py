@@ -0,0 +1,161 @@
+"""A cache of the parsed configuration used by the stand-alone factories.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import Dict, List, Any, Iterable, ClassVar
+from dataclasses import dataclass, field
+import os
+import logging
+import json
+import hashlib
+from io import StringIO
+from pathlib import Path
+from importlib import metadata
+from configparser import ConfigParser
+from zensols.config import (
+    Configurable, Serializer, ImportIniConfig, DictionaryConfig
+)
+from .output import OutputWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConfigSnapshot(object):
+    """Saves the sections of a parsed :class:`~zensols.config.ImportIniConfig`
+    as a JSON file in the user's cache directory.  Later processes create the
+    configuration from the snapshot, which avoids parsing and interpolating
+    the configuration files imported from package resources.  This is used by
+    :meth:`.TableFactory.default_instance` and
+    :meth:`.FigureFactory.default_instance`.
+
+    A snapshot is recreated when the package version, the current directory
+    (which can change how resources are found), the configuration text, or the
+    modification time or size of an imported resource file changes.
+
+    """
+    _DEFAULT_INSTANCE: ClassVar[ConfigSnapshot] = None
+    """The singleton instance when not created from a configuration factory."""
+
+    _PACKAGE: ClassVar[str] = 'zensols.datdesc'
+    """The name of the package used to get the installed version."""
+
+    cache_dir: Path = field(default=None)
+    """The directory of the snapshot files, which defaults to
+    ``$XDG_CACHE_HOME/zensols/datdesc`` or ``~/.cache/zensols/datdesc``.
+
+    """
+    enabled: bool = field(default=True)
+    """Whether to use snapshots.  If ``False``, the configuration is always
+    parsed.
+
+    """
+    def __post_init__(self):
+        if self.cache_dir is None:
+            base: str = os.environ.get('XDG_CACHE_HOME')
+            base_dir: Path = Path('~/.cache').expanduser() \
+                if base is None else Path(base)
+            self.cache_dir = base_dir / 'zensols' / 'datdesc'
+
+    @classmethod
+    def default_instance(cls: ConfigSnapshot) -> ConfigSnapshot:
+        """Get the singleton instance."""
+        if cls._DEFAULT_INSTANCE is None:
+            cls._DEFAULT_INSTANCE = cls()
+        return cls._DEFAULT_INSTANCE
+
+    @classmethod
+    def _get_version(cls: type) -> str:
+        try:
+            return metadata.version(cls._PACKAGE)
+        except metadata.PackageNotFoundError:
+            return 'unknown'
+
+    @staticmethod
+    def _get_resources(config: str) -> Iterable[Path]:
+        """Return the files referenced by the options of ``config``."""
+        parser = ConfigParser()
+        parser.read_string(config)
+        ser = Serializer()
+        sec: str
+        for sec in parser.sections():
+            val: str
+            for val in parser[sec].values():
+                obj: Any = ser.parse_object(val)
+                if isinstance(obj, str):
+                    obj = Path(obj)
+                if isinstance(obj, Path) and obj.is_file():
+                    yield obj.resolve()
+
+    @staticmethod
+    def _stat(paths: Iterable[Path]) -> Dict[str, List[int]]:
+        stats: Dict[str, List[int]] = {}
+        path: Path
+        for path in paths:
+            if path.is_file():
+                st: os.stat_result = path.stat()
+                stats[str(path)] = [st.st_mtime_ns, st.st_size]
+        return stats
+
+    def _get_key(self, config: str) -> str:
+        content: str = json.dumps([self._get_version(), str(Path.cwd()),
+                                   config])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _load(self, path: Path, key: str) -> Dict[str, Dict[str, str]]:
+        """Return the sections of a snapshot, or ``None`` if it is missing or
+        stale.
+
+        """
+        if not path.is_file():
+            return None
+        try:
+            with open(path) as f:
+                snap: Dict[str, Any] = json.load(f)
+        except Exception as e:
+            logger.warning(f'could not read config snapshot {path}: {e}')
+            return None
+        files: Dict[str, List[int]] = snap.get('files', {})
+        if snap.get('key') != key or \
+           self._stat(map(Path, files.keys())) != files:
+            return None
+        return snap['sections']
+
+    def _save(self, path: Path, key: str, files: Dict[str, List[int]],
+              sections: Dict[str, Dict[str, str]]):
+        try:
+            # a separate writer so snapshots are not counted as outputs
+            writer = OutputWriter(compare=False, log_level=logging.DEBUG)
+            with writer.open(path) as f:
+                json.dump({'key': key, 'files': files, 'sections': sections},
+                          f)
+        except OSError as e:
+            logger.warning(f'could not write config snapshot {path}: {e}')
+
+    def create_config(self, name: str, config: str) -> Configurable:
+        """Create a configuration from a snapshot, or parse it and save a new
+        snapshot if none exists or if the snapshot is stale.
+
+        :param name: the unique name of the configuration used as the snapshot
+                     file name
+
+        :param config: the :class:`~zensols.config.ImportIniConfig` text,
+                       whose referenced resource files are tracked
+
+        """
+        if not self.enabled:
+            return ImportIniConfig(StringIO(config))
+        path: Path = self.cache_dir / f'{name}.json'
+        key: str = self._get_key(config)
+        sections: Dict[str, Dict[str, str]] = self._load(path, key)
+        if sections is None:
+            files: Dict[str, List[int]] = self._stat(
+                self._get_resources(config))
+            parsed = ImportIniConfig(StringIO(config))
+            sections = {sec: dict(parsed.get_options(sec))
+                        for sec in sorted(parsed.sections)}
+            self._save(path, key, files, sections)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'saved config snapshot: {path}')
+        return DictionaryConfig(sections)
@@ -5,28 +5,35 @@ from __future__ import annotations
 __author__ = 'Paul Landes'
 from typing import (
     Dict, List, Sequence, Tuple, Any, Iterable, Set,
-    ClassVar, Optional, Callable, Union
+    ClassVar, Optional, Callable, Union, Type
 )
 from dataclasses import dataclass, field
 from abc import abstractmethod, ABCMeta
 import logging
 import sys
 import re
-import string
 import itertools as it
 import math
+from types import CodeType
 from io import TextIOBase, StringIO
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import yaml
-from jinja2 import Template, Environment, BaseLoader
 from tabulate import tabulate
 from zensols.util import Failure
 from zensols.persist import persisted, PersistedWork, PersistableContainer
 from zensols.config import (
-    Dictable, ConfigFactory, ImportIniConfig, ImportConfigFactory
+    Dictable, Configurable, ConfigFactory, ImportConfigFactory
 )
 from . import LatexTableError
+from .colfmt import ColumnFormatter, ColumnTransformer, CellEmphasis
+from .codecache import CodeCache
+from .template import TemplateCache
+from .csvcache import DataFrameCache, ColumnSelector
+from .profiler import TableProfiler
+from .aggregate import Aggregation
+from .snapshot import ConfigSnapshot
+from .yamlio import YamlCache
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +44,50 @@ config_file = resource(zensols.datdesc): resources/table.yml
 _round: Callable = round
 
 
+class _ContentWriter(object):
+    """Writes table content to another writer with trailing whitespace removed
+    and newlines replaced.  This streams the table content rather than
+    substituting it in the rendered template.
+
+    """
+    def __init__(self, writer: TextIOBase, newline: str):
+        self._writer = writer
+        self._newline = newline
+        self._pending: str = ''
+
+    def write(self, s: str) -> int:
+        text: str = s.rstrip()
+        if len(text) == 0:
+            self._pending += s
+        else:
+            self._writer.write(
+                (self._pending + text).replace('\n', self._newline))
+            self._pending = s[len(text):]
+        return len(s)
+
+
+@dataclass
+class _ChunkScan(object):
+    """The data gathered from a CSV file read in chunks before the table rows
+    are formatted and written a chunk at a time (see :obj:`.Table.chunk_size`).
+
+    """
+    rows: int = field()
+    """The number of rows in the CSV file."""
+
+    dtypes: Dict[str, np.dtype] = field()
+    """The type of each column common to all chunks."""
+
+    emphases: Tuple[Tuple[str, Dict[str, np.ndarray]], ...] = field()
+    """The cells to emphasize (see :meth:`.Table._get_emphasis_masks`)."""
+
+    variables: Dict[str, Any] = field()
+    """The values of the cell :obj:`.Table.variables`."""
+
+    columns: int = field(default=0)
+    """The number of columns in the formatted table."""
+
+
 @dataclass
 class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
     """Generates a Zensols styled Latex table from a CSV file.
@@ -48,6 +99,12 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
     _FILE_NAME_REGEX: ClassVar[re.Pattern] = re.compile(r'(.+)\.yml')
     """Used to narrow down to a :obj:`package_name`."""
 
+    _STAGE_NAMES: ClassVar[Tuple[str, ...]] = (
+        'nascent', 'unformatted', 'postformat', 'formatted')
+    """The names of the dataframe stages of formatting the table (see
+    :obj:`variables`).
+
+    """
     path: Union[Path, str] = field()
     """The path to the CSV file to make a latex table."""
 
@@ -136,6 +193,12 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
     percent_column_names: Sequence[str] = field(default=())
     """Column names that have a percent sign to be escaped."""
 
+    escape_column_names: Sequence[str] = field(default=())
+    """Column names with LaTeX special characters (``&``, ``_``, ``#``, ``$``
+    and ``%``) to be escaped.  Characters already escaped are left as is and
+    non-string values are unchanged.
+
+    """
     make_percent_column_names: Dict[str, Union[int, str]] = field(
         default_factory=dict)
     """Each columnn in the map will get rounded to the value * 100 of the name.
@@ -163,7 +226,30 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
     """
     read_params: Dict[str, str] = field(default_factory=dict)
     """Keyword arguments used in the :meth:`~pandas.read_csv` call when reading
-    the CSV file.
+    the CSV file.  When :obj:`column_keeps` is set, only the columns used by
+    the table are read unless ``usecols`` is given or the table has code or
+    :obj:`variables`.
+
+    """
+    aggregate: Dict[str, Any] = field(default=None)
+    """If set, the CSV file is read in chunks and its rows are grouped and
+    aggregated so only the aggregated data is kept in memory.  The entries are
+    the keyword arguments of :class:`.Aggregation` (``by``, ``columns`` and
+    optionally ``chunk_size``).  The resulting dataframe has the group by
+    columns followed by the aggregated columns.
+
+    """
+    chunk_size: int = field(default=None)
+    """If set, the CSV file is read, formatted and written this many rows at a
+    time so the table is never entirely in memory.  The file is read twice:
+    first to count the rows and get the values used by
+    :obj:`bold_max_columns`, :obj:`emphasis` and cell :obj:`variables`, and
+    then to write the table.  Cells are not padded to align the columns of
+    the output.
+
+    Tables with code (i.e. :obj:`code_pre`), code :obj:`variables`,
+    :obj:`aggregate` or non-default :obj:`tabulate_params` are formatted
+    entirely in memory.
 
     """
     tabulate_params: Dict[str, str] = field(
@@ -189,6 +275,15 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
     bold_max_columns: List[str] = field(default_factory=list)
     """A list of column names that will have its max value bolded."""
 
+    emphasis: List[Dict[str, Any]] = field(default_factory=list)
+    """Cells to emphasize by their rank in columns or rows.  Each entry has
+    the keyword arguments of a :class:`.CellEmphasis` (only ``columns`` is
+    required).  For example, to italicize the three least values of column
+    ``loss`` use ``{columns: [loss], mode: min, k: 3, style: italic}``.  The
+    ranks are computed before number formatting.
+
+    """
+
     capitalize_columns: Dict[str, bool] = field(default_factory=dict)
     """Capitalize either sentences (``False`` values) or every word (``True``
     values).  The keys are column names.
@@ -284,11 +379,16 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
     def _get_columns(self) -> str:
         cols: str = self.column_aligns
         if cols is None:
-            df = self.formatted_dataframe
-            cols = 'l' * df.shape[1]
+            cols = 'l' * self._get_column_count()
             cols = '|' + '|'.join(cols) + '|'
         return cols
 
+    def _get_column_count(self) -> int:
+        """Return the number of columns in the formatted table."""
+        if self._is_chunked():
+            return self._get_chunk_scan().columns
+        return self.formatted_dataframe.shape[1]
+
     @staticmethod
     def format_thousand(x: int, apply_k: bool = True,
                         add_comma: bool = True,
@@ -335,10 +435,18 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
         """
         pass
 
+    def _format_scientific_column(self, col: pd.Series,
+                                  sig_digits: int) -> pd.Series:
+        """Format column ``col`` with :meth:`format_scientific`.  Subclasses
+        can override this to format the column at once.
+
+        """
+        return col.apply(lambda x: self.format_scientific(x, sig_digits))
+
     def _apply_df_eval(self, df: pd.DataFrame, code: str) -> pd.DataFrame:
         if code is not None:
             _locs = locals()
-            exec(code, None, _locs)
+            exec(CodeCache.default_instance().compile(code), None, _locs)
             df = _locs['df']
         return df
 
@@ -359,33 +467,48 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
                 v = fmt.format(v=v, rnd=rnd)
             return v
 
+        fmtr: Type[ColumnFormatter] = ColumnFormatter
+        formatted: Optional[pd.Series]
         col: str
         for col in self.percent_column_names:
-            df[col] = df[col].apply(lambda s: s.replace('%', '\\%'))
+            df[col] = ColumnTransformer.escape_percent(df[col])
+        for col in self.escape_column_names:
+            df[col] = ColumnTransformer.escape_latex(df[col])
         kwargs: Optional[Dict[str, Any]]
         for col, kwargs in self.format_thousands_column_names.items():
             kwargs = {} if kwargs is None else kwargs
-            df[col] = df[col].apply(lambda x: self.format_thousand(x, **kwargs))
+            formatted = fmtr.thousand(df[col], **kwargs)
+            if formatted is None:
+                formatted = df[col].apply(
+                    lambda x: self.format_thousand(x, **kwargs))
+            df[col] = formatted
         for col, mlen in self.format_scientific_column_names.items():
             mlen = 1 if mlen is None else mlen
-            df[col] = df[col].apply(lambda x: self.format_scientific(x, mlen))
+            df[col] = self._format_scientific_column(df[col], mlen)
         for col, rnd in self.round_column_names.items():
             cutoff: int = None
             if isinstance(rnd, (tuple, list)):
                 rnd, cutoff = rnd
-            fmt = f'{{v:.{rnd}f}}'
-            df[col] = df[col].apply(round_val)
+            formatted = fmtr.round(df[col], rnd, cutoff)
+            if formatted is None:
+                fmt = f'{{v:.{rnd}f}}'
+                formatted = df[col].apply(round_val)
+            df[col] = formatted
         for col, rnd in self.make_percent_column_names.items():
-            if isinstance(rnd, str):
-                fmt = rnd
-            else:
-                fmt = f'{{v:.{rnd}f}}\\%'
-            df[col] = df[col].apply(make_per)
+            formatted = fmtr.percent(df[col], rnd)
+            if formatted is None:
+                if isinstance(rnd, str):
+                    fmt = rnd
+                else:
+                    fmt = f'{{v:.{rnd}f}}\\%'
+                formatted = df[col].apply(make_per)
+            df[col] = formatted
         return df
 
-    def _apply_df_add_indexes(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _apply_df_add_indexes(self, df: pd.DataFrame,
+                              start: int = 1) -> pd.DataFrame:
         if self.index_col_name is not None:
-            df[self.index_col_name] = range(1, len(df) + 1)
+            df[self.index_col_name] = range(start, start + len(df))
             cols = df.columns.to_list()
             cols = [cols[-1]] + cols[:-1]
             df = df[cols]
@@ -395,14 +518,17 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
         col: str
         repl: Dict[Any, Any]
         for col, repl in self.column_value_replaces.items():
-            df[col] = df[col].apply(lambda v: repl.get(v, v))
+            df[col] = ColumnTransformer.replace(df[col], repl)
         df = df.drop(columns=self.column_removes)
         if self.column_keeps is not None:
             df = df[self.column_keeps]
         df = df.rename(columns=self.column_renames)
         return df
 
-    def _apply_df_font_format(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _apply_df_font_format(
+            self, df: pd.DataFrame,
+            bold_cells: Sequence[Tuple[int, int]] = None) -> pd.DataFrame:
+        bold_cells = self.bold_cells if bold_cells is None else bold_cells
         if self.replace_nan is not None:
             df = df.infer_objects(copy=False).fillna(self.replace_nan)
         if len(self.blank_columns) > 0:
@@ -410,80 +536,239 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
             for i in self.blank_columns:
                 cols[i] = ''
             df.columns = cols
-        if len(self.bold_cells) > 0:
-            df = self._apply_df_bold_cells(df, self.bold_cells)
+        if len(bold_cells) > 0:
+            df = self._apply_df_bold_cells(df, bold_cells)
         return df
 
     def _apply_df_bold_cells(self, df: pd.DataFrame,
                              cells: Sequence[Tuple[int, int]]):
-        str_cols: bool = len(cells) > 0 and isinstance(cells[0][1], str)
+        if len(cells) == 0:
+            return df
+        str_cols: bool = isinstance(cells[0][1], str)
+        cixs: Dict[str, int] = dict(zip(df.columns, it.count()))
+        rows: np.ndarray = np.array(list(map(lambda c: c[0], cells)), dtype=int)
+        cols: np.ndarray = np.array(list(map(
+            lambda c: cixs[c[1]] if str_cols else c[1], cells)), dtype=int)
+        masks: Dict[int, np.ndarray] = {}
+        col: int
+        for col in np.unique(cols).tolist():
+            mask: np.ndarray = np.zeros(len(df), dtype=bool)
+            mask[rows[cols == col]] = True
+            masks[col] = mask
+        return CellEmphasis.apply(df, masks)
+
+    def _apply_df_emphasis(
+            self, df: pd.DataFrame,
+            emphases: Sequence[Tuple[str, Dict[str, np.ndarray]]]) -> \
+            pd.DataFrame:
+        """Emphasize the cells of masks created by
+        :meth:`_get_emphasis_masks`.
+
+        """
         cixs: Dict[str, int] = dict(zip(df.columns, it.count()))
-        r: int
-        c: int
-        for r, c in cells:
-            val: Any = df[c].iloc[r] if str_cols else df.iloc[r, c]
-            fmt: str = '\\textbf{' + str(val) + '}'
-            if str_cols:
-                c = cixs[c]
-            df.iloc[r, c] = fmt
+        prefix: str
+        masks: Dict[str, np.ndarray]
+        for prefix, masks in emphases:
+            df = CellEmphasis.apply(
+                df, {cixs[c]: m for c, m in masks.items()}, prefix)
         return df
 
     def _apply_df_capitalize(self, df: pd.DataFrame):
         for col, capwords in self.capitalize_columns.items():
-            fn: Callable = string.capwords if capwords else str.capitalize
-            df[col] = df[col].apply(fn)
+            df[col] = ColumnTransformer.capitalize(df[col], capwords)
         return df
 
-    def _get_bold_columns(self, df: pd.DataFrame) -> Tuple[Tuple[int, int]]:
+    def _get_emphases(self) -> Tuple[CellEmphasis, ...]:
+        """Return the emphasis of :obj:`bold_max_columns` and
+        :obj:`emphasis`.
+
+        """
+        emphases: List[CellEmphasis] = []
         if len(self.bold_max_columns) > 0:
-            cixs: List[str] = self.bold_max_columns
-            return tuple(zip(
-                map(lambda cix: df.index.get_loc(df[cix].idxmax()), cixs),
-                cixs))
-        else:
-            return ()
+            emphases.append(CellEmphasis(self.bold_max_columns))
+        try:
+            emphases.extend(map(lambda e: CellEmphasis(**e), self.emphasis))
+        except TypeError as e:
+            raise LatexTableError(f'Bad emphasis: {e}', self.name) from e
+        return tuple(emphases)
+
+    def _get_emphasis_masks(self, df: pd.DataFrame) -> \
+            Tuple[Tuple[str, Dict[str, np.ndarray]], ...]:
+        """Return the LaTeX command prefix and cells to emphasize of each
+        :meth:`_get_emphases`.
+
+        """
+        return tuple(map(lambda e: (e.prefix, e.create_mask(df)),
+                         self._get_emphases()))
 
     @property
     def dataframe(self) -> pd.DataFrame:
         """The Pandas dataframe that holds the CSV data."""
+        if not hasattr(self, '_dataframe_val') and self.aggregate is not None:
+            try:
+                agg = Aggregation(**self.aggregate)
+            except TypeError as e:
+                raise LatexTableError(f'Bad aggregate: {e}', self.name) from e
+            with TableProfiler.default_instance().measure(
+                    self.name, 'read_csv'):
+                self._dataframe_val = agg.read_csv(self.path, self.read_params)
         if not hasattr(self, '_dataframe_val'):
-            self._dataframe_val = pd.read_csv(self.path, **self.read_params)
+            params: Dict[str, Any] = self.read_params
+            cols: Set[str] = self._get_read_columns()
+            if cols is not None:
+                params = dict(params)
+                params['usecols'] = ColumnSelector(frozenset(cols))
+            cache: DataFrameCache = DataFrameCache.default_instance()
+            with TableProfiler.default_instance().measure(
+                    self.name, 'read_csv'):
+                self._dataframe_val = cache.read_csv(self.path, params)
         return self._dataframe_val
 
     @dataframe.setter
     def dataframe(self, dataframe: pd.DataFrame):
         """The Pandas dataframe that holds the CSV data."""
         self._dataframe_val = dataframe
+        self._dataframe_set = True
         self._formatted_dataframe.clear()
 
-    @persisted('_formatted_dataframe_stages')
-    def _get_formatted_dataframe_stages(self) -> Dict[str, pd.DataFrame]:
-        """Return named stages of the table formatting.  The entries returned:
+    def _get_read_columns(self) -> Optional[Set[str]]:
+        """Return the names of the CSV columns used by the table, which are
+        the only columns read.  All columns are read when ``None`` is returned,
+        which is the case when the columns can not be known, such as when the
+        table has code or variables that might use any column.
+
+        """
+        params: Dict[str, Any] = self.read_params
+        index_col: Any = params.get('index_col')
+        index_cols: List[Any] = [] if index_col is None or index_col is False \
+            else list(index_col) if isinstance(index_col, (list, tuple)) \
+            else [index_col]
+        if self.column_keeps is None or \
+           any(map(lambda c: c is not None, (
+               self.code_pre, self.code_post, self.code_format))) or \
+           any(map(lambda p: p in params, ('usecols', 'names', 'header'))) or \
+           any(map(lambda c: not isinstance(c, str), index_cols)) or \
+           len(self.variables) > 0:
+            # cell variables are located by the position of the CSV column, and
+            # code variables can use any column of any stage or the dataframe
+            return None
+        cols: Set[str] = set(it.chain(
+            self.column_keeps,
+            self.column_removes,
+            self.column_value_replaces.keys(),
+            self.round_column_names.keys(),
+            self.percent_column_names,
+            self.escape_column_names,
+            self.make_percent_column_names.keys(),
+            self.format_thousands_column_names.keys(),
+            self.format_scientific_column_names.keys(),
+            self.bold_max_columns,
+            it.chain.from_iterable(map(
+                lambda e: e.get('columns', ()), self.emphasis)),
+            self.capitalize_columns.keys(),
+            index_cols))
+        # the index column is added rather than read
+        cols.discard(self.index_col_name)
+        return cols
 
-          * ``unformatted``: before any formatting (i.e. number format) applied
-          * ``postformat``: after initial formatting applied
-          * ``formatted``: after style formatting (i.e. bold cells) applied
+    def _get_code_stage_names(self, code: str) -> Set[str]:
+        """Return the names of the stages used by variable ``code``.  All stages
+        are returned if the code can not be analyzed.
 
         """
+        try:
+            codes: List[CodeType] = [compile(code, '<variable>', 'exec')]
+        except SyntaxError:
+            return set(self._STAGE_NAMES)
+        names: Set[str] = set()
+        consts: Set[str] = set()
+        while len(codes) > 0:
+            co: CodeType = codes.pop()
+            names.update(co.co_names)
+            for const in co.co_consts:
+                if isinstance(const, CodeType):
+                    codes.append(const)
+                elif isinstance(const, str):
+                    consts.add(const)
+        if len(names & {'stages', 's'}) == 0:
+            return set()
+        stage_names: Set[str] = consts & set(self._STAGE_NAMES)
+        # the stage might be indexed by a variable or iterated over
+        if len(stage_names) == 0:
+            stage_names = set(self._STAGE_NAMES)
+        return stage_names
+
+    def _get_stage_names(self) -> Set[str]:
+        """Return the names of the stages read by :obj:`variables`."""
+        stage_names: Set[str] = {'nascent', 'formatted'}
+        ctx: Union[Tuple[int, int], str]
+        for ctx in self.variables.values():
+            if isinstance(ctx, str):
+                stage_names.update(self._get_code_stage_names(ctx))
+            else:
+                stage_names.add('unformatted')
+        return stage_names
+
+    def _create_formatted_dataframe_stages(self, stage_names: Set[str]) -> \
+            Dict[str, pd.DataFrame]:
+        """Create the stages of the table formatting (see
+        :meth:`_get_formatted_dataframe_stages`).
+
+        :param stage_names: the names of the stages to snapshot
+
+        """
+        def snapshot(name: str):
+            if name in stage_names:
+                stages[name] = df.copy(deep=has_code)
+
+        prof: TableProfiler = TableProfiler.default_instance()
         df: pd.DataFrame = self.dataframe
         stages: Dict[str, pd.DataFrame] = {'nascent': df}
-        # Pandas 2.x dislikes mixed float with string dtypes
-        df = df.astype(object)
-        df = self._apply_df_eval(df, self.code_pre)
-        stages['unformatted'] = df.copy()
-        bold_cols: Tuple[Tuple[int, int]] = self._get_bold_columns(df)
-        df = self._apply_df_number_format(df)
-        df = self._apply_df_eval(df, self.code_post)
-        stages['postformat'] = df.copy()
-        df = self._apply_df_bold_cells(df, bold_cols)
-        df = self._apply_df_capitalize(df)
-        df = self._apply_df_add_indexes(df)
-        df = self._apply_df_column_modifies(df)
-        df = self._apply_df_font_format(df)
-        df = self._apply_df_eval(df, self.code_format)
-        stages['formatted'] = df.copy()
+        has_code: bool = any(map(lambda c: c is not None, (
+            self.code_pre, self.code_post, self.code_format)))
+        if has_code:
+            # the code might modify cells in place, and Pandas 2.x dislikes
+            # mixed float with string dtypes
+            df = df.astype(object)
+        else:
+            # formatting replaces columns, or casts them to objects before
+            # modifying them in place, so the data is shared across stages
+            df = df.copy(deep=False)
+        if self.code_pre is not None:
+            with prof.measure(self.name, 'code_pre'):
+                df = self._apply_df_eval(df, self.code_pre)
+        snapshot('unformatted')
+        with prof.measure(self.name, 'number_format'):
+            emphases: Tuple[Tuple[str, Dict[str, np.ndarray]], ...] = \
+                self._get_emphasis_masks(df)
+            df = self._apply_df_number_format(df)
+        if self.code_post is not None:
+            with prof.measure(self.name, 'code_post'):
+                df = self._apply_df_eval(df, self.code_post)
+        snapshot('postformat')
+        with prof.measure(self.name, 'emphasis'):
+            df = self._apply_df_emphasis(df, emphases)
+            df = self._apply_df_capitalize(df)
+        with prof.measure(self.name, 'columns'):
+            df = self._apply_df_add_indexes(df)
+            df = self._apply_df_column_modifies(df)
+            df = self._apply_df_font_format(df)
+        if self.code_format is not None:
+            with prof.measure(self.name, 'code_format'):
+                df = self._apply_df_eval(df, self.code_format)
+        stages['formatted'] = df
         return stages
 
+    @persisted('_formatted_dataframe_stages')
+    def _get_formatted_dataframe_stages(self) -> Dict[str, pd.DataFrame]:
+        """Return named stages of the table formatting.  Only the stages read by
+        :obj:`variables` are created (see :obj:`variables` for the entries).
+
+        """
+        stage_names: Set[str] = self._get_stage_names()
+        with TableProfiler.default_instance().measure(self.name, 'format'):
+            return self._create_formatted_dataframe_stages(stage_names)
+
     @property
     def formatted_dataframe(self) -> pd.DataFrame:
         """The :obj:`dataframe` with the formatting applied to it used to create
@@ -493,6 +778,158 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
         """
         return self._get_formatted_dataframe_stages()['formatted']
 
+    def _can_write_chunks(self) -> bool:
+        """Whether the subclass can write the table rows a chunk at a time
+        (see :meth:`_get_chunk_table_lines`).
+
+        """
+        return False
+
+    def _get_chunk_table_lines(self, chunks: Iterable[pd.DataFrame],
+                               rows: int) -> Sequence[str]:
+        """Return the lines of the table's rows and columns created from
+        formatted chunks of the table's rows.
+
+        :param chunks: the formatted chunks of the table
+
+        :param rows: the number of rows in all chunks
+
+        """
+        raise LatexTableError('Table can not be written in chunks', self.name)
+
+    def _is_chunked(self) -> bool:
+        """Whether the table is read, formatted and written in chunks (see
+        :obj:`chunk_size`).
+
+        """
+        return self.chunk_size is not None and \
+            self.aggregate is None and \
+            not hasattr(self, '_dataframe_set') and \
+            all(map(lambda c: c is None, (
+                self.code_pre, self.code_post, self.code_format,
+                self.code_render))) and \
+            not any(map(lambda c: isinstance(c, str), self.variables.values())) \
+            and self._can_write_chunks() and \
+            self._get_chunk_scan().rows > 0
+
+    def _read_chunks(self, dtypes: Dict[str, np.dtype] = None) -> \
+            Iterable[pd.DataFrame]:
+        """Read the CSV file :obj:`chunk_size` rows at a time.
+
+        :param dtypes: the types to cast the columns of each chunk
+
+        """
+        params: Dict[str, Any] = dict(self.read_params)
+        cols: Set[str] = self._get_read_columns()
+        if cols is not None:
+            params['usecols'] = ColumnSelector(frozenset(cols))
+        params['chunksize'] = self.chunk_size
+        chunk: pd.DataFrame
+        with pd.read_csv(self.path, **params) as reader:
+            for chunk in reader:
+                if dtypes is not None:
+                    casts: Dict[str, np.dtype] = dict(filter(
+                        lambda c: chunk[c[0]].dtype != c[1], dtypes.items()))
+                    if len(casts) > 0:
+                        chunk = chunk.astype(casts)
+                yield chunk
+
+    @persisted('_chunk_scan')
+    def _get_chunk_scan(self) -> _ChunkScan:
+        """Read the CSV file in chunks to get the data needed to format the
+        table one chunk at a time.
+
+        """
+        cells: Dict[str, Tuple[int, int]] = dict(filter(
+            lambda v: not isinstance(v[1], str), self.variables.items()))
+        emp_cols: List[str] = list(dict.fromkeys(it.chain.from_iterable(
+            map(lambda e: e.columns, self._get_emphases()))))
+        tail_len: int = max(map(lambda c: -c[0], it.chain(
+            cells.values(), self.bold_cells)), default=0)
+        parts: List[pd.DataFrame] = []
+        dtypes: Dict[str, np.dtype] = {}
+        variables: Dict[str, Any] = {}
+        first: pd.DataFrame = None
+        tail: pd.DataFrame = None
+        rows: int = 0
+        chunk: pd.DataFrame
+        with TableProfiler.default_instance().measure(self.name, 'read_csv'):
+            for chunk in self._read_chunks():
+                if first is None:
+                    first = chunk
+                name: str
+                dtype: np.dtype
+                for name, dtype in chunk.dtypes.items():
+                    prev: np.dtype = dtypes.get(name, dtype)
+                    try:
+                        dtypes[name] = np.result_type(prev, dtype)
+                    except TypeError:
+                        dtypes[name] = np.dtype(object)
+                for name, (row, col) in cells.items():
+                    if rows <= row < rows + len(chunk):
+                        variables[name] = chunk.iloc[row - rows, col]
+                if len(emp_cols) > 0:
+                    parts.append(chunk[emp_cols])
+                if tail_len > 0:
+                    tail = chunk.iloc[-tail_len:] if tail is None else \
+                        pd.concat((tail, chunk)).iloc[-tail_len:]
+                rows += len(chunk)
+        for name, (row, col) in cells.items():
+            if row < 0:
+                variables[name] = tail.iloc[row, col]
+            elif name not in variables:
+                raise LatexTableError(
+                    f"No cell ({row}, {col}) for variable '{name}'", self.name)
+        emphases: Tuple[Tuple[str, Dict[str, np.ndarray]], ...] = ()
+        if len(parts) > 0:
+            emphases = self._get_emphasis_masks(
+                pd.concat(parts, ignore_index=True).astype(
+                    {c: dtypes[c] for c in emp_cols}))
+        scan = _ChunkScan(rows, dtypes, emphases, variables)
+        if first is not None:
+            first = first.astype(dtypes)
+            scan.columns = self._format_chunk(first, 0, scan).shape[1]
+        return scan
+
+    def _format_chunk(self, df: pd.DataFrame, offset: int,
+                      scan: _ChunkScan) -> pd.DataFrame:
+        """Format a chunk of the table the same as
+        :meth:`_create_formatted_dataframe_stages` formats the entire table.
+
+        :param df: the chunk to format
+
+        :param offset: the position of the first row of the chunk in the table
+
+        :param scan: the data gathered from all chunks
+
+        """
+        end: int = offset + len(df)
+        emphases: Tuple[Tuple[str, Dict[str, np.ndarray]], ...] = tuple(map(
+            lambda e: (e[0], {c: m[offset:end] for c, m in e[1].items()}),
+            scan.emphases))
+        cells: List[Tuple[int, int]] = []
+        row: int
+        col: Union[int, str]
+        for row, col in self.bold_cells:
+            row = row + scan.rows if row < 0 else row
+            if offset <= row < end:
+                cells.append((row - offset, col))
+        df = self._apply_df_number_format(df)
+        df = self._apply_df_emphasis(df, emphases)
+        df = self._apply_df_capitalize(df)
+        df = self._apply_df_add_indexes(df, offset + 1)
+        df = self._apply_df_column_modifies(df)
+        return self._apply_df_font_format(df, cells)
+
+    def _format_chunks(self, scan: _ChunkScan) -> Iterable[pd.DataFrame]:
+        """Read and format the table :obj:`chunk_size` rows at a time."""
+        offset: int = 0
+        chunk: pd.DataFrame
+        for chunk in self._read_chunks(scan.dtypes):
+            rows: int = len(chunk)
+            yield self._format_chunk(chunk, offset, scan)
+            offset += rows
+
     @abstractmethod
     def _get_table_rows(self, df: pd.DataFrame) -> Iterable[List[Any]]:
         """Return the rows/columns of the table given to :mod:``tabulate``."""
@@ -557,7 +994,7 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
 
     @abstractmethod
     def _write_table_content(self, depth: int, writer: TextIOBase,
-                             content: List[str]):
+                             content: Sequence[str]):
         """Write the text of the table's rows and columns."""
         pass
 
@@ -582,17 +1019,33 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
 
         """
         variables: Dict[str, Union[Tuple[int, int], str]] = self.variables
+        if self._is_chunked():
+            values: Dict[str, Any] = self._get_chunk_scan().variables
+            name: str
+            # write in the order defined rather than the order scanned
+            for name in variables.keys():
+                self._write_variable_content(
+                    name, values[name], depth, writer)
+            return
         stages: Dict[str, pd.DataFrame] = self._get_formatted_dataframe_stages()
+        with TableProfiler.default_instance().measure(self.name, 'variables'):
+            self._write_variable_values(variables, stages, depth, writer)
+
+    def _write_variable_values(
+            self, variables: Dict[str, Union[Tuple[int, int], str]],
+            stages: Dict[str, pd.DataFrame], depth: int, writer: TextIOBase):
+        """Evaluate and write each of the :obj:`variables`."""
         name: str
         ctx: Union[Tuple[int, int], str]
         for name, ctx in variables.items():
             v: Any = None
             if isinstance(ctx, str):
                 code: str = ctx
+                cache: CodeCache = CodeCache.default_instance()
                 locs: Dict[str, Any] = locals()
                 s: Dict[str, pd.DataFrame] = stages
                 try:
-                    exec(code, None, locs)
+                    exec(cache.compile(code), None, locs)
                 except Exception as e:
                     msg: str = f"could not write variable '{name}'"
                     v = f"{msg}: <{e}>"
@@ -606,29 +1059,63 @@ class Table(PersistableContainer, Dictable, metaclass=ABCMeta):
     def _render_flat_table(self, params: Dict[str, Any]) -> str:
         if logger.isEnabledFor(logging.TRACE):
             logger.trace(f'template: <<{self.template}>>')
-        template: Template = Environment(loader=BaseLoader).from_string(
-            self.template)
-        return template.render(params)
+        return TemplateCache.default_instance().render(self.template, params)
 
     def _apply_rendered_table(self, table: List[str], code: str):
         if code is not None:
-            exec(code)
+            exec(CodeCache.default_instance().compile(code))
 
-    def _write_table(self, depth: int = 0, writer: TextIOBase = sys.stdout):
-        """Write the formatted table."""
-        df: pd.DataFrame = self.formatted_dataframe
+    def _get_table_lines(self, df: pd.DataFrame) -> Sequence[str]:
+        """Return the lines of the table's rows and columns, which are created
+        by :mod:`tabulate`.
+
+        """
         table_rows: Tuple[List[Any], ...] = tuple(self._get_table_rows(df))
         table_params: Dict[str, Any] = self._get_tabulate_params()
-        tab_lines: List[str] = tabulate(table_rows, **table_params).split('\n')
-        cmd_params: Dict[str, str] = self._get_command_params()
-        template_params: Dict[str, Any] = dict(self.asdict())
-        self._apply_rendered_table(tab_lines, self.code_render)
-        table_rows_flat = StringIO()
-        self._write_table_content(1, table_rows_flat, tab_lines)
-        template_params['table'] = table_rows_flat.getvalue().rstrip()
-        template_params.update(cmd_params)
-        table: str = self._render_flat_table(template_params)
-        self._write_block(table, depth, writer)
+        return tabulate(table_rows, **table_params).split('\n')
+
+    def _write_table(self, depth: int = 0, writer: TextIOBase = sys.stdout):
+        """Write the formatted table.  The table rows are written directly to
+        ``writer`` when the template uses the table content verbatim.
+
+        """
+        prof: TableProfiler = TableProfiler.default_instance()
+        tab_lines: Sequence[str]
+        if self._is_chunked():
+            scan: _ChunkScan = self._get_chunk_scan()
+            # chunks are formatted as the lines are written
+            tab_lines = self._get_chunk_table_lines(
+                self._format_chunks(scan), scan.rows)
+        else:
+            df: pd.DataFrame = self.formatted_dataframe
+            with prof.measure(self.name, 'tabulate'):
+                tab_lines = self._get_table_lines(df)
+                if self.code_render is not None:
+                    tab_lines = list(tab_lines)
+                    self._apply_rendered_table(tab_lines, self.code_render)
+        with prof.measure(self.name, 'template'):
+            cmd_params: Dict[str, str] = self._get_command_params()
+            template_params: Dict[str, Any] = dict(self.asdict())
+            template_params.update(cmd_params)
+            parts: Tuple[str, str] = TemplateCache.default_instance().\
+                render_split(self.template, template_params, 'table')
+        if parts is None:
+            with prof.measure(self.name, 'template'):
+                table_rows_flat = StringIO()
+                self._write_table_content(1, table_rows_flat, tab_lines)
+                template_params['table'] = table_rows_flat.getvalue().rstrip()
+                table: str = self._render_flat_table(template_params)
+            with prof.measure(self.name, 'write'):
+                self._write_block(table, depth, writer)
+        else:
+            # same as writing the rendered template with _write_block
+            with prof.measure(self.name, 'write'):
+                head, tail = parts
+                newline: str = '\n' + self._sp(depth)
+                writer.write(self._sp(depth) + head.replace('\n', newline))
+                content = _ContentWriter(writer, newline)
+                self._write_table_content(1, content, tab_lines)
+                writer.write(tail.replace('\n', newline) + '\n')
 
     def write(self, depth: int = 0, writer: TextIOBase = sys.stdout):
         writeable: str
@@ -718,11 +1205,28 @@ class TableFactory(Dictable):
     anonymous tables.
 
     """
+    template_cache: TemplateCache = field(default=None)
+    """The Jinja2 template cache shared by all tables, which is used instead of
+    the default in-memory cache when set.
+
+    """
+    dataframe_cache: DataFrameCache = field(default=None)
+    """The cache of CSV dataframes shared by all tables, which is used instead
+    of the default cache when set.
+
+    """
+    def __post_init__(self):
+        if self.template_cache is not None:
+            TemplateCache.set_default_instance(self.template_cache)
+        if self.dataframe_cache is not None:
+            DataFrameCache.set_default_instance(self.dataframe_cache)
+
     @classmethod
     def default_instance(cls: TableFactory) -> TableFactory:
         """Get the singleton instance."""
         if cls._DEFAULT_INSTANCE is None:
-            config = ImportIniConfig(StringIO(_TABLE_FACTORY_CONFIG))
+            config: Configurable = ConfigSnapshot.default_instance().\
+                create_config('table-factory', _TABLE_FACTORY_CONFIG)
             fac = ImportConfigFactory(config)
             try:
                 cls._DEFAULT_INSTANCE = fac('datdesc_table_factory')
@@ -791,9 +1295,7 @@ class TableFactory(Dictable):
         """
         if logger.isEnabledFor(logging.INFO):
             logger.info(f'reading table definitions file {table_path}')
-        with open(table_path) as f:
-            content = f.read()
-        tdefs: Dict[str, Any] = yaml.load(content, yaml.FullLoader)
+        tdefs: Dict[str, Any] = YamlCache.default_instance().load(table_path)
         for name, td in tdefs.items():
             table_type: str = td.get(self._TYPE_NAME)
             if table_type is None:
@@ -825,9 +1327,16 @@ class TableFactory(Dictable):
 
     def to_file(self, table: Table, table_path: Path):
         """Save ``table`` as a YAML file to ``table_path``."""
-        tab_def: Dict[str, Any] = self._to_flatdict(table)
+        self.definitions_to_file(self._to_flatdict(table), table_path)
+
+    def definitions_to_file(self, tab_def: Dict[str, Any], table_path: Path):
+        """Save serialized table definitions as a YAML file to ``table_path``.
+
+        :param tab_def: the table definitions keyed by table name
+
+        """
         with open(table_path, 'w') as f:
-            yaml.dump(
+            YamlCache.dump(
                 tab_def,
                 stream=f,
                 default_flow_style=False,
@@ -0,0 +1,156 @@
+"""A shared Jinja2 environment that caches compiled templates.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import Dict, Tuple, List, Any, ClassVar, Callable, Optional
+from dataclasses import dataclass, field
+import logging
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from jinja2 import (
+    Template, Environment, BaseLoader, TemplateNotFound,
+    BytecodeCache, FileSystemBytecodeCache
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _SourceLoader(BaseLoader):
+    """Loads template sources registered by the hash of their text.  Only the
+    ``max_size`` most recently registered sources are kept.
+
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._sources: OrderedDict[str, str] = OrderedDict()
+
+    def add(self, source: str) -> str:
+        """Register ``source`` and return its template name."""
+        name: str = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        if name in self._sources:
+            self._sources.move_to_end(name)
+        else:
+            self._sources[name] = source
+            while len(self._sources) > self.max_size:
+                self._sources.popitem(last=False)
+        return name
+
+    def get_source(self, environment: Environment, template: str) -> \
+            Tuple[str, str, Callable]:
+        source: str = self._sources.get(template)
+        if source is None:
+            raise TemplateNotFound(template)
+        return source, None, lambda: True
+
+
+@dataclass
+class TemplateCache(object):
+    """A Jinja2 environment shared by all tables, which compiles each template
+    once and keeps it in memory keyed by the hash of the template's text.  If
+    :obj:`bytecode_dir` is set, the compiled templates are also saved to disk
+    so subsequent processes (i.e. ``datdesc table`` invoked from a make file)
+    skip compiling them.
+
+    """
+    _DEFAULT_INSTANCE: ClassVar[TemplateCache] = None
+    """The singleton instance when not created from a configuration factory."""
+
+    bytecode_dir: Path = field(default=None)
+    """The directory of compiled template bytecode, or ``None`` to cache
+    compiled templates only in memory.
+
+    """
+    cache_size: int = field(default=400)
+    """The number of compiled templates, and their sources, to keep in memory.
+
+    """
+
+    def __post_init__(self):
+        bcc: BytecodeCache = None
+        if self.bytecode_dir is not None:
+            self.bytecode_dir = Path(self.bytecode_dir).expanduser()
+            self.bytecode_dir.mkdir(parents=True, exist_ok=True)
+            bcc = FileSystemBytecodeCache(str(self.bytecode_dir))
+        self._loader = _SourceLoader(max(self.cache_size, 1))
+        self._verbatim: OrderedDict[Tuple[str, str], bool] = OrderedDict()
+        self._env = Environment(
+            loader=self._loader,
+            bytecode_cache=bcc,
+            cache_size=self.cache_size,
+            auto_reload=False)
+
+    @classmethod
+    def default_instance(cls: TemplateCache) -> TemplateCache:
+        """Get the singleton instance."""
+        if cls._DEFAULT_INSTANCE is None:
+            cls._DEFAULT_INSTANCE = cls()
+        return cls._DEFAULT_INSTANCE
+
+    @classmethod
+    def set_default_instance(cls: TemplateCache, inst: TemplateCache):
+        """Set the singleton instance used by all tables, such as one created
+        from the application configuration.
+
+        """
+        cls._DEFAULT_INSTANCE = inst
+
+    def get_template(self, source: str) -> Template:
+        """Return the compiled template of ``source``, which is compiled only
+        if not already in the cache.
+
+        """
+        return self._env.get_template(self._loader.add(source))
+
+    def render(self, source: str, params: Dict[str, Any]) -> str:
+        """Render template text ``source`` with ``params``."""
+        return self.get_template(source).render(params)
+
+    def _is_verbatim(self, source: str, var: str) -> bool:
+        """Whether variable ``var`` is only output as is, without filters or
+        expressions, in template text ``source``.
+
+        """
+        key: Tuple[str, str] = (self._loader.add(source), var)
+        verbatim: bool = self._verbatim.get(key)
+        if verbatim is None:
+            toks: List[str] = list(map(
+                lambda t: t[1] if t[1] != 'name' else f'name:{t[2]}',
+                filter(lambda t: t[1] != 'whitespace',
+                       self._env.lex(source))))
+            name: str = f'name:{var}'
+            verbatim = all(map(
+                lambda i: 0 < i < len(toks) - 1 and
+                toks[i - 1] == 'variable_begin' and
+                toks[i + 1] == 'variable_end',
+                filter(lambda i: toks[i] == name, range(len(toks)))))
+            self._verbatim[key] = verbatim
+            while len(self._verbatim) > self._loader.max_size:
+                self._verbatim.popitem(last=False)
+        return verbatim
+
+    def render_split(self, source: str, params: Dict[str, Any], var: str) -> \
+            Optional[Tuple[str, str]]:
+        """Render template text ``source`` with the value of variable ``var``
+        left out so it can be written separately.
+
+        :param source: the template text
+
+        :param params: the template parameters
+
+        :param var: the name of the variable to leave out of the rendered
+                    template
+
+        :return: the rendered text before and after the variable, or ``None``
+                 if the variable is not output exactly once as is
+
+        """
+        if not self._is_verbatim(source, var):
+            return None
+        marker: str = f'\x00{var}\x00'
+        text: str = self.render(source, {**params, var: marker})
+        parts: List[str] = text.split(marker)
+        if len(parts) != 2:
+            return None
+        return tuple(parts)
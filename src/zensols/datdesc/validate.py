@@ -0,0 +1,430 @@
+"""Static validation of table and figure definition files, which only reads the
+YAML files and the header line of the CSV files they reference.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import (
+    TYPE_CHECKING, Dict, Tuple, List, Set, Iterable, Any, Optional, ClassVar
+)
+from dataclasses import dataclass, field
+import dataclasses
+import logging
+import csv
+import re
+import itertools as it
+from pathlib import Path
+from zensols.introspect import ClassImporter
+from .yamlio import YamlCache
+if TYPE_CHECKING:
+    from .table import TableFactory
+    from .figure import FigureFactory
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ValidationIssue(object):
+    """A problem found in a table or figure definition.
+
+    """
+    path: Path = field()
+    """The definition file with the problem."""
+
+    name: str = field()
+    """The name of the table or figure with the problem."""
+
+    message: str = field()
+    """A human readable description of the problem."""
+
+    def __str__(self) -> str:
+        return f'{self.path}: {self.name}: {self.message}'
+
+
+@dataclass
+class DefinitionValidator(object):
+    """Validates table and figure definitions without reading data or
+    rendering.  Definitions are checked for:
+
+        * table and plot types that have a ``datdesc_table_*`` or
+          ``datdesc_plot_*`` section
+
+        * keys that are not fields of the table, figure or plot class
+
+        * referenced CSV files that exist and columns in their header line
+
+        * code snippets (i.e. ``code_pre``) that compile
+
+        * table ``default_params`` entries with a name and an optional
+          default, and ``params`` that have a default parameter
+
+    Columns are not checked for tables or plots with code that modifies the
+    data before it is used, or read parameters that change the header.
+
+    """
+    _TYPE_NAME: ClassVar[str] = 'type'
+    """The key of table and plot definitions that has the type."""
+
+    _PLOTS_NAME: ClassVar[str] = 'plots'
+    """The key of figure definitions that has the plot definitions."""
+
+    _TABLE_CODE_NAMES: ClassVar[Tuple[str, ...]] = (
+        'code_pre', 'code_post', 'code_format', 'code_render')
+    """The table fields that have Python code."""
+
+    _TABLE_DATA_CODE_NAMES: ClassVar[Tuple[str, ...]] = (
+        'code_pre', 'code_post', 'aggregate')
+    """The table fields that change the columns before they are formatted."""
+
+    _TABLE_COLUMN_LIST_NAMES: ClassVar[Tuple[str, ...]] = (
+        'column_keeps', 'column_removes', 'percent_column_names',
+        'escape_column_names', 'bold_max_columns')
+    """The table fields that have a list of CSV column names."""
+
+    _TABLE_COLUMN_DICT_NAMES: ClassVar[Tuple[str, ...]] = (
+        'column_renames', 'column_value_replaces', 'round_column_names',
+        'make_percent_column_names', 'format_thousands_column_names',
+        'format_scientific_column_names', 'capitalize_columns')
+    """The table fields keyed by CSV column names."""
+
+    _PLOT_CODE_NAMES: ClassVar[Tuple[str, ...]] = (
+        'code_pre', 'code_post', 'code_pre_render', 'code_post_render')
+    """The plot definition keys that have Python code."""
+
+    _PLOT_COLUMN_REGEX: ClassVar[re.Pattern] = re.compile(r'^.+_column_name$')
+    """Matches plot fields with a column name."""
+
+    _HEADER_PARAMS: ClassVar[Set[str]] = frozenset({
+        'names', 'header', 'usecols', 'skiprows', 'comment', 'compression',
+        'delim_whitespace'})
+    """The :func:`pandas.read_csv` parameters that change how the header line
+    is read, which disable column checks.
+
+    """
+    table_factory: TableFactory = field()
+    """Provides the ``datdesc_table_*`` sections of the table types."""
+
+    figure_factory: FigureFactory = field()
+    """Provides the ``datdesc_plot_*`` sections of the plot types."""
+
+    def __post_init__(self):
+        self._fields: Dict[str, Dict[str, str]] = {}
+        self._headers: Dict[Tuple[Path, str], Optional[List[str]]] = {}
+
+    def _get_fields(self, factory: Any, sec: str) -> Dict[str, str]:
+        """Return the field names and annotations of the class created by
+        section ``sec`` of the configuration of ``factory``.
+
+        """
+        fields: Dict[str, str] = self._fields.get(sec)
+        if fields is None:
+            class_name: str = factory.config_factory.config.get_option(
+                'class_name', sec)
+            cls: type = ClassImporter(class_name, reload=False).get_class()
+            fields = {f.name: str(f.type).replace('typing.', '')
+                      for f in dataclasses.fields(cls)}
+            self._fields[sec] = fields
+        return fields
+
+    def _read_header(self, path: Path, sep: str) -> List[str]:
+        """Return the column names of the first line of a CSV file."""
+        key: Tuple[Path, str] = (path, sep)
+        if key not in self._headers:
+            with open(path, newline='') as f:
+                self._headers[key] = next(csv.reader(f, delimiter=sep), [])
+        return self._headers[key]
+
+    def _get_header(self, path: Path, params: Dict[str, Any]) -> \
+            Optional[List[str]]:
+        """Return the header of a CSV file, or ``None`` if the columns can not
+        be known from the read parameters.
+
+        """
+        sep: str = params.get('sep', params.get('delimiter', ','))
+        if len(self._HEADER_PARAMS & set(params.keys())) > 0 or \
+           not isinstance(sep, str) or len(sep) != 1:
+            return None
+        return self._read_header(path, sep)
+
+    def _check_code(self, code: Any, desc: str, issue_fn) -> \
+            Iterable[ValidationIssue]:
+        if code is None:
+            return
+        if not isinstance(code, str):
+            yield issue_fn(f"{desc} is not a string: '{code}'")
+            return
+        try:
+            compile(code, f'<{desc}>', 'exec')
+        except SyntaxError as e:
+            yield issue_fn(
+                f'{desc} has a syntax error at line {e.lineno}: {e.msg}')
+
+    def _check_keys(self, defs: Dict[str, Any], fields: Dict[str, str],
+                    extra: Set[str], desc: str, issue_fn) -> \
+            Iterable[ValidationIssue]:
+        key: str
+        val: Any
+        for key, val in defs.items():
+            if key in extra:
+                continue
+            ftype: str = fields.get(key)
+            if ftype is None:
+                yield issue_fn(f"Unknown {desc} key '{key}'")
+            elif ftype.startswith('Dict[') and val is not None and \
+                    not isinstance(val, dict):
+                yield issue_fn(f"{desc.capitalize()} key '{key}' " +
+                               f"expects a mapping, got: '{val}'")
+
+    def _check_columns(self, cols: Iterable[str], header: List[str],
+                       path: Path, issue_fn) -> Iterable[ValidationIssue]:
+        missing: List[str] = sorted(set(filter(
+            lambda c: isinstance(c, str), cols)) - set(header))
+        if len(missing) > 0:
+            yield issue_fn(
+                f"Unknown column(s) {', '.join(map(repr, missing))} " +
+                f"in '{path}', expecting one of: {', '.join(header)}")
+
+    def _resolve_csv(self, csv_path: str, def_path: Path) -> Optional[Path]:
+        """Resolve a CSV path as done by :class:`.TableFactory`, which falls
+        back to a path relative to the definition file.
+
+        """
+        path = Path(csv_path)
+        if not path.is_file():
+            path = def_path.parent / path
+        return path if path.is_file() else None
+
+    def _get_table_columns(self, td: Dict[str, Any]) -> Iterable[str]:
+        def get(name: str) -> Any:
+            val: Any = td.get(name)
+            return () if val is None else val
+
+        return it.chain(
+            it.chain.from_iterable(map(get, self._TABLE_COLUMN_LIST_NAMES)),
+            it.chain.from_iterable(map(
+                lambda n: get(n).keys() if isinstance(get(n), dict) else (),
+                self._TABLE_COLUMN_DICT_NAMES)),
+            it.chain.from_iterable(map(
+                lambda e: e.get('columns', ()) if isinstance(e, dict) else (),
+                get('emphasis'))))
+
+    def _validate_table(self, path: Path, name: str, td: Any) -> \
+            Iterable[ValidationIssue]:
+        def issue(msg: str) -> ValidationIssue:
+            return ValidationIssue(path, name, msg)
+
+        if not isinstance(td, dict):
+            yield issue(f"Invalid table definition: '{td}'")
+            return
+        table_type: str = td.get(self._TYPE_NAME)
+        if table_type is None:
+            yield issue(f"No '{self._TYPE_NAME}' given")
+            return
+        types: Set[str] = set(self.table_factory.get_table_names())
+        if table_type not in types:
+            yield issue(f"Unknown table type '{table_type}', expecting one " +
+                        f"of: {', '.join(sorted(types))}")
+            return
+        sec: str = self.table_factory._get_section_by_name(table_type)
+        yield from self._check_keys(
+            td, self._get_fields(self.table_factory, sec), {self._TYPE_NAME},
+            'table', issue)
+        code_name: str
+        for code_name in self._TABLE_CODE_NAMES:
+            yield from self._check_code(td.get(code_name), code_name, issue)
+        variables: Any = td.get('variables')
+        if isinstance(variables, dict):
+            var: str
+            ctx: Any
+            for var, ctx in variables.items():
+                if isinstance(ctx, str):
+                    yield from self._check_code(
+                        ctx, f"variable '{var}'", issue)
+        yield from self._validate_table_params(td, sec, issue)
+        csv_path: str = td.get('path')
+        if csv_path is None:
+            yield issue("No CSV 'path' given")
+            return
+        csv_file: Path = self._resolve_csv(csv_path, path)
+        if csv_file is None:
+            yield issue(f"CSV file not found: '{csv_path}'")
+            return
+        if any(map(lambda n: td.get(n) is not None,
+                   self._TABLE_DATA_CODE_NAMES)):
+            return
+        read_params: Any = td.get('read_params')
+        header: List[str] = self._get_header(
+            csv_file, read_params if isinstance(read_params, dict) else {})
+        if header is not None:
+            yield from self._check_columns(
+                self._get_table_columns(td), header, csv_file, issue)
+
+    def _validate_table_params(self, td: Dict[str, Any], sec: str,
+                               issue_fn) -> Iterable[ValidationIssue]:
+        dparams: Any = td.get('default_params')
+        if dparams is None:
+            dparams = self.table_factory.config_factory.config.populate(
+                {}, section=sec).get('default_params', ())
+        if not isinstance(dparams, (list, tuple)):
+            yield issue_fn("Parameter 'default_params' is not a list: " +
+                           f"'{dparams}'")
+            return
+        names: Set[str] = set()
+        param: Any
+        for param in dparams:
+            if not isinstance(param, (list, tuple)) or \
+               not (1 <= len(param) <= 2):
+                yield issue_fn('Expecting a name and optional default in ' +
+                               f"default parameter: '{param}'")
+            else:
+                names.add(param[0])
+        params: Any = td.get('params')
+        if isinstance(params, dict):
+            unknown: List[str] = sorted(set(params.keys()) - names)
+            if len(unknown) > 0:
+                yield issue_fn(
+                    f"Unknown parameter(s) {', '.join(map(repr, unknown))}, " +
+                    f"expecting one of: {', '.join(sorted(names))}")
+
+    def validate_tables(self, path: Path) -> Iterable[ValidationIssue]:
+        """Validate the table definitions of a ``*-table.yml`` file.
+
+        :param path: the table definitions file
+
+        """
+        tdefs: Any = YamlCache.default_instance().load(path)
+        if not isinstance(tdefs, dict):
+            yield ValidationIssue(path, '<file>', 'Not a mapping of tables')
+            return
+        name: str
+        td: Any
+        for name, td in tdefs.items():
+            yield from self._validate_table(path, name, td)
+
+    def _get_plot_header(self, data: Any, path: Path) -> \
+            Tuple[Optional[Path], Optional[List[str]], Optional[str]]:
+        """Return the CSV file, header and an error message of the
+        ``dataframe:`` reference in plot ``data``.
+
+        """
+        from .figure import _FigureSerializer
+        m: re.Match = None
+        if isinstance(data, str):
+            m = _FigureSerializer.DATAFRAME_REGEXP.match(data)
+        if m is None:
+            return None, None, None
+        pconfig, csv_path = m.groups()
+        csv_file: Path = self._resolve_csv(csv_path, path)
+        if csv_file is None:
+            return None, None, f"CSV file not found: '{csv_path}'"
+        params: Dict[str, Any] = {}
+        if pconfig is not None:
+            try:
+                params = eval(pconfig)
+            except Exception as e:
+                return None, None, f"Bad dataframe parameters '{pconfig}': {e}"
+            if not isinstance(params, dict):
+                return None, None, \
+                    f"Dataframe parameters not a mapping: '{pconfig}'"
+        return csv_file, self._get_header(csv_file, params), None
+
+    def _validate_plot(self, path: Path, name: str, pix: int, pdef: Any,
+                       issue_fn) -> Iterable[ValidationIssue]:
+        def issue(msg: str) -> ValidationIssue:
+            return issue_fn(f'plot {pix}: {msg}')
+
+        if not isinstance(pdef, dict):
+            yield issue(f"Invalid plot definition: '{pdef}'")
+            return
+        plot_type: str = pdef.get(self._TYPE_NAME)
+        if plot_type is None:
+            yield issue(f"No '{self._TYPE_NAME}' given")
+            return
+        types: Set[str] = set(self.figure_factory.get_plot_names())
+        if plot_type not in types:
+            yield issue(f"Unknown plot type '{plot_type}', expecting one " +
+                        f"of: {', '.join(sorted(types))}")
+            return
+        sec: str = self.figure_factory._get_section_by_name(plot_type)
+        extra: Set[str] = {self._TYPE_NAME, 'code_pre', 'code_post'}
+        yield from self._check_keys(
+            pdef, self._get_fields(self.figure_factory, sec), extra, 'plot',
+            issue)
+        code_name: str
+        for code_name in self._PLOT_CODE_NAMES:
+            yield from self._check_code(pdef.get(code_name), code_name, issue)
+        csv_file, header, msg = self._get_plot_header(pdef.get('data'), path)
+        if msg is not None:
+            yield issue(msg)
+        if header is None or pdef.get('code_pre') is not None:
+            return
+        cols: List[str] = []
+        key: str
+        val: Any
+        for key, val in pdef.items():
+            if self._PLOT_COLUMN_REGEX.match(key) is not None:
+                if isinstance(val, (list, tuple)):
+                    cols.extend(map(lambda c: c[0] if isinstance(
+                        c, (list, tuple)) else c, val))
+                else:
+                    cols.append(val)
+        yield from self._check_columns(cols, header, csv_file, issue)
+
+    def _validate_figure(self, path: Path, name: str, fdef: Any) -> \
+            Iterable[ValidationIssue]:
+        def issue(msg: str) -> ValidationIssue:
+            return ValidationIssue(path, name, msg)
+
+        if not isinstance(fdef, dict):
+            yield issue(f"Invalid figure definition: '{fdef}'")
+            return
+        sec: str = self.figure_factory._FIGURE_SEC_NAME
+        yield from self._check_keys(
+            fdef, self._get_fields(self.figure_factory, sec),
+            {self._PLOTS_NAME}, 'figure', issue)
+        pdefs: Any = fdef.get(self._PLOTS_NAME)
+        if pdefs is None:
+            yield issue(f"Plot definition '{self._PLOTS_NAME}' not found")
+        elif not isinstance(pdefs, list):
+            yield issue(f"Invalid plot definition: '{pdefs}'")
+        else:
+            pix: int
+            pdef: Any
+            for pix, pdef in enumerate(pdefs):
+                yield from self._validate_plot(path, name, pix, pdef, issue)
+
+    def validate_figures(self, path: Path) -> Iterable[ValidationIssue]:
+        """Validate the figure definitions of a ``*-figure.yml`` file.
+
+        :param path: the figure definitions file
+
+        """
+        fdefs: Any = YamlCache.default_instance().load(path)
+        if not isinstance(fdefs, dict):
+            yield ValidationIssue(path, '<file>', 'Not a mapping of figures')
+            return
+        name: str
+        fdef: Any
+        for name, fdef in fdefs.items():
+            yield from self._validate_figure(path, name, fdef)
+
+    def validate(self, path: Path, tables: bool = True) -> \
+            Tuple[ValidationIssue, ...]:
+        """Validate a definition file.
+
+        :param path: the table or figure definitions file
+
+        :param tables: whether ``path`` has table (rather than figure)
+                       definitions
+
+        :return: the problems found in the file
+
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'validating: {path}')
+        try:
+            return tuple(self.validate_tables(path) if tables
+                         else self.validate_figures(path))
+        except Exception as e:
+            return (ValidationIssue(
+                path, '<file>', f'Could not read definitions: {e}'),)
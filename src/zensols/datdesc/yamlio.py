@@ -0,0 +1,184 @@
+"""Reads and writes YAML with the :mod:`yaml` C extension (``libyaml``) when
+available, and caches parsed definition files.
+
+"""
+from __future__ import annotations
+__author__ = 'Paul Landes'
+from typing import Dict, Tuple, Any, Optional, IO, ClassVar
+from dataclasses import dataclass, field
+import logging
+import json
+import pickle
+import hashlib
+from pathlib import Path
+import yaml
+from .output import OutputWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class YamlCache(object):
+    """A cache of parsed YAML files keyed by the file's path, modification time
+    and size.  Each load returns a new copy of the parsed data since callers,
+    such as :meth:`.TableFactory.from_file`, modify it.  The parsed data is
+    kept pickled in memory.
+
+    If :obj:`cache_dir` is set, the parsed data is also saved to that directory
+    as JSON so other processes skip parsing unchanged files as well.  Only
+    data that is the same after a JSON round trip (i.e. without dates, tuples
+    or keys that are not strings) is saved, and nothing read from the
+    directory is unpickled.  The default instance does not use a directory,
+    so sharing across processes must be enabled with
+    :meth:`set_default_instance`.
+
+    Files are parsed with :class:`yaml.CFullLoader` and written with
+    :class:`yaml.CDumper` when :mod:`yaml` was built with ``libyaml``.
+
+    """
+    _DEFAULT_INSTANCE: ClassVar[YamlCache] = None
+    """The singleton instance when not created from a configuration factory."""
+
+    LOADER: ClassVar[type] = getattr(yaml, 'CFullLoader', yaml.FullLoader)
+    """The fastest available full loader."""
+
+    DUMPER: ClassVar[type] = getattr(yaml, 'CDumper', yaml.Dumper)
+    """The fastest available dumper."""
+
+    cache_dir: Path = field(default=None)
+    """The directory of the JSON parsed files shared across processes, or
+    ``None`` to only cache in memory.
+
+    """
+    enabled: bool = field(default=True)
+    """Whether to use the cache.  If ``False``, files are always parsed."""
+
+    def __post_init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @classmethod
+    def default_instance(cls: YamlCache) -> YamlCache:
+        """Get the singleton instance, which caches only in memory."""
+        if cls._DEFAULT_INSTANCE is None:
+            cls._DEFAULT_INSTANCE = cls()
+        return cls._DEFAULT_INSTANCE
+
+    @classmethod
+    def set_default_instance(cls: YamlCache, inst: YamlCache):
+        """Set the singleton instance used to load all definition files, such
+        as one with a :obj:`cache_dir`.
+
+        """
+        cls._DEFAULT_INSTANCE = inst
+
+    @classmethod
+    def parse(cls: type, stream: Any) -> Any:
+        """Parse YAML text without caching.
+
+        :param stream: the YAML as a string or a readable file
+
+        """
+        return yaml.load(stream, cls.LOADER)
+
+    @classmethod
+    def dump(cls: type, data: Any, stream: IO = None, **kwargs) -> \
+            Optional[str]:
+        """Write ``data`` as YAML.
+
+        :param data: the data to write
+
+        :param stream: the output, or ``None`` to return the YAML as a string
+
+        :param kwargs: additional keyword arguments given to :func:`yaml.dump`
+
+        """
+        return yaml.dump(data, stream, Dumper=cls.DUMPER, **kwargs)
+
+    def _get_cache_file(self, key: str) -> Path:
+        digest: str = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / f'{digest}.json'
+
+    def _read_cache_file(self, key: str, stat: Tuple[int, int]) -> \
+            Optional[bytes]:
+        """Return the pickled data of a file parsed by another process, or
+        ``None`` if it is missing or stale.
+
+        """
+        path: Path = self._get_cache_file(key)
+        if not path.is_file():
+            return None
+        try:
+            with open(path) as f:
+                entry: Dict[str, Any] = json.load(f)
+            if entry['header'] != [yaml.__version__, key, list(stat)]:
+                return None
+            return pickle.dumps(entry['data'])
+        except Exception as e:
+            logger.warning(f'could not read YAML cache {path}: {e}')
+            return None
+
+    def _write_cache_file(self, key: str, stat: Tuple[int, int], data: Any):
+        try:
+            text: str = json.dumps({
+                'header': [yaml.__version__, key, list(stat)],
+                'data': data})
+        except (TypeError, ValueError):
+            return
+        if json.loads(text)['data'] != data:
+            # only data without types lost by JSON is shared
+            return
+        path: Path = self._get_cache_file(key)
+        try:
+            # a separate writer so cache files are not counted as outputs
+            writer = OutputWriter(compare=False, log_level=logging.DEBUG)
+            with writer.open(path, 'w') as f:
+                f.write(text)
+        except OSError as e:
+            logger.warning(f'could not write YAML cache {path}: {e}')
+
+    def load(self, path: Path) -> Any:
+        """Return the parsed content of a YAML file, which is only parsed if
+        not already cached or if the file changed since it was cached.
+
+        :param path: the YAML file to parse
+
+        """
+        if not self.enabled:
+            with open(path) as f:
+                return self.parse(f)
+        path = Path(path).resolve()
+        key: str = str(path)
+        st = path.stat()
+        stat: Tuple[int, int] = (st.st_mtime_ns, st.st_size)
+        entry: Tuple[Tuple[int, int], bytes] = self._entries.get(key)
+        data: bytes = None
+        if entry is not None and entry[0] == stat:
+            data = entry[1]
+        elif self.cache_dir is not None:
+            data = self._read_cache_file(key, stat)
+        if data is None:
+            self.misses += 1
+            parsed: Any
+            with open(path) as f:
+                parsed = self.parse(f)
+            data = pickle.dumps(parsed)
+            if self.cache_dir is not None:
+                self._write_cache_file(key, stat, parsed)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'parsed YAML file: {path}')
+        else:
+            self.hits += 1
+        self._entries[key] = (stat, data)
+        return pickle.loads(data)
+
+    def clear(self):
+        """Clear the in memory cache and reset the hit and miss counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return (f'hits: {self.hits}, misses: {self.misses}, ' +
+                f'size: {len(self._entries)}')
@@ -0,0 +1,124 @@
+from typing import Any, Callable
+import unittest
+import random
+import math
+import pandas as pd
+from zensols.datdesc.table import Table
+from zensols.datdesc.latex import LatexTable
+from zensols.datdesc.colfmt import ColumnFormatter, ColumnTransformer
+
+
+class TestColumnFormatter(unittest.TestCase):
+    def setUp(self):
+        rand = random.Random(0)
+        floats = [rand.uniform(-1, 1) * 10 ** rand.randint(-6, 18)
+                  for _ in range(2000)]
+        floats.extend([0., -0., 2.675, 1.5, 2.5, 999.5, 1000.5, 1e16, 1e-5])
+        ints = [rand.randint(-10 ** 7, 10 ** 7) for _ in range(2000)]
+        self.floats = pd.Series(floats + [float('nan')] * 3, dtype=object)
+        self.ints = pd.Series(ints + [float('nan')] * 3, dtype=object)
+        self.float_dtype = pd.Series(floats)
+        self.int_dtype = pd.Series(ints)
+        self.cols = (self.floats, self.ints, self.float_dtype, self.int_dtype)
+
+    def _assert_col(self, gold: pd.Series, pred: pd.Series):
+        self.assertIsNotNone(pred)
+        self.assertEqual(len(gold), len(pred))
+        for g, p in zip(gold, pred):
+            if isinstance(g, float) and math.isnan(g):
+                self.assertTrue(isinstance(p, float) and math.isnan(p))
+            else:
+                self.assertEqual(g, p)
+
+    def _map_notna(self, col: pd.Series, fn: Callable) -> pd.Series:
+        return col.apply(lambda v: v if pd.isna(v) else fn(v))
+
+    def test_round(self):
+        for col in self.cols:
+            for rnd in (0, 1, 3):
+                gold = self._map_notna(
+                    col, lambda v: f'{{v:.{rnd}f}}'.format(v=round(v, rnd)))
+                self._assert_col(gold, ColumnFormatter.round(col, rnd))
+            gold = self._map_notna(
+                col, lambda v: str(round(v)) if v > 500
+                else f'{round(v, 2):.2f}')
+            self._assert_col(gold, ColumnFormatter.round(col, 2, 500))
+
+    def test_percent(self):
+        for col in self.cols:
+            gold = self._map_notna(col, lambda v: f'{round(v * 100, 1):.1f}\\%')
+            self._assert_col(gold, ColumnFormatter.percent(col, 1))
+            gold = self._map_notna(col, lambda v: f'~{v * 100:.2e}%')
+            self._assert_col(gold, ColumnFormatter.percent(col, '~{v:.2e}%'))
+        self.assertIsNone(ColumnFormatter.percent(self.floats, '{v}'))
+
+    def test_thousand(self):
+        params: Any = ({}, {'round': 0}, {'round': 2}, {'apply_k': False},
+                       {'add_comma': False, 'max_k': 50},
+                       {'apply_k': False, 'round': 1})
+        for col in self.cols:
+            for kwargs in params:
+                gold = col.apply(lambda v: Table.format_thousand(v, **kwargs))
+                pred = ColumnFormatter.thousand(col, **kwargs)
+                self._assert_col(gold, pred)
+
+    def test_scientific(self):
+        for col in self.cols:
+            for sig in (0, 1, 3):
+                gold = col.apply(
+                    lambda v: LatexTable.format_scientific(None, v, sig))
+                pred = ColumnFormatter.latex_scientific(col, sig)
+                self._assert_col(gold, pred)
+
+    def test_fallback(self):
+        mixed = pd.Series([1.5, 'a', 3], dtype=object)
+        self.assertIsNone(ColumnFormatter.round(mixed, 2))
+        self.assertIsNone(ColumnFormatter.thousand(mixed))
+        self.assertIsNone(ColumnFormatter.latex_scientific(mixed))
+        mixed = pd.Series([1, 1.5], dtype=object)
+        self.assertIsNone(ColumnFormatter.thousand(mixed))
+        self.assertIsNotNone(ColumnFormatter.round(mixed, 2))
+
+
+class TestColumnTransformer(unittest.TestCase):
+    def setUp(self):
+        rand = random.Random(0)
+        words = ['the cat', 'a dog', 'big_data & co', '50%', '#1', '$x$', '']
+        self.cols = (
+            pd.Series([rand.choice(words) for _ in range(500)]),
+            pd.Series([rand.choice(words + [None]) for _ in range(500)]),
+            pd.Series([rand.randint(0, 5) for _ in range(500)]),
+            pd.Series([rand.choice([0.5, 1.5, float('nan')])
+                       for _ in range(500)]),
+            pd.Series([True, False, True]),
+            pd.Series([1, 'a', 1.0], dtype=object),
+            pd.Series([], dtype=object))
+
+    def _assert_col(self, gold: pd.Series, pred: pd.Series):
+        self.assertEqual(gold.dtype, pred.dtype)
+        self.assertTrue(gold.equals(pred))
+
+    def test_map_values(self):
+        # 1 and True are the same key, so each has its own mapping
+        repl_int = {'a dog': 'A Dog', 1: 'one', 0.5: 'half'}
+        repl_bool = {'a dog': 'A Dog', True: 'yes', 0.5: 'half'}
+        fns = (lambda v: repl_int.get(v, v), lambda v: repl_bool.get(v, v),
+               lambda v: type(v).__name__, lambda v: v, str, lambda v: 1)
+        for col in self.cols:
+            for fn in fns:
+                self._assert_col(col.apply(fn),
+                                 ColumnTransformer.map_values(col, fn))
+
+    def test_escape(self):
+        col = pd.Series(['a_b & c', '50\\% #1', '$5', None, 3])
+        self.assertEqual(
+            ['a\\_b \\& c', '50\\% \\#1', '\\$5', None, 3],
+            ColumnTransformer.escape_latex(col).tolist())
+        col = self.cols[0]
+        self._assert_col(col.apply(lambda s: s.replace('%', '\\%')),
+                         ColumnTransformer.escape_percent(col))
+        col = pd.Series(['the cat', 'a dog', 'the cat'])
+        self.assertEqual(['The Cat', 'A Dog', 'The Cat'],
+                         ColumnTransformer.capitalize(col, True).tolist())
+        self.assertEqual(['The cat', 'A dog', 'The cat'],
+                         ColumnTransformer.capitalize(col, False).tolist())
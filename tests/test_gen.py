@@ -60,6 +60,58 @@ class TestApplication(unittest.TestCase):
             logger.info(f'compare: {out_file}, {gold_file}')
             self._text_compare(out_file, gold_file)
 
+    def test_table_incremental(self):
+        in_dir: Path = self.targ_dir / 'incr'
+        shutil.copytree('test-resources/config', in_dir)
+        cmd: str = f'table {in_dir} {self.out_dir} --incremental --level=warn'
+        self.harness.execute(cmd)
+        conf_files = sorted(in_dir.iterdir())
+        out_files = [self.out_dir / f'{f.stem}.sty' for f in conf_files]
+        for conf_file, out_file in zip(conf_files, out_files):
+            gold_file: Path = Path('test-resources/gold') / out_file.name
+            self._text_compare(out_file, gold_file)
+            self.assertTrue((self.out_dir / f'.{out_file.name}.json').is_file())
+        mtimes = [f.stat().st_mtime_ns for f in out_files]
+        self.harness.execute(cmd)
+        self.assertEqual(mtimes, [f.stat().st_mtime_ns for f in out_files])
+        conf_file: Path = in_dir / 'notes-table.yml'
+        conf_file.write_text(conf_file.read_text().replace(
+            'caption:', 'caption: Changed', 1))
+        self.harness.execute(cmd)
+        for out_file, mtime in zip(out_files, mtimes):
+            changed: bool = out_file.stem == conf_file.stem
+            self.assertEqual(changed, out_file.stat().st_mtime_ns != mtime)
+        self.assertTrue('Changed' in (self.out_dir / 'notes-table.sty').
+                        read_text())
+
+    def test_table_depends(self):
+        in_file: Path = Path('test-resources/config/notes-table.yml')
+        out_file: Path = self.out_dir / 'notes.sty'
+        self.harness.execute(f'table {in_file} {out_file} --depends --level=warn')
+        dep_file: Path = self.out_dir / 'notes.d'
+        self.assertTrue(dep_file.is_file())
+        lines = dep_file.read_text().split('\n')
+        self.assertEqual(f'{out_file}: \\', lines[0])
+        deps = tuple(map(str.strip, lines[1:3]))
+        self.assertEqual((f'{in_file} \\', 'test-resources/csv/note-events.csv'),
+                         deps)
+        self.assertTrue(f'{in_file}:' in lines)
+
+    def test_figure_depends(self):
+        in_dir: Path = Path('test-resources/fig')
+        self.harness.execute(
+            f'figure {in_dir} {self.out_dir} --depends --level=warn')
+        dep_file: Path = self.out_dir / 'iris-bar-figure.d'
+        self.assertTrue(dep_file.is_file())
+        lines = dep_file.read_text().split('\n')
+        self.assertEqual(f'{self.out_dir}/irisBarFig.svg: \\', lines[0])
+        self.assertEqual('test-resources/fig/iris.csv', lines[2].strip())
+
+    def test_validate(self):
+        for in_dir in ('config', 'fig'):
+            self.harness.execute(
+                f'validate test-resources/{in_dir} --level=warn')
+
     def test_hyper_yaml(self):
         base_dir: Path = Path('test-resources/hyperparam')
         in_file: Path = base_dir / 'svm-hyperparam.yml'
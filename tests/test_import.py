@@ -0,0 +1,59 @@
+from typing import Tuple, Dict, Any
+import unittest
+import sys
+import json
+import subprocess
+
+_SCRIPT: str = """
+import sys, json
+try:
+    if len(sys.argv) > 1:
+        from zensols.datdesc.cli import main
+        main(['datdesc'] + sys.argv[1:] + ['--level=err'])
+    else:
+        import zensols.datdesc
+except SystemExit:
+    pass
+print(json.dumps({'modules': sorted(m for m in sys.modules if '.' not in m)}),
+      file=sys.stderr)
+"""
+
+
+class TestImports(unittest.TestCase):
+    """Fail when importing the package or running command line actions imports
+    libraries that are not used.
+
+    """
+    HEAVY: Tuple[str, ...] = (
+        'pandas', 'numpy', 'matplotlib', 'seaborn', 'openpyxl', 'xlsxwriter',
+        'jinja2', 'tabulate')
+
+    def _run(self, *args: str) -> Dict[str, Any]:
+        res = subprocess.run(
+            [sys.executable, '-c', _SCRIPT, *args],
+            capture_output=True, text=True)
+        return json.loads(res.stderr.strip().split('\n')[-1])
+
+    def test_import(self):
+        res: Dict[str, Any] = self._run()
+        self.assertIn('zensols', res['modules'])
+        self.assertEqual([], sorted(set(self.HEAVY) & set(res['modules'])))
+
+    def test_help(self):
+        res: Dict[str, Any] = self._run('--help')
+        self.assertEqual([], sorted(set(self.HEAVY) & set(res['modules'])))
+
+    def test_list_figures(self):
+        res: Dict[str, Any] = self._run('listfigs', 'test-resources/fig')
+        unused = {'openpyxl', 'xlsxwriter', 'jinja2', 'tabulate', 'seaborn'}
+        self.assertEqual([], sorted(unused & set(res['modules'])))
+
+    def test_star_import(self):
+        import zensols.datdesc as pkg
+        names: Dict[str, Any] = {}
+        exec('from zensols.datdesc import *', names)
+        for name in ('Table', 'TableFactory', 'DataFrameDescriber',
+                     'DataDescriber', 'DataDescriptionError', 'main'):
+            self.assertIn(name, names)
+            self.assertIn(name, dir(pkg))
+        self.assertIs(pkg.Table, names['Table'])
@@ -0,0 +1,78 @@
+import unittest
+from pathlib import Path
+import shutil
+import pandas as pd
+from zensols.datdesc import DataFrameDescriber, DataDescriber
+from zensols.datdesc.output import OutputWriter
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.targ_dir = Path('target/output')
+        if self.targ_dir.is_dir():
+            shutil.rmtree(self.targ_dir)
+        self.writer = OutputWriter()
+
+    def _write(self, path: Path, content: str):
+        with self.writer.open(path) as f:
+            f.write(content)
+
+    def test_write_if_changed(self):
+        path: Path = self.targ_dir / 'a.txt'
+        self._write(path, 'first')
+        self.assertEqual('first', path.read_text())
+        self.assertEqual([path], self.writer.written)
+        mtime: int = path.stat().st_mtime_ns
+        self._write(path, 'first')
+        self.assertEqual([path], self.writer.skipped)
+        self.assertEqual(mtime, path.stat().st_mtime_ns)
+        # same size, different content
+        self._write(path, 'frist')
+        self.assertEqual('frist', path.read_text())
+        self._write(path, 'different size')
+        self.assertEqual('different size', path.read_text())
+        self.assertEqual(3, len(self.writer.written))
+        self.assertEqual(1, len(self.writer.skipped))
+        self.assertEqual('wrote 3, skipped 1 unchanged file(s)',
+                         str(self.writer))
+        self.assertEqual(['a.txt'], [p.name for p in self.targ_dir.iterdir()])
+        self.writer.clear()
+        self.assertEqual(0, len(self.writer.written))
+
+    def test_error(self):
+        path: Path = self.targ_dir / 'a.txt'
+        self._write(path, 'first')
+        with self.assertRaises(ValueError):
+            with self.writer.open(path) as f:
+                f.write('partial')
+                raise ValueError('failed')
+        self.assertEqual('first', path.read_text())
+        self.assertEqual(['a.txt'], [p.name for p in self.targ_dir.iterdir()])
+
+    def test_no_compare(self):
+        path: Path = self.targ_dir / 'a.txt'
+        self.writer.compare = False
+        self._write(path, 'first')
+        self._write(path, 'first')
+        self.assertEqual(2, len(self.writer.written))
+
+    def test_describer(self):
+        dd = DataDescriber.from_describer(DataFrameDescriber(
+            name='roster',
+            desc='Roster.',
+            df=pd.DataFrame(data={'name': ['Stan', 'Kyle'], 'age': [16, 20]}),
+            meta=(('name', 'the name'), ('age', 'the age'))))
+        writer: OutputWriter = OutputWriter.default_instance()
+        writer.clear()
+        csv_dir: Path = self.targ_dir / 'csv'
+        yaml_dir: Path = self.targ_dir / 'config'
+        excel_path: Path = self.targ_dir / 'results' / 'roster'
+        paths = dd.save(csv_dir, yaml_dir, excel_path)
+        self.assertEqual(3, len(paths))
+        self.assertTrue(all(map(Path.is_file, paths)))
+        self.assertEqual(3, len(writer.written))
+        writer.clear()
+        dd.save(csv_dir, yaml_dir, excel_path)
+        self.assertEqual(0, len(writer.written))
+        self.assertEqual(set(paths), set(writer.skipped))
+        writer.clear()
@@ -26,3 +26,22 @@ class TestPlot(unittest.TestCase):
         path: Path = fig.save()
         self.assertTrue(path.is_file())
         self.assertEqual(path.suffix, '.svg')
+
+    def test_unchanged(self):
+        from zensols.datdesc.output import OutputWriter
+        writer: OutputWriter = OutputWriter.default_instance()
+        writer.clear()
+        paths = []
+        for _ in range(2):
+            fac = ImportConfigFactory(
+                ImportYamlConfig('test-resources/fig/bar-plot.yml'))
+            fig = fac('note_event_figure')
+            df = pd.DataFrame({'ds_type': ['a', 'b'], 'count': [1, 2]})
+            fig.add_plot(BarPlot(
+                data=df,
+                x_column_name='ds_type',
+                y_column_name='count'))
+            paths.append(fig.save())
+        self.assertEqual(paths[:1], writer.written)
+        self.assertEqual(paths[1:], writer.skipped)
+        writer.clear()
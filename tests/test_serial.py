@@ -1,8 +1,13 @@
 import unittest
+import json
 from io import StringIO
+from pathlib import Path
 from util import TestUtil
 import pandas as pd
-from zensols.datdesc import DataFrameDescriber, DataDescriber
+from zensols.datdesc import (
+    DataDescriptionError, DataFrameDescriber, DataDescriber, Table,
+    TableFactory
+)
 
 
 class TestSerialization(TestUtil, unittest.TestCase):
@@ -26,3 +31,170 @@ class TestSerialization(TestUtil, unittest.TestCase):
         self._equal_dfd(dfd, ddb.describers[0])
         self.assertEqual(dda.name, ddb.name)
         self.assertEqual(dda.mangle_sheet_name, ddb.mangle_sheet_name)
+
+    def test_excel(self):
+        import openpyxl as ox
+        from openpyxl.comments import Comment
+        path = Path('target/excel/roster.xlsx')
+        path.parent.mkdir(parents=True)
+        wb = ox.Workbook()
+        wb.remove(wb.active)
+        for sheet in ('south', 'park', 'skip'):
+            ws = wb.create_sheet(sheet)
+            ws.append(['name', 'age'])
+            ws.append(['Stan', 16])
+            ws.append(['Kyle', 20])
+            ws['B1'].comment = Comment(f'{sheet} age', 'test')
+            ws['A3'].comment = Comment('a friend', 'test')
+        wb.save(path)
+        dd: DataDescriber = DataDescriber.from_excel(
+            path, read_excel_kwargs={'index_col': 'name'},
+            exclude_sheets={'skip'})
+        self.assertEqual(['south', 'park'], [d.name for d in dd])
+        dfd: DataFrameDescriber = dd['park']
+        self.assertEqual(['Stan', 'Kyle'], dfd.df.index.tolist())
+        self.assertEqual([16, 20], dfd.df['age'].tolist())
+        self.assertEqual({'age': 'park age'},
+                         dfd.meta['description'].to_dict())
+        self.assertEqual({'Kyle': 'a friend'}, dfd.index_meta)
+        # the data starts after the header row by default; starting at the
+        # header row shifts the comments down a row
+        for start, gold in ((1, {'Kyle': 'a friend'}), (0, None)):
+            dd = DataDescriber.from_excel(
+                path, read_excel_kwargs={'index_col': 'name'},
+                data_start_row=start, include_sheets={'park'})
+            self.assertEqual(gold, dd['park'].index_meta)
+
+    def test_excel_constant_memory(self):
+        dfd: DataFrameDescriber = self._get_example()
+        dfd.df.loc[1, 'age'] = None
+        dfd.df['born'] = pd.to_datetime(
+            ['2001-02-03 04:05:06', None, '1999-12-31 00:00:00',
+             '2000-01-01 12:00:00'])
+        dfd.df['score'] = [1.5, float('nan'), -2.25, 3.0]
+        dd = DataDescriber.from_describer(dfd)
+        dfs = []
+        for constant_memory in (False, True):
+            path: Path = dd.save_excel(
+                Path(f'target/excel/roster-{constant_memory}'),
+                constant_memory=constant_memory)
+            ddr: DataDescriber = DataDescriber.from_excel(path)
+            self.assertEqual(1, len(ddr.describers))
+            self.assertTrue(dfd.df.equals(ddr.describers[0].df))
+            self._equal_df(dfd.meta, ddr.describers[0].meta)
+            dfs.append(ddr.describers[0].df)
+        self.assertTrue(dfs[0].equals(dfs[1]))
+        self.assertEqual(dfs[0].dtypes.to_list(), dfs[1].dtypes.to_list())
+
+    def test_excel_row_limit(self):
+        dd = DataDescriber.from_describer(self._get_example())
+        dd.SHEET_MAX_ROWS = 4
+        with self.assertRaisesRegex(DataDescriptionError, 'Excel limit'):
+            dd.save_excel(Path('target/excel/roster'), constant_memory=True)
+
+    def test_archive(self):
+        dfd: DataFrameDescriber = self._get_example()
+        dfd.df['cool'] = [True, False, True, True]
+        dfd.df['mixed'] = [1, 'two', None, 4.5]
+        dfe: DataFrameDescriber = dfd.derive(
+            name='indexed',
+            df=self._get_example_df(),
+            meta=(('cool', 'whether cool'),),
+            index_meta={'Kyle': 'a friend'})
+        dda = DataDescriber(describers=(dfd, dfe), name='south')
+        path: Path = dda.save_archive(Path('target'))
+        self.assertEqual(Path('target/south-table.zip'), path)
+        ddb: DataDescriber = DataDescriber.from_archive(path)
+        self.assertEqual(dda.name, ddb.name)
+        self.assertEqual(['roster', 'indexed'], list(ddb.keys()))
+        self.assertEqual([None, None], ddb.describers._describers)
+        self._equal_dfd(dfe, ddb['indexed'])
+        self.assertIsNone(ddb.describers._describers[0])
+        self._equal_dfd(dfd, ddb['roster'])
+        self.assertEqual(2, len(tuple(ddb)))
+
+    def test_archive_text(self):
+        df = pd.DataFrame({
+            'strs': ['a', 'é漢字', '', 'x' * 10_000] + ['b'] * 996,
+            'objs': [None, [1, 'two'], {'k': 3}, 'y' * 10_000] + [1] * 996})
+        dd = DataDescriber.from_describer(
+            DataFrameDescriber(name='text', desc='Text.', df=df))
+        path: Path = dd.save_archive(Path('target'))
+        # each column holds its text, not rows times the longest cell
+        self.assertLess(path.stat().st_size, 60_000)
+        dfr: pd.DataFrame = DataDescriber.from_archive(path)['text'].df
+        self.assertEqual(df['strs'].tolist(), dfr['strs'].tolist())
+        self.assertEqual(df['objs'].tolist(), dfr['objs'].tolist())
+        self.assertTrue(df.equals(dfr))
+
+    def test_json_split(self):
+        dfd: DataFrameDescriber = self._get_example()
+        sio = StringIO()
+        DataDescriber.from_describer(dfd).to_json(sio)
+        data = json.loads(sio.getvalue())
+        self.assertEqual({'columns', 'index', 'data'},
+                         set(data['describers'][0]['df'].keys()))
+        # files written with the previous column orientation
+        with open('test-resources/renderables/roster-table.json') as f:
+            ddb: DataDescriber = DataDescriber.from_json(f)
+        self._equal_dfd(dfd, ddb.describers[0])
+
+    def test_save_parallel(self):
+        dfd: DataFrameDescriber = self._get_example()
+        dd = DataDescriber(
+            describers=tuple(map(lambda i: dfd.derive(name=f'roster{i}'),
+                                 range(3))),
+            name='rosters')
+        targ = Path('target')
+        paths = []
+        for workers in (1, 2):
+            out: Path = targ / f'workers-{workers}'
+            paths.append(list(map(
+                lambda p: p.relative_to(out),
+                dd.save(out / 'csv', out / 'yaml', out / 'rosters',
+                        workers=workers))))
+            self.assertTrue(all(map(lambda p: (out / p).is_file(),
+                                    paths[-1])))
+        self.assertEqual(7, len(paths[0]))
+        self.assertEqual(paths[0], paths[1])
+
+    def test_archive_dtypes(self):
+        df = pd.DataFrame(
+            {'ints': [1, 2, 3],
+             'nullable': pd.array([1, None, 3], dtype='Int64'),
+             'bools': pd.array([True, None, False], dtype='boolean'),
+             'strs': pd.array(['x', None, 'z'], dtype='string'),
+             'dates': pd.to_datetime(
+                 ['2020-01-01', None, '2021-05-05']).tz_localize('UTC'),
+             'cats': pd.Categorical(['u', 'v', 'u'])},
+            index=pd.Index(pd.array([5, 6, None], dtype='Int64'), name='k'))
+        dd = DataDescriber.from_describer(
+            DataFrameDescriber(name='types', desc='Types.', df=df))
+        path: Path = dd.save_archive(Path('target'))
+        dfr: pd.DataFrame = DataDescriber.from_archive(path)['types'].df
+        self.assertEqual(df.dtypes.to_list(), dfr.dtypes.to_list())
+        self.assertEqual(df.index.dtype, dfr.index.dtype)
+        self.assertTrue(df.equals(dfr))
+        # memory mapped columns are modified without changing the archive
+        dfr.loc[5, 'ints'] = 99
+        dfr['ints'] += 1
+        self.assertEqual([100, 3, 4], dfr['ints'].tolist())
+        self.assertEqual([1, 2, 3], DataDescriber.from_archive(path)[
+            'types'].df['ints'].tolist())
+
+    def test_table_definition(self):
+        fac: TableFactory = TableFactory.default_instance()
+        dfd: DataFrameDescriber = self._get_example()
+        dfe: DataFrameDescriber = dfd.derive(name='kwargs')
+        dfe.head = None
+        dfe.table_kwargs = {'type': 'two_column', 'caption': 'Other.',
+                            'path': 'other.csv'}
+        for desc in (dfd, dfe, dfe.derive(name='same')):
+            path = Path('csv') / desc.csv_path
+            table: Table = desc.create_table()
+            table.path = path
+            gold = fac._to_flatdict(table)
+            tdef = desc.create_table_definition(path)
+            self.assertEqual(gold, tdef)
+            self.assertEqual(list(next(iter(gold.values()))),
+                             list(next(iter(tdef.values()))))
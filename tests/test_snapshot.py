@@ -0,0 +1,50 @@
+import unittest
+import os
+import shutil
+from pathlib import Path
+from zensols.config import DictionaryConfig, ImportConfigFactory
+from zensols.datdesc.table import _TABLE_FACTORY_CONFIG, TableFactory
+from zensols.datdesc.snapshot import ConfigSnapshot
+
+
+class TestConfigSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.targ_dir = Path('target/snapshot')
+        if self.targ_dir.is_dir():
+            shutil.rmtree(self.targ_dir)
+        self.targ_dir.mkdir(parents=True)
+        self.snap = ConfigSnapshot(self.targ_dir / 'cache')
+
+    def test_table_factory(self):
+        parsed = ConfigSnapshot(enabled=False).create_config(
+            'table', _TABLE_FACTORY_CONFIG)
+        self.snap.create_config('table', _TABLE_FACTORY_CONFIG)
+        self.assertTrue((self.targ_dir / 'cache' / 'table.json').is_file())
+        config = self.snap.create_config('table', _TABLE_FACTORY_CONFIG)
+        self.assertTrue(isinstance(config, DictionaryConfig))
+        self.assertEqual(parsed.sections, config.sections)
+        for sec in parsed.sections:
+            self.assertEqual(dict(parsed.get_options(sec)),
+                             dict(config.get_options(sec)))
+        fac: TableFactory = ImportConfigFactory(config)(
+            'datdesc_table_factory')
+        self.assertEqual(sorted(TableFactory.default_instance().
+                                get_table_names()),
+                         sorted(fac.get_table_names()))
+
+    def test_stale(self):
+        conf_file: Path = self.targ_dir / 'test.yml'
+        conf_file.write_text('sec:\n  opt: one\n')
+        config: str = f'[import]\nconfig_file = {conf_file}\n'
+        self.assertEqual('one', self.snap.create_config('test', config).
+                         get_option('opt', 'sec'))
+        cache_file: Path = self.targ_dir / 'cache' / 'test.json'
+        mtime: int = cache_file.stat().st_mtime_ns
+        self.assertEqual('one', self.snap.create_config('test', config).
+                         get_option('opt', 'sec'))
+        self.assertEqual(mtime, cache_file.stat().st_mtime_ns)
+        conf_file.write_text('sec:\n  opt: two\n')
+        st = conf_file.stat()
+        os.utime(conf_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertEqual('two', self.snap.create_config('test', config).
+                         get_option('opt', 'sec'))
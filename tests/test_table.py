@@ -0,0 +1,515 @@
+import sys
+import shutil
+from pathlib import Path
+from io import StringIO
+import unittest
+import random
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+from zensols.datdesc import TableFactory, Table, LatexTableError
+from zensols.datdesc.codecache import CodeCache
+from zensols.datdesc.template import TemplateCache
+from zensols.datdesc.latex import LatexTabular, CsvToLatexTable
+from zensols.datdesc.csvcache import DataFrameCache, ColumnSelector
+from zensols.datdesc.profiler import TableProfiler
+from zensols.datdesc.aggregate import Aggregation
+from zensols.datdesc.manifest import BuildManifest
+
+
+class TestTableStages(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = sys.maxsize
+        self.fac: TableFactory = TableFactory.default_instance()
+
+    def _create(self, **params) -> Table:
+        table: Table = self.fac.create(
+            caption='Metrics.',
+            path='test-resources/csv/metrics-summary.csv',
+            bold_cells=[[1, 2], [3, 4]],
+            bold_max_columns=['mF1'],
+            round_column_names={'MP': 1},
+            variables={'first': (0, 1), 'second': (1, 2)},
+            **params)
+        table.name = 'metricsTab'
+        return table
+
+    def _write(self, table: Table) -> str:
+        sio = StringIO()
+        table.write(writer=sio)
+        return sio.getvalue()
+
+    def test_stage_names(self):
+        table: Table = self._create()
+        self.assertEqual({'nascent', 'unformatted', 'formatted'},
+                         table._get_stage_names())
+        table.variables = {'a': "v = stages['postformat'].iloc[0, 1]"}
+        self.assertEqual({'nascent', 'postformat', 'formatted'},
+                         table._get_stage_names())
+        table.variables = {'a': 'v = 1'}
+        self.assertEqual({'nascent', 'formatted'}, table._get_stage_names())
+        table.variables = {'a': 'v = [s[k] for k in s][0].iloc[0, 0]'}
+        self.assertEqual(set(Table._STAGE_NAMES), table._get_stage_names())
+
+    def test_shared_stages(self):
+        table: Table = self._create()
+        df: pd.DataFrame = table.dataframe
+        org: pd.DataFrame = df.copy()
+        legacy: Table = self._create(code_pre='df = df')
+        self.assertEqual(self._write(legacy), self._write(table))
+        stages = table._get_formatted_dataframe_stages()
+        self.assertTrue(org.equals(df))
+        self.assertTrue(org.equals(stages['unformatted']))
+        self.assertFalse('postformat' in stages)
+        self.assertEqual('\\textbf{0.925}', stages['formatted'].iloc[1, 2])
+
+    def test_transforms(self):
+        table: Table = self.fac.create(
+            caption='Test.', path='x.csv', escape_column_names=['b'],
+            column_value_replaces={'a': {1: 'one'}},
+            capitalize_columns={'b': True})
+        table.dataframe = pd.DataFrame({'a': [1, 2], 'b': ['x_y z', 'a & b']})
+        self.assertEqual([['one', 'X\\_y Z'], [2, 'A \\& B']],
+                         table.formatted_dataframe.values.tolist())
+
+    def test_emphasis(self):
+        table: Table = self.fac.create(
+            caption='Test.', path='x.csv', bold_max_columns=['a'],
+            emphasis=[{'columns': ['b'], 'mode': 'min', 'k': 2,
+                       'style': 'italic'},
+                      {'columns': ['a', 'b'], 'axis': 'row',
+                       'style': 'color', 'color': 'blue'}],
+            bold_cells=[[0, 0], [-1, 1]])
+        table.dataframe = pd.DataFrame(
+            {'a': [3, 1, 3, float('nan')], 'b': [2, 2, 5, 1]})
+        self.assertEqual(
+            [['\\textbf{\\textcolor{blue}{\\textbf{3.0}}}', '\\textit{2}'],
+             [1.0, '\\textcolor{blue}{2}'],
+             [3.0, '\\textcolor{blue}{5}'],
+             ['-', '\\textbf{\\textcolor{blue}{\\textit{1}}}']],
+            table.formatted_dataframe.fillna('-').values.tolist())
+        table = self.fac.create(caption='Test.', path='x.csv',
+                                emphasis=[{'columns': ['a'], 'k': 0}])
+        table.dataframe = pd.DataFrame({'a': [1]})
+        with self.assertRaises(LatexTableError):
+            table.formatted_dataframe
+
+
+class TestCodeCache(unittest.TestCase):
+    def test_cache(self):
+        cache = CodeCache(maxsize=2)
+        code = cache.compile('v = 1 + 1')
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        self.assertIs(code, cache.compile('v = 1 + 1'))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        locs = {}
+        exec(code, None, locs)
+        self.assertEqual(2, locs['v'])
+        cache.clear()
+        self.assertEqual((0, 0), (cache.hits, cache.misses))
+        self.assertIs(CodeCache.default_instance(),
+                      CodeCache.default_instance())
+
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.targ_dir = Path('target/jinja')
+        if self.targ_dir.is_dir():
+            shutil.rmtree(self.targ_dir)
+
+    def test_cache(self):
+        src = 'a {{ b }} c'
+        cache = TemplateCache()
+        self.assertEqual('a 1 c', cache.render(src, {'b': 1}))
+        self.assertIs(cache.get_template(src), cache.get_template(src))
+        self.assertEqual('x', cache.render('x', {}))
+
+    def test_bytecode(self):
+        src = '{% for i in range(n) %}{{ i }}{% endfor %}'
+        cache = TemplateCache(bytecode_dir=self.targ_dir)
+        self.assertEqual('012', cache.render(src, {'n': 3}))
+        self.assertEqual(1, len(tuple(self.targ_dir.iterdir())))
+        cache = TemplateCache(bytecode_dir=self.targ_dir)
+        self.assertEqual('01', cache.render(src, {'n': 2}))
+
+    def test_bounded(self):
+        cache = TemplateCache(cache_size=2)
+        for i in range(10):
+            src = f'{i} {{{{ b }}}}'
+            self.assertEqual(f'{i} x', cache.render(src, {'b': 'x'}))
+            self.assertIsNotNone(cache.render_split(src, {}, 'b'))
+        self.assertEqual(2, len(cache._loader._sources))
+        self.assertEqual(2, len(cache._verbatim))
+        self.assertEqual('0 y', cache.render('0 {{ b }}', {'b': 'y'}))
+
+
+class TestLatexTabular(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = sys.maxsize
+        self.fac: TableFactory = TableFactory.default_instance()
+
+    def _create_df(self) -> pd.DataFrame:
+        rand = random.Random(0)
+        words = ['a', ' padded ', 'True', 'é', '漢字', '$x$', '']
+        return pd.DataFrame({
+            'ints': [rand.randint(-1000, 1000) for _ in range(50)],
+            'floats': [rand.uniform(-10, 10) for _ in range(50)],
+            'words': [rand.choice(words) for _ in range(50)],
+            'nulls': [rand.choice([None, float('nan'), 'b', 1.5])
+                      for _ in range(50)],
+            'bools': [rand.choice([True, False]) for _ in range(50)]})
+
+    def _tabulate(self, table: Table, df: pd.DataFrame):
+        rows = tuple(table._get_table_rows(df))
+        return tabulate(rows, **table._get_tabulate_params()).split('\n')
+
+    def test_lines(self):
+        table: Table = self._create()
+        df: pd.DataFrame = self._create_df()
+        for sub in (df, df.iloc[:, [0, 1, 4]], df.iloc[:0], df.iloc[:1],
+                    df[['words']], df.astype(object),
+                    pd.DataFrame({'a': ['x\ty']})):
+            lines = LatexTabular.create(
+                sub, table._get_table_header(sub),
+                table._get_tabulate_params())
+            self.assertIsNotNone(lines)
+            gold = self._tabulate(table, sub)
+            self.assertEqual(len(gold), len(lines))
+            self.assertEqual(gold, list(lines))
+        self.assertIsNone(LatexTabular.create(
+            df, table._get_table_header(df), {'tablefmt': 'latex_raw'}))
+        for sub in ({'a': ['\x1b[31mred\x1b[0m']}, {'a': [b'x']},
+                    {'a': ['a\nb', 'c']}):
+            sub = pd.DataFrame(sub)
+            self.assertIsNone(LatexTabular.create(
+                sub, table._get_table_header(sub),
+                table._get_tabulate_params()))
+
+    def test_multi_line(self):
+        table: Table = self._create()
+        df = pd.DataFrame({'a': ['a\nb', 'c'], 'b': [1, 2]})
+        gold = self._tabulate(table, df)
+        lines = table._get_table_lines(df)
+        self.assertEqual(9, len(gold))
+        self.assertEqual(gold, list(lines))
+
+    def _create(self, **params) -> Table:
+        table: Table = self.fac.create(caption='Test.', path='x.csv', **params)
+        table.name = 'testTab'
+        return table
+
+    def test_write(self):
+        params = ({}, {'type': 'two_column', 'booktabs': True},
+                  {'type': 'only_data', 'hlines': [1, 3],
+                   'double_hlines': [2], 'rules': {4: '\\cline{1-2}  '}},
+                  {'row_range': [2, -2], 'row_deletes': [1]},
+                  {'type': 'bare', 'row_range': [0, None]},
+                  {'template': '{{ table|trim }}'})
+        for kwargs in params:
+            table: Table = self._create(**kwargs)
+            table.dataframe = self._create_df()
+            sio = StringIO()
+            table.write(depth=1, writer=sio)
+            legacy: Table = self._create(
+                code_render='table[:] = list(table)', **kwargs)
+            legacy.dataframe = self._create_df()
+            legacy._get_table_lines = \
+                lambda df: self._tabulate(legacy, df)
+            legacy.template = legacy.template + '{{ "" if table }}'
+            gold = StringIO()
+            legacy.write(depth=1, writer=gold)
+            self.assertEqual(gold.getvalue(), sio.getvalue())
+
+
+class TestDataFrameCache(unittest.TestCase):
+    def setUp(self):
+        self.targ_dir = Path('target/csvcache')
+        if self.targ_dir.is_dir():
+            shutil.rmtree(self.targ_dir)
+        self.targ_dir.mkdir(parents=True)
+        self.path = self.targ_dir / 'data.csv'
+        self.path.write_text('a,b\n1,x\n2,y\n')
+
+    def test_cache(self):
+        cache = DataFrameCache()
+        df = cache.read_csv(self.path)
+        self.assertEqual((2, 2), df.shape)
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        df['a'] = df['a'] * 10
+        df2 = cache.read_csv(str(self.path))
+        self.assertEqual([1, 2], df2['a'].tolist())
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        cache.read_csv(self.path, {'index_col': 0})
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+        self.assertEqual(2, len(cache))
+        self.path.write_text('a,b\n1,x\n2,y\n3,z\n')
+        self.assertEqual(3, len(cache.read_csv(self.path)))
+        self.assertEqual((1, 3), (cache.hits, cache.misses))
+
+    def test_modify_in_place(self):
+        for cow in (False, True):
+            with pd.option_context('mode.copy_on_write', cow):
+                cache = DataFrameCache()
+                df = cache.read_csv(self.path)
+                df2 = cache.read_csv(self.path)
+                # with copy-on-write the cached data is shared until modified
+                self.assertEqual(cow, np.shares_memory(
+                    df['a'].to_numpy(), df2['a'].to_numpy()))
+                df.iloc[0, 0] = 100
+                df['a'] += 1
+                df.loc[1, 'b'] = 'z'
+                df2.iloc[1, 0] = 200
+                df3 = cache.read_csv(self.path)
+                self.assertEqual((2, 1), (cache.hits, cache.misses))
+                self.assertEqual([1, 2], df3['a'].tolist())
+                self.assertEqual(['x', 'y'], df3['b'].tolist())
+                self.assertEqual([1, 200], df2['a'].tolist())
+
+    def test_projection(self):
+        cache = DataFrameCache()
+        sel = ColumnSelector(frozenset({'b', 'c'}))
+        self.assertEqual(['b'], cache.read_csv(
+            self.path, {'usecols': sel}).columns.tolist())
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        cache.read_csv(self.path)
+        df = cache.read_csv(self.path, {'usecols': ColumnSelector(
+            frozenset({'a'}))})
+        self.assertEqual(['a'], df.columns.tolist())
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_table_columns(self):
+        fac: TableFactory = TableFactory.default_instance()
+        params = dict(caption='Test.', path=str(self.path),
+                      column_keeps=['b', 'Id'], index_col_name='Id')
+        table: Table = fac.create(**params)
+        self.assertEqual({'b'}, table._get_read_columns())
+        self.assertEqual(['b'], table.dataframe.columns.tolist())
+        self.assertEqual(['b', 'Id'],
+                         table.formatted_dataframe.columns.tolist())
+        for kwargs in ({'code_pre': 'df = df'}, {'variables': {'v': (0, 1)}},
+                       {'variables': {'v': 'v = 1'}},
+                       {'column_keeps': None},
+                       {'read_params': {'index_col': 0}}):
+            table = fac.create(**(params | kwargs))
+            self.assertIsNone(table._get_read_columns())
+        # variables can use columns not kept in the table
+        table = fac.create(**(params | {
+            'variables': {'v': "v = self.dataframe['a'].sum()"}}))
+        table.write(writer=StringIO())
+        self.assertEqual(['a', 'b'], table.dataframe.columns.tolist()[:2])
+
+    def test_bound(self):
+        cache = DataFrameCache(max_bytes=1)
+        cache.read_csv(self.path)
+        cache.read_csv(self.path)
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+        self.assertEqual(0, len(cache))
+
+
+class TestCsvToLatexTable(unittest.TestCase):
+    def _write(self, workers: int) -> str:
+        fac: TableFactory = TableFactory.default_instance()
+        tables = list(fac.from_file('test-resources/config/notes-table.yml'))
+        tables.extend(fac.from_file('test-resources/config/sections-table.yml'))
+        bad: Table = fac.create(caption='Bad.', path='target/nofile.csv')
+        bad.name = 'badTab'
+        tables.insert(1, bad)
+        # fails after writing part of the table
+        partial: Table = fac.create(
+            caption='Partial.', path='test-resources/csv/metrics-summary.csv',
+            variables={'x': (100, 100)})
+        partial.name = 'partialTab'
+        tables.insert(3, partial)
+        sio = StringIO()
+        CsvToLatexTable(tables, 'tabs', workers=workers).write(writer=sio)
+        return sio.getvalue()
+
+    def test_workers(self):
+        serial: str = self._write(1)
+        self.assertTrue("% erorr: could not format table 'badTab'" in serial)
+        self.assertTrue("% erorr: could not format table 'partialTab'" in
+                        serial)
+        self.assertTrue('Partial.' in serial)
+        self.assertEqual(serial, self._write(3))
+
+
+class TestTableProfiler(unittest.TestCase):
+    def setUp(self):
+        self.prof = TableProfiler(enabled=True)
+        TableProfiler._DEFAULT_INSTANCE = self.prof
+
+    def tearDown(self):
+        self.prof.clear()
+        TableProfiler._DEFAULT_INSTANCE = None
+
+    def test_profile(self):
+        fac: TableFactory = TableFactory.default_instance()
+        table: Table = fac.create(
+            caption='Test.', path='test-resources/csv/metrics-summary.csv',
+            code_pre='df = df', variables={'v': (0, 1)})
+        table.name = 'profTab'
+        DataFrameCache.default_instance().clear()
+        table.write(writer=StringIO())
+        df: pd.DataFrame = self.prof.dataframe
+        self.assertEqual({'profTab'}, set(df['table']))
+        self.assertEqual({'read_csv', 'format', 'code_pre', 'number_format',
+                          'emphasis', 'columns', 'variables', 'tabulate',
+                          'template', 'write'}, set(df['stage']))
+        # the enclosing stage's peak includes the peaks of its stages
+        mem: pd.Series = df.set_index('stage')['memory']
+        self.assertGreaterEqual(mem['format'], mem['number_format'])
+        self.assertTrue((df['memory'] > 0).any())
+        self.assertEqual(df.shape, self.prof.create_describer().df.shape)
+        sio = StringIO()
+        self.prof.write(writer=sio)
+        self.assertTrue(sio.getvalue().startswith('hottest tables:'))
+
+    def test_nested(self):
+        with self.prof.measure('t', 'outer'):
+            with self.prof.measure('t', 'inner'):
+                data = bytearray(1024 ** 2)
+            del data
+        mem = dict(self.prof.dataframe[['stage', 'memory']].values)
+        self.assertGreaterEqual(mem['inner'], 1024 ** 2)
+        self.assertGreaterEqual(mem['outer'], mem['inner'])
+
+    def test_disabled(self):
+        prof = TableProfiler()
+        with prof.measure('t', 's'):
+            pass
+        self.assertEqual(0, len(prof.dataframe))
+
+
+class TestAggregation(unittest.TestCase):
+    def setUp(self):
+        targ_dir = Path('target/aggregate')
+        targ_dir.mkdir(parents=True, exist_ok=True)
+        rand = random.Random(0)
+        self.df = pd.DataFrame({
+            'model': [rand.choice('abc') for _ in range(101)],
+            'split': [rand.choice('xy') for _ in range(101)],
+            'f1': [rand.choice([rand.random(), float('nan')])
+                   for _ in range(101)],
+            'n': [rand.randint(0, 9) for _ in range(101)]})
+        self.path = targ_dir / 'preds.csv'
+        self.df.to_csv(self.path, index=False)
+
+    def test_aggregate(self):
+        cols = {'m': ['f1', 'mean'], 'sd': ['f1', 'std'], 'v': ['f1', 'var'],
+                'c': ['f1', 'count'], 'z': ['f1', 'size'], 's': ['n', 'sum'],
+                'lo': ['f1', 'min'], 'hi': ['n', 'max']}
+        agg = Aggregation(['model', 'split'], cols, chunk_size=7)
+        gold = self.df.groupby(['model', 'split']).agg(
+            **{k: tuple(v) for k, v in cols.items()}).reset_index()
+        pd.testing.assert_frame_equal(gold, agg.read_csv(self.path))
+        with self.assertRaises(LatexTableError):
+            Aggregation('model', {'m': ['f1', 'median']})
+
+    def test_chunk_dtypes(self):
+        df = pd.DataFrame({
+            'g': ['a', 'a', 'a', 'b', 'b'],
+            'x': ['1', '1', '1', '2.5', '2'],
+            'w': ['q', 'r', 's', 'p', 't']})
+        path = Path('target/aggregate/dtypes.csv')
+        df.to_csv(path, index=False)
+        df = pd.read_csv(path)
+        cols = {'s': ['x', 'sum'], 'hi': ['x', 'max'], 'lo': ['w', 'min'],
+                'top': ['w', 'max']}
+        gold = df.groupby('g').agg(
+            **{k: tuple(v) for k, v in cols.items()}).reset_index()
+        # the first chunk has only integers and only group 'a'
+        agg = Aggregation('g', cols, chunk_size=3)
+        pd.testing.assert_frame_equal(gold, agg.read_csv(path))
+        self.assertEqual([3.0, 4.5], gold['s'].tolist())
+
+    def test_table(self):
+        fac: TableFactory = TableFactory.default_instance()
+        table: Table = fac.create(
+            caption='Test.', path=str(self.path),
+            aggregate={'by': 'model', 'columns': {'F1': ['f1', 'mean']},
+                       'chunk_size': 10},
+            round_column_names={'F1': 2})
+        gold = self.df.groupby('model')['f1'].mean().round(2)
+        self.assertEqual(['model', 'F1'],
+                         table.formatted_dataframe.columns.tolist())
+        self.assertEqual(list(map(lambda v: f'{v:.2f}', gold)),
+                         table.formatted_dataframe['F1'].tolist())
+
+
+class TestChunkedTable(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = sys.maxsize
+        self.fac: TableFactory = TableFactory.default_instance()
+        targ_dir = Path('target/chunked')
+        targ_dir.mkdir(parents=True, exist_ok=True)
+        rand = random.Random(0)
+        df = pd.DataFrame({
+            'name': [rand.choice(['a_b', 'c d', 'e']) for _ in range(53)],
+            'score': [rand.random() for _ in range(53)],
+            'count': [rand.randint(0, 5000) for _ in range(53)],
+            'misc': [1] * 40 + [float('nan')] + [2] * 12})
+        self.path = targ_dir / 'data.csv'
+        df.to_csv(self.path, index=False)
+
+    def _write(self, **params) -> str:
+        table: Table = self.fac.create(
+            caption='Test.', path=str(self.path), index_col_name='Id',
+            bold_max_columns=['score'], bold_cells=[[0, 1], [-1, 2]],
+            emphasis=[{'columns': ['score', 'count'], 'mode': 'min', 'k': 2,
+                       'style': 'italic'}],
+            round_column_names={'score': 3}, hlines=[5, 20],
+            format_thousands_column_names={'count': None},
+            capitalize_columns={'name': True}, escape_column_names=['name'],
+            column_renames={'score': 'Score'},
+            **({'variables': {'first': (0, 1), 'last': (-1, 2)}} | params))
+        table.name = 'chunkTab'
+        sio = StringIO()
+        table.write(writer=sio)
+        return sio.getvalue()
+
+    def _normalize(self, text: str):
+        return list(map(lambda ln: ' '.join(ln.split()), text.split('\n')))
+
+    def test_chunked(self):
+        gold: str = self._write()
+        for chunk_size in (1, 7, 53, 100):
+            chunked: str = self._write(chunk_size=chunk_size)
+            self.assertEqual(self._normalize(gold), self._normalize(chunked))
+        self.assertEqual(gold, self._write(chunk_size=7, code_post='df = df'))
+        variables = {'variables': {'last': (-1, 2), 'first': (0, 1)}}
+        self.assertEqual(self._normalize(self._write(**variables)),
+                         self._normalize(self._write(chunk_size=7,
+                                                     **variables)))
+
+    def test_is_chunked(self):
+        table: Table = self.fac.create(
+            caption='Test.', path=str(self.path), chunk_size=10)
+        self.assertTrue(table._is_chunked())
+        self.assertEqual(53, table._get_chunk_scan().rows)
+        self.assertEqual(np.float64, table._get_chunk_scan().dtypes['misc'])
+        for params in ({'variables': {'v': 'v = 1'}}, {'code_pre': 'df = df'},
+                       {'tabulate_params': {}}, {'chunk_size': None}):
+            table = self.fac.create(
+                caption='Test.', path=str(self.path),
+                **({'chunk_size': 10} | params))
+            self.assertFalse(table._is_chunked())
+        table = self.fac.create(caption='Test.', path='x.csv', chunk_size=10)
+        table.dataframe = pd.DataFrame({'a': [1]})
+        self.assertFalse(table._is_chunked())
+
+
+class TestBuildManifest(unittest.TestCase):
+    def test_mixed_keys(self):
+        fac: TableFactory = TableFactory.default_instance()
+        manifest = BuildManifest(Path('target/manifest/none.json'))
+
+        def key(repls) -> str:
+            return manifest.get_key(fac.create(
+                caption='Metrics.',
+                path='test-resources/csv/metrics-summary.csv',
+                column_value_replaces=repls))
+
+        mixed: str = key({'MP': {1: 'a', 'x': 'b'}})
+        self.assertEqual(mixed, key({'MP': {'x': 'b', 1: 'a'}}))
+        self.assertNotEqual(key({'MP': {1: 'a'}}), key({'MP': {'1': 'a'}}))
+        self.assertNotEqual(mixed, key({'MP': {1: 'a', 'x': 'c'}}))
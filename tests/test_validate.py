@@ -0,0 +1,86 @@
+import unittest
+import shutil
+from pathlib import Path
+from zensols.datdesc.table import TableFactory
+from zensols.datdesc.figure import FigureFactory
+from zensols.datdesc.validate import DefinitionValidator
+
+
+class TestValidate(unittest.TestCase):
+    def setUp(self):
+        self.targ_dir = Path('target/validate')
+        if self.targ_dir.is_dir():
+            shutil.rmtree(self.targ_dir)
+        self.targ_dir.mkdir(parents=True)
+        self.validator = DefinitionValidator(
+            TableFactory.default_instance(),
+            FigureFactory.default_instance())
+
+    def _validate(self, content: str, tables: bool = True):
+        path: Path = self.targ_dir / 'test.yml'
+        path.write_text(content)
+        return tuple(map(lambda i: i.message,
+                         self.validator.validate(path, tables)))
+
+    def test_valid(self):
+        for path in Path('test-resources/config').iterdir():
+            self.assertEqual((), self.validator.validate(path))
+        for path in Path('test-resources/fig').glob('*-figure.yml'):
+            self.assertEqual((), self.validator.validate(path, False))
+
+    def test_table(self):
+        csv = 'test-resources/csv/note-events.csv'
+        self.assertEqual(
+            ("Unknown table type 'one_colum', expecting one of: bare, " +
+             'one_column, one_column_slack, only_data, two_column, ' +
+             'two_column_slack',),
+            self._validate(f'tab:\n  type: one_colum\n  path: {csv}\n'))
+        msgs = self._validate(f"""\
+tab:
+  type: one_column
+  path: {csv}
+  captoin: typo
+  round_column_names: [a]
+  column_keeps: [nope, Category]
+  code_format: 'df = df['
+  params: {{sizes: x}}
+""")
+        self.assertEqual(5, len(msgs))
+        self.assertEqual("Unknown table key 'captoin'", msgs[0])
+        self.assertTrue(msgs[1].startswith("Table key 'round_column_names' " +
+                                           'expects a mapping'))
+        self.assertTrue(msgs[2].startswith('code_format has a syntax error'))
+        self.assertEqual("Unknown parameter(s) 'sizes', expecting one of: " +
+                         'placement, size', msgs[3])
+        self.assertTrue(msgs[4].startswith(
+            "Unknown column(s) 'nope' in "), msgs[4])
+        self.assertEqual(("CSV file not found: 'nofile.csv'",),
+                         self._validate('tab:\n  type: one_column\n' +
+                                        '  path: nofile.csv\n'))
+
+    def test_default_params(self):
+        csv = 'test-resources/csv/note-events.csv'
+        self.assertEqual(
+            ("Expecting a name and optional default in default parameter: " +
+             "'['a', 'b', 'c']'",),
+            self._validate(f'tab:\n  type: one_column\n  path: {csv}\n' +
+                           '  default_params: [[a, b, c], [size]]\n'))
+
+    def test_figure(self):
+        msgs = self._validate("""\
+fig:
+  heigth: 5
+  plots:
+    - type: bar
+      data: 'dataframe: test-resources/fig/iris.csv'
+      x_column_name: ds_typ
+      y_column_name: species
+      code_post: 'plot.title = ('
+    - type: barr
+""", False)
+        self.assertEqual(4, len(msgs))
+        self.assertEqual("Unknown figure key 'heigth'", msgs[0])
+        self.assertTrue(msgs[1].startswith('plot 0: code_post has a syntax'))
+        self.assertTrue(msgs[2].startswith(
+            "plot 0: Unknown column(s) 'ds_typ' in"))
+        self.assertTrue(msgs[3].startswith("plot 1: Unknown plot type 'barr'"))
@@ -0,0 +1,85 @@
+import unittest
+import os
+import json
+import datetime
+import shutil
+from pathlib import Path
+from zensols.datdesc.yamlio import YamlCache
+
+
+class TestYamlCache(unittest.TestCase):
+    def setUp(self):
+        self.targ_dir = Path('target/yamlio')
+        if self.targ_dir.is_dir():
+            shutil.rmtree(self.targ_dir)
+        self.targ_dir.mkdir(parents=True)
+        self.path = self.targ_dir / 'test.yml'
+        self.path.write_text('tab:\n  type: one\n  cols: [a, b]\n')
+
+    def _touch(self, content: str):
+        st = self.path.stat()
+        self.path.write_text(content)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    def test_memory(self):
+        cache = YamlCache()
+        data = cache.load(self.path)
+        self.assertEqual({'tab': {'type': 'one', 'cols': ['a', 'b']}}, data)
+        # callers modify the loaded data
+        del data['tab']['type']
+        self.assertEqual(data, {'tab': {'cols': ['a', 'b']}})
+        self.assertEqual('one', cache.load(self.path)['tab']['type'])
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+        self._touch('tab:\n  type: two\n')
+        self.assertEqual({'tab': {'type': 'two'}}, cache.load(self.path))
+        self.assertEqual(2, cache.misses)
+        cache.clear()
+        self.assertEqual(0, cache.hits)
+
+    def test_cache_dir(self):
+        cache_dir: Path = self.targ_dir / 'cache'
+        data = YamlCache(cache_dir).load(self.path)
+        self.assertEqual(1, len(tuple(cache_dir.iterdir())))
+        # a new instance simulates another process
+        cache = YamlCache(cache_dir)
+        self.assertEqual(data, cache.load(self.path))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(0, cache.misses)
+        self._touch('tab:\n  type: two\n')
+        cache = YamlCache(cache_dir)
+        self.assertEqual({'tab': {'type': 'two'}}, cache.load(self.path))
+        self.assertEqual(1, cache.misses)
+        # cached files are JSON rather than pickles
+        for path in cache_dir.iterdir():
+            self.assertEqual('.json', path.suffix)
+            self.assertEqual({'header', 'data'},
+                             set(json.loads(path.read_text()).keys()))
+
+    def test_cache_dir_json(self):
+        cache_dir: Path = self.targ_dir / 'cache'
+        self.path.write_text('tab:\n  born: 2020-01-01\n  1: one\n')
+        data = YamlCache(cache_dir).load(self.path)
+        self.assertEqual(datetime.date(2020, 1, 1), data['tab']['born'])
+        # data that is not the same after a JSON round trip is not shared
+        self.assertFalse(cache_dir.is_dir() and any(cache_dir.iterdir()))
+        cache = YamlCache(cache_dir)
+        self.assertEqual(data, cache.load(self.path))
+        self.assertEqual(1, cache.misses)
+
+    def test_default_instance(self):
+        self.assertIsNone(YamlCache.default_instance().cache_dir)
+
+    def test_disabled(self):
+        cache = YamlCache(enabled=False)
+        cache.load(self.path)
+        cache.load(self.path)
+        self.assertEqual(0, cache.hits)
+        self.assertEqual(0, cache.misses)
+
+    def test_dump(self):
+        data = {'b': {'x': [1, 2]}, 'a': 'text'}
+        out: str = YamlCache.dump(data, default_flow_style=False,
+                                  sort_keys=False)
+        self.assertTrue(out.startswith('b:'))
+        self.assertEqual(data, YamlCache.parse(out))